@@ -0,0 +1,154 @@
+import argparse
+import json
+import sys
+from contextlib import closing
+from typing import Iterable, Iterator, List, TextIO, Union
+from solver_v2.batch import SolveOptions, SolveResult, Status, solve_many
+from solver_v2.sudokuCSP import ValueOrdering
+from solver_v2.techniques import PipelinePolicy
+
+FORMATS = ["solution", "jsonl"]  # Available output formats
+
+parser = argparse.ArgumentParser(
+    description="Solve sudokus line by line, one puzzle of 81 digits per line."
+)
+parser.add_argument(
+    "file",
+    nargs="?",
+    default="-",
+    help="File to read the puzzles from, stdin if missing or -",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=1,
+    help="Number of worker processes, 0 for one per CPU (default: 1)",
+)
+parser.add_argument(
+    "--chunksize",
+    type=int,
+    default=64,
+    help="Number of puzzles sent to a worker at once (default: 64)",
+)
+parser.add_argument(
+    "--unordered",
+    action="store_true",
+    help="Write the results as they are solved instead of in input order",
+)
+parser.add_argument(
+    "--format",
+    choices=FORMATS,
+    default="solution",
+    help="solution: the solution or the status per line, "
+    "jsonl: a JSON object with status, timing and node count per line",
+)
+parser.add_argument(
+    "--value-ordering",
+    choices=[ordering.name.lower() for ordering in ValueOrdering],
+    default=ValueOrdering.FIRST.name.lower(),
+    help="Order in which the candidates of a cell are tried, "
+    "least_constraining tries the ones that remove the fewest peer candidates first "
+    "(default: first)",
+)
+parser.add_argument(
+    "--arc-consistency",
+    action="store_true",
+    help="Prune every house to the candidates of a complete assignment of the house "
+    "(matching based), fewer nodes for more work per node",
+)
+parser.add_argument(
+    "--subsets",
+    action="store_true",
+    help="Look for naked and hidden pairs, triples and quads when the cheaper "
+    "deductions stall, fewer nodes for more work per node",
+)
+parser.add_argument(
+    "--fish",
+    action="store_true",
+    help="Look for X-Wings, Swordfish and Jellyfish when every other deduction "
+    "stalls, mostly pays off on the hardest puzzles",
+)
+parser.add_argument(
+    "--policy",
+    choices=[policy.name.lower() for policy in PipelinePolicy],
+    default=PipelinePolicy.RESTART.name.lower(),
+    help="Order of the deduction techniques, restart starts from the cheapest after "
+    "any progress, sweep runs all of them in turn, adaptive is restart but skips "
+    "techniques that don't pay off in the search (default: restart)",
+)
+
+
+def read_puzzles(lines: Iterable[str]) -> Iterator[str]:
+    # one puzzle per line, a blank line is INVALID, so the output lines up with
+    # the input
+    for line in lines:
+        yield line.strip()
+
+
+def format_result(result: SolveResult, output_format: str) -> str:
+    """
+    Formats the result of a puzzle as one output line.
+
+    Parameters:
+    - result (SolveResult): The result of the puzzle.
+    - output_format (str): One of FORMATS.
+
+    Returns:
+    - str: The line without newline. In the solution format it is the solution or,
+      if the puzzle wasn't solved, the name of the status.
+    """
+    if output_format == "jsonl":
+        return json.dumps(
+            {
+                "index": result.index,
+                "puzzle": result.puzzle,
+                "solution": result.solution,
+                "status": result.status.value,
+                "seconds": round(result.seconds, 6),
+                "nodes": result.nodes,
+            }
+        )
+    if result.status == Status.SOLVED:
+        return result.solution
+    return result.status.value
+
+
+def main(
+    argv: Union[None, List[str]] = None,
+    stdin: TextIO = sys.stdin,
+    stdout: TextIO = sys.stdout,
+) -> int:
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.chunksize < 1:
+        parser.error("--workers needs to be at least 0 and --chunksize at least 1")
+
+    file = stdin if args.file == "-" else open(args.file)
+    results = solve_many(
+        read_puzzles(file),
+        workers=args.workers or None,
+        chunksize=args.chunksize,
+        ordered=not args.unordered,
+        options=SolveOptions(
+            value_ordering=ValueOrdering[args.value_ordering.upper()],
+            arc_consistency=args.arc_consistency,
+            subsets=args.subsets,
+            fish=args.fish,
+            policy=PipelinePolicy[args.policy.upper()],
+        ),
+    )
+    # closing shuts the pool down right away, also if the reader went away
+    with closing(results):
+        try:
+            for result in results:
+                stdout.write(format_result(result, args.format) + "\n")
+                stdout.flush()
+        except BrokenPipeError:
+            return 1
+        finally:
+            if file is not stdin:
+                file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Precomputed lookup tables of the sudoku geometry, shared by every engine.
+
+Cells are addressed by their flat index row * COLUMNS + column and houses by their
+position in all_houses: the columns are the houses 0-8, the rows 9-17 and the
+blocks 18-26. The tables are tuples, which are the fastest to index in the scalar
+loops of the engines.
+"""
+
+from typing import Dict, List, Tuple
+
+ROWS, COLUMNS = (9, 9)
+CELLS = ROWS * COLUMNS
+
+# same for rows
+all_rows = [[(row, column) for column in range(COLUMNS)] for row in range(ROWS)]
+
+# return columns' lists of cells
+all_columns = [[(row, column) for row in range(ROWS)] for column in range(COLUMNS)]
+
+# same for blocks
+# this list comprehension is unreadable, but quite cool!
+all_blocks = [
+    [
+        ((row // 3) * 3 + column // 3, (row % 3) * 3 + column % 3)
+        for column in range(COLUMNS)
+    ]
+    for row in range(ROWS)
+]
+
+# combine three
+all_houses = all_columns + all_rows + all_blocks
+HOUSES = len(all_houses)
+
+# the 20 other cells that share a row, column or block with a cell
+all_peers: Dict[Tuple[int, int], List[Tuple[int, int]]] = {
+    cell: sorted(
+        {other for house in all_houses if cell in house for other in house} - {cell}
+    )
+    for row in all_rows
+    for cell in row
+}
+
+
+def cell_index(position: Tuple[int, int]) -> int:
+    row, column = position
+    return row * COLUMNS + column
+
+
+def cell_position(index: int) -> Tuple[int, int]:
+    return divmod(index, COLUMNS)
+
+
+# house -> the 9 cells of the house
+HOUSE_CELL_TUPLES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(cell_index(position) for position in house) for house in all_houses
+)
+
+# cell -> its column, row and block house
+CELL_HOUSE_TUPLES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(house for house in range(HOUSES) if index in HOUSE_CELL_TUPLES[house])
+    for index in range(CELLS)
+)
+
+# cell -> its 20 peers
+PEER_TUPLES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(cell_index(peer) for peer in all_peers[cell_position(index)])
+    for index in range(CELLS)
+)
+
+
+def _intersections() -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    # every block intersects 3 rows and 3 columns in 3 cells each
+    intersections = []
+    for block in range(2 * ROWS, HOUSES):
+        block_cells = set(HOUSE_CELL_TUPLES[block])
+        for line in range(2 * ROWS):
+            line_cells = set(HOUSE_CELL_TUPLES[line])
+            shared = block_cells & line_cells
+            if not shared:
+                continue
+            intersections.append(
+                (
+                    tuple(sorted(shared)),
+                    tuple(sorted(block_cells - shared)),
+                    tuple(sorted(line_cells - shared)),
+                )
+            )
+    return tuple(intersections)
+
+
+# box/line intersections, 9 blocks * (3 rows + 3 columns) = 54 of them, each as
+# (the 3 cells in both houses, the 6 other cells of the block, the 6 other cells
+# of the line)
+INTERSECTION_TUPLES: Tuple[Tuple[Tuple[int, ...], ...], ...] = _intersections()
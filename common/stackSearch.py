@@ -0,0 +1,202 @@
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Tuple, Union
+from common.trail import Trail
+
+
+class SearchStatus(Enum):
+    # the state holds a solution, run() again looks for the next one
+    SOLVED = "SOLVED"
+    # the budget of a run is used up, run() again resumes the search
+    PAUSED = "PAUSED"
+    # every branch was explored, the state is back to where the search started
+    EXHAUSTED = "EXHAUSTED"
+
+
+class Frame(NamedTuple):
+    variable: Any  # the cell or variable assigned on this level
+    remaining: Iterator  # the candidates of the variable not tried yet
+    mark: int  # the trail position before the variable got assigned
+
+
+class CopyFrame(NamedTuple):
+    state: Any  # the state before the variable got assigned, copied per candidate
+    variable: Any  # the cell or variable assigned on this level
+    remaining: Iterator  # the candidates of the variable not tried yet
+
+
+class StackSearch:
+    """
+    Depth first search on a single state with an explicit stack instead of recursion.
+
+    Every level of the search is a Frame on a list, so the depth is only bounded by
+    memory and not by the recursion limit, and the search can stop after any number
+    of candidates and be resumed later, e.g. to give it a time budget. The state is
+    assigned in place, every write is recorded on a trail that is attached to the
+    state while the search is open, and undone when a branch fails.
+
+    The search doesn't know the state it runs on, the engine passes three callables:
+
+    - choose(state) -> Tuple[variable, Iterable]: The next variable to assign and
+      its candidates in the order to try them. Only called if the state isn't solved.
+    - assign(state, variable, candidate) -> bool: Assigns the candidate, e.g. with
+      propagation, and returns False if the state got inconsistent.
+    - is_solution(state) -> bool: True if every variable is assigned consistently.
+
+    Methods:
+    - run(budget: Union[None, int] = None) -> SearchStatus:
+        Searches until the next solution, the end of the search or the budget.
+
+    - close() -> None:
+        Detaches the trail, the state keeps its current assignment.
+    """
+
+    def __init__(
+        self,
+        state: Any,
+        choose: Callable[[Any], Tuple[Any, Iterable]],
+        assign: Callable[[Any, Any, Any], bool],
+        is_solution: Callable[[Any], bool],
+    ) -> None:
+        """
+        Attaches a new trail to the state, the search starts with the first run().
+
+        Parameters:
+        - state: The state to search on, needs get_trail() and set_trail().
+        - choose, assign, is_solution: See the class docstring.
+        """
+        self.__state = state
+        self.__choose = choose
+        self.__assign = assign
+        self.__is_solution = is_solution
+
+        self.__trail = Trail()
+        self.__previous_trail = state.get_trail()
+        state.set_trail(self.__trail)
+
+        self.__stack: List[Frame] = []
+        self.__started = False
+        self.__exhausted = False
+        # number of candidates assigned over all runs
+        self.__nodes = 0
+
+    def run(self, budget: Union[None, int] = None) -> SearchStatus:
+        """
+        Searches until the state holds the next solution or no branch is left.
+
+        Parameters:
+        - budget (Union[None, int]): The maximum number of candidates to assign in
+          this run, None for no limit.
+
+        Returns:
+        - SearchStatus: SOLVED if the state holds a solution, PAUSED if the budget
+          ran out first and EXHAUSTED if there is no further solution.
+
+        Raises:
+        - ValueError: If the budget is negative.
+        """
+        if budget is not None and budget < 0:
+            raise ValueError("Budget: {} needs to be at least 0".format(budget))
+        if self.__exhausted:
+            return SearchStatus.EXHAUSTED
+
+        trail, stack = self.__trail, self.__stack
+        if not self.__started:
+            self.__started = True
+            if self.__is_solution(self.__state):
+                # a solved state has no branches, the next run ends the search
+                self.__exhausted = True
+                return SearchStatus.SOLVED
+            self.__push()
+
+        steps = 0
+        while stack:
+            frame = stack[-1]
+            # undoes the candidate tried last on this level, if any
+            trail.undo(frame.mark)
+            if budget is not None and steps >= budget:
+                return SearchStatus.PAUSED
+
+            candidate = next(frame.remaining, None)
+            if candidate is None:
+                stack.pop()
+                continue
+
+            steps += 1
+            self.__nodes += 1
+            if not self.__assign(self.__state, frame.variable, candidate):
+                continue
+            if self.__is_solution(self.__state):
+                return SearchStatus.SOLVED
+            self.__push()
+
+        self.__exhausted = True
+        return SearchStatus.EXHAUSTED
+
+    def __push(self) -> None:
+        variable, candidates = self.__choose(self.__state)
+        self.__stack.append(Frame(variable, iter(candidates), self.__trail.mark()))
+
+    def close(self) -> None:
+        # restores the trail the state had before the search
+        self.__state.set_trail(self.__previous_trail)
+
+    def get_state(self) -> Any:
+        return self.__state
+
+    def get_trail(self) -> Trail:
+        return self.__trail
+
+    def get_depth(self) -> int:
+        return len(self.__stack)
+
+    def get_nodes(self) -> int:
+        return self.__nodes
+
+    def is_exhausted(self) -> bool:
+        return self.__exhausted
+
+
+def copy_search(
+    state: Any,
+    choose: Callable[[Any], Tuple[Any, Iterable]],
+    assign: Callable[[Any, Any, Any], Any],
+    is_solution: Callable[[Any], bool],
+) -> Any:
+    """
+    Depth first search that assigns every candidate on a copy of its parent state.
+
+    Like StackSearch the levels are kept on an explicit stack, so the depth isn't
+    bounded by the recursion limit, but a CopyFrame holds the parent state instead
+    of a trail mark. The given state isn't changed.
+
+    Parameters:
+    - state: The state to start from.
+    - choose: See StackSearch.
+    - assign(state, variable, candidate) -> Any: Returns a copy of the state with
+      the candidate assigned, or None if the copy got inconsistent.
+    - is_solution: See StackSearch.
+
+    Returns:
+    - Any: The first state that is a solution, or None if there is none.
+    """
+    if is_solution(state):
+        return state
+
+    stack: List[CopyFrame] = []
+    variable, candidates = choose(state)
+    stack.append(CopyFrame(state, variable, iter(candidates)))
+    while stack:
+        frame = stack[-1]
+        candidate = next(frame.remaining, None)
+        if candidate is None:
+            stack.pop()
+            continue
+
+        child = assign(frame.state, frame.variable, candidate)
+        if child is None:
+            continue
+        if is_solution(child):
+            return child
+        variable, candidates = choose(child)
+        stack.append(CopyFrame(child, variable, iter(candidates)))
+    return None
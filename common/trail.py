@@ -0,0 +1,53 @@
+from enum import Enum
+from typing import Any, Hashable, List, Tuple
+
+
+class SearchMode(Enum):
+    # every explored candidate works on a deep copy of the state
+    COPY = 1
+    # one state is mutated in place and changes are undone from a trail
+    TRAIL = 2
+
+
+class Trail:
+    """
+    Undo log for searches that mutate a single state in place.
+
+    Every write to a trailed object is recorded as (owner, key, old_value). To
+    backtrack, the search remembers a mark before assigning a candidate and undoes
+    all writes recorded after that mark by calling owner.restore(key, old_value)
+    in reverse order. Memory is bounded by the number of changes on the current
+    search path instead of one full copy of the state per level.
+
+    Methods:
+    - record(owner, key, old_value) -> None:
+        Records the value of owner[key] before it gets overwritten.
+
+    - mark() -> int:
+        Returns the current position of the trail.
+
+    - undo(mark: int) -> None:
+        Restores every write recorded after the given mark.
+    """
+
+    def __init__(self) -> None:
+        self.__entries: List[Tuple[Any, Hashable, Any]] = []
+
+    def record(self, owner: Any, key: Hashable, old_value: Any) -> None:
+        self.__entries.append((owner, key, old_value))
+
+    def mark(self) -> int:
+        return len(self.__entries)
+
+    def undo(self, mark: int) -> None:
+        entries = self.__entries
+        if mark < 0 or mark > len(entries):
+            raise ValueError(
+                "Mark: {} is not on the trail of length {}".format(mark, len(entries))
+            )
+        while len(entries) > mark:
+            owner, key, old_value = entries.pop()
+            owner.restore(key, old_value)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,104 @@
+"""
+Generalized arc consistency for a single AllDifferent house.
+
+The cells of a house and the digits form a bipartite graph with an edge for every
+candidate. A candidate can only be part of a solution of the house if its edge is
+in some matching that covers every cell (Regin's algorithm). With a maximum
+matching at hand those edges are the matched ones and the ones on an alternating
+cycle, which for a house with as many digits as cells means: cell c keeps digit d
+if c and the cell matched to d lie in the same strongly connected component of
+the graph c -> cell matched to any candidate of c.
+
+This removes the candidates of naked and hidden subsets of every size at once.
+"""
+
+from typing import List, Union
+from solver_v2.candidates import ALL_CANDIDATES, POPCOUNT
+
+
+def maximum_matching(masks: List[int]) -> List[int]:
+    """
+    Matches the cells of a house to pairwise different candidates.
+
+    Parameters:
+    - masks (List[int]): The candidate mask of every cell of the house.
+
+    Returns:
+    - List[int]: The single bit mask of the digit matched to every cell, 0 for
+      cells that can't be matched.
+    """
+    matched_cell = {}  # digit bit -> cell
+    matching = [0] * len(masks)
+    visited = 0  # the digits tried by the current search for a path
+
+    def augment(cell: int) -> bool:
+        # looks for an alternating path from the cell to a free digit
+        nonlocal visited
+        candidates = masks[cell]
+        while candidates & ~visited:
+            digit = candidates & ~visited & -(candidates & ~visited)
+            candidates ^= digit
+            visited |= digit
+            other = matched_cell.get(digit)
+            if other is None or augment(other):
+                matched_cell[digit] = cell
+                matching[cell] = digit
+                return True
+        return False
+
+    # cells with few candidates first, they have the least choice
+    for cell in sorted(range(len(masks)), key=lambda cell: POPCOUNT[masks[cell]]):
+        visited = 0
+        augment(cell)
+    return matching
+
+
+def consistent_masks(masks: List[int]) -> Union[None, List[int]]:
+    """
+    Removes the candidates of a house that no complete assignment of the house has.
+
+    Parameters:
+    - masks (List[int]): The candidate mask of every cell of the house, the house
+      has as many digits as cells.
+
+    Returns:
+    - Union[None, List[int]]: The pruned masks in the same order, None if the
+      cells can't be assigned pairwise different digits.
+    """
+    masks = [mask & ALL_CANDIDATES for mask in masks]
+    matching = maximum_matching(masks)
+    if not all(matching):
+        return None
+
+    cells = range(len(masks))
+    cell_of_digit = {digit: cell for cell, digit in enumerate(matching)}
+
+    # reach[c]: the cells reachable from c, a cell reaches the cells matched to
+    # its other candidates
+    reach = [0] * len(masks)
+    for cell in cells:
+        candidates = masks[cell] & ~matching[cell]
+        while candidates:
+            digit = candidates & -candidates
+            candidates ^= digit
+            reach[cell] |= 1 << cell_of_digit[digit]
+    # transitive closure, the houses are small enough for the cubic version
+    for middle in cells:
+        bit = 1 << middle
+        for cell in cells:
+            if reach[cell] & bit:
+                reach[cell] |= reach[middle]
+
+    pruned = []
+    for cell in cells:
+        mask = matching[cell]
+        candidates = masks[cell] & ~mask
+        while candidates:
+            digit = candidates & -candidates
+            candidates ^= digit
+            other = cell_of_digit[digit]
+            # on a cycle through the matched edge of the other cell
+            if reach[other] >> cell & 1:
+                mask |= digit
+        pruned.append(mask)
+    return pruned
@@ -0,0 +1,190 @@
+"""
+Solving many puzzles on a process pool.
+
+solve_many fans the puzzles out to worker processes in chunks and streams back one
+SolveResult per puzzle, either in the order of the input or as they finish.
+"""
+
+from enum import Enum
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+import os
+import threading
+import time
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics, ValueOrdering
+from solver_v2.sudokuGrid import InvalidSudokuInput
+from solver_v2.techniques import PipelinePolicy, Technique, default_techniques
+from common.trail import SearchMode
+
+
+class Status(Enum):
+    SOLVED = "SOLVED"
+    NO_SOLUTION = "NO_SOLUTION"
+    INVALID = "INVALID"
+
+
+class SolveResult(NamedTuple):
+    index: int  # position of the puzzle in the input
+    puzzle: str
+    solution: Union[None, str]  # 81 digits, None unless SOLVED
+    status: Status
+    seconds: float
+    nodes: int = 0  # candidates tried by the search
+
+
+class SolveOptions(NamedTuple):
+    grid_class: type = BitmaskGrid
+    heuristic: Union[None, Heuristics] = Heuristics.LEAST_VALUES
+    search_mode: SearchMode = SearchMode.TRAIL
+    value_ordering: ValueOrdering = ValueOrdering.FIRST
+    arc_consistency: bool = False
+    subsets: bool = False
+    fish: bool = False
+    policy: PipelinePolicy = PipelinePolicy.RESTART
+
+
+# the techniques of the ADAPTIVE policy in this process by (subsets,
+# arc_consistency, fish), their schedules adapt to all puzzles the process solves
+_adaptive_techniques: Dict[Tuple[bool, bool, bool], List[Technique]] = {}
+
+
+def _techniques(options: SolveOptions) -> Union[None, List[Technique]]:
+    # None lets SudokuCSP build a fresh pipeline from the flags
+    if options.policy != PipelinePolicy.ADAPTIVE:
+        return None
+    key = (options.subsets, options.arc_consistency, options.fish)
+    if key not in _adaptive_techniques:
+        _adaptive_techniques[key] = default_techniques(
+            options.subsets, options.arc_consistency, options.fish
+        )
+    return _adaptive_techniques[key]
+
+
+def solve_one(
+    index: int, puzzle: str, options: SolveOptions = SolveOptions()
+) -> SolveResult:
+    """
+    Solves a single puzzle the way the workers of solve_many do.
+
+    Parameters:
+    - index (int): The position of the puzzle in the input, returned unchanged.
+    - puzzle (str): 81 digits, 0 for empty cells.
+    - options (SolveOptions): The grid class, heuristic, search mode and value
+      ordering to use. With the ADAPTIVE policy the puzzles solved in a process
+      share their techniques, so the schedules carry over from puzzle to puzzle.
+
+    Returns:
+    - SolveResult: The solution and status of the puzzle, seconds is the time taken
+      to parse and solve it and nodes the number of candidates tried.
+    """
+    start_time = time.perf_counter()
+    try:
+        sudoku = SudokuCSP(
+            options.grid_class(puzzle),
+            options.heuristic,
+            options.search_mode,
+            options.value_ordering,
+            options.arc_consistency,
+            options.subsets,
+            options.fish,
+            _techniques(options),
+            options.policy,
+        )
+    except InvalidSudokuInput:
+        return SolveResult(
+            index, puzzle, None, Status.INVALID, time.perf_counter() - start_time
+        )
+
+    sudoku.fill_in_candidates()
+    solution = None
+    if sudoku.grid.valid_board() and sudoku.logical_deduction(sudoku.grid):
+        solution = sudoku.solve()
+    seconds = time.perf_counter() - start_time
+
+    if solution is None:
+        return SolveResult(
+            index, puzzle, None, Status.NO_SOLUTION, seconds, sudoku.nodes
+        )
+    return SolveResult(
+        index,
+        puzzle,
+        "".join(str(cell[0]) for cell in solution),
+        Status.SOLVED,
+        seconds,
+        sudoku.nodes,
+    )
+
+
+def _solve_task(task: Tuple[int, str, SolveOptions]) -> SolveResult:
+    # Pool.imap passes a single argument
+    return solve_one(*task)
+
+
+def solve_many(
+    puzzles: Iterable[str],
+    workers: Union[None, int] = None,
+    chunksize: int = 64,
+    ordered: bool = True,
+    options: SolveOptions = SolveOptions(),
+) -> Iterator[SolveResult]:
+    """
+    Solves puzzles on a pool of worker processes.
+
+    The puzzles are consumed lazily and the results are streamed back, so neither
+    has to fit into memory at once: at most 2 * workers * chunksize puzzles are
+    handed to the pool before their results are consumed. The pool is shut down when
+    the iterator is exhausted or closed.
+
+    Parameters:
+    - puzzles (Iterable[str]): The puzzles as strings of 81 digits, e.g. the lines of
+      a corpus.
+    - workers (Union[None, int]): The number of processes, os.cpu_count() if None.
+      1 solves the puzzles in the calling process without a pool.
+    - chunksize (int): The number of puzzles sent to a worker at once. Larger chunks
+      cut the communication overhead, smaller ones balance hard puzzles better.
+    - ordered (bool): Yields the results in the order of the puzzles if True,
+      otherwise as soon as they are solved (use SolveResult.index to match them).
+    - options (SolveOptions): The grid class, heuristic, search mode and value
+      ordering to use.
+
+    Returns:
+    - Iterator[SolveResult]: One result per puzzle.
+
+    Raises:
+    - ValueError: If workers or chunksize is smaller than 1.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Workers: {} needs to be at least 1".format(workers))
+    if chunksize < 1:
+        raise ValueError("Chunksize: {} needs to be at least 1".format(chunksize))
+
+    tasks = ((index, puzzle, options) for index, puzzle in enumerate(puzzles))
+    if workers == 1:
+        yield from map(_solve_task, tasks)
+        return
+
+    # the pool feeds the tasks from a thread, which is held back by the permits
+    # instead of reading the whole input ahead of the workers
+    permits = threading.Semaphore(2 * workers * chunksize)
+    stopped = threading.Event()
+
+    def throttled_tasks() -> Iterator[Tuple[int, str, SolveOptions]]:
+        for task in tasks:
+            permits.acquire()
+            if stopped.is_set():
+                return
+            yield task
+
+    with Pool(workers) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        try:
+            for result in imap(_solve_task, throttled_tasks(), chunksize):
+                permits.release()
+                yield result
+        finally:
+            # wakes the feeding thread up, so the pool can be terminated
+            stopped.set()
+            permits.release()
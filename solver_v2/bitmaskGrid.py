@@ -0,0 +1,261 @@
+from typing import Union, Tuple, List, Iterator
+import numpy as np
+from solver_v2.candidates import (
+    DIGITS,
+    UNFILLED,
+    MASK_TO_DIGITS,
+    POPCOUNT,
+    POPCOUNT_ARRAY,
+    SINGLE_DIGIT,
+    to_mask,
+)
+from common.houses import ROWS, COLUMNS
+from solver_v2.candidateCounts import CandidateCounts
+from solver_v2.placedDigits import PlacedDigits
+from solver_v2.sudokuGrid import InvalidSudokuInput
+from common.trail import Trail
+
+
+class BitmaskGrid:
+    """
+    Represents a Sudoku grid as a contiguous array of candidate bitmasks.
+
+    Every cell is stored as a uint16 mask with bit d set if d is a candidate of the
+    cell (see solver_v2.candidates). The grid exposes the same get_cell/set_cell/
+    valid_board API as SudokuGrid, so SudokuCSP can run on either of them, but a
+    copy of the whole grid is a single memcpy of ROWS * COLUMNS * 2 bytes.
+
+    Attributes:
+    - masks (np.ndarray): A 2D uint16 NumPy array holding the mask of every cell.
+
+    Methods:
+    - get_cell(position) / set_cell(position, new_value):
+        Read and write a cell as a list of candidates, like SudokuGrid.
+
+    - get_mask(index) / set_mask(index, mask):
+        Read and write a cell as a bitmask, addressed by its flat index row * 9 + column.
+
+    Raises:
+    - InvalidSudokuInput: If the length of the input string is not equal to ROWS * COLUMNS,
+      or if the input string contains a character that is not a digit.
+    """
+
+    def __init__(self, sudoku_str: Union[None, str] = None) -> None:
+        """
+        Initializes a BitmaskGrid object.
+
+        Parameters:
+        - sudoku_str (Union[None, str]): Optional. If provided, a string containing digits representing the Sudoku grid.
+          If None, the grid will be initialized with zeros.
+
+        Raises:
+        - InvalidSudokuInput: If the provided sudoku string has an invalid length or contains a character that is not a digit.
+        """
+        if type(sudoku_str) is str:
+            masks = self.__parse_sudoku(sudoku_str)
+        else:
+            masks = np.full((ROWS, COLUMNS), UNFILLED, dtype=np.uint16)
+
+        self.__set_masks(masks)
+
+    def __set_masks(
+        self,
+        masks: np.ndarray,
+        placed_digits: Union[None, PlacedDigits] = None,
+        candidate_counts: Union[None, CandidateCounts] = None,
+    ) -> None:
+        self.__masks = masks
+        # flat view on the same memory, used for index based access
+        self.__flat = masks.reshape(ROWS * COLUMNS)
+        self.__trail: Union[None, Trail] = None
+
+        if placed_digits is None:
+            placed_digits = PlacedDigits()
+            for index, mask in enumerate(self.__flat.tolist()):
+                placed_digits.update(index, 0, SINGLE_DIGIT[mask])
+        self.__placed_digits = placed_digits
+
+        if candidate_counts is None:
+            candidate_counts = CandidateCounts(
+                [POPCOUNT[mask] for mask in self.__flat.tolist()]
+            )
+        self.__candidate_counts = candidate_counts
+
+    def __parse_sudoku(self, grid_str: str) -> np.ndarray:
+        """
+        Parse a string representing a Sudoku grid into a 2D NumPy array of masks.
+
+        Parameters:
+        - grid_str (str): A string containing digits representing the Sudoku grid.
+
+        Returns:
+        - np.ndarray: A 2D uint16 NumPy array with one single bit set per cell.
+
+        Raises:
+        - InvalidSudokuInput: If the length of the input string is not equal to ROWS * COLUMNS,
+          or if the input string contains a character that is not a digit.
+        """
+        if len(grid_str) != ROWS * COLUMNS:
+            raise InvalidSudokuInput(
+                "Length or parsed sudoku needs to be {}, but is {}".format(
+                    ROWS * COLUMNS, len(grid_str)
+                )
+            )
+
+        try:
+            digits = np.frombuffer(grid_str.encode("ascii"), dtype=np.uint8) - ord("0")
+        except UnicodeEncodeError:
+            digits = None
+
+        # characters below "0" wrap around and end up above 9 as well
+        if digits is None or np.any(digits >= DIGITS):
+            raise InvalidSudokuInput(
+                "Parsed sudoku contains character that is not a digit"
+            )
+
+        return np.left_shift(np.uint16(1), digits.astype(np.uint16)).reshape(
+            ROWS, COLUMNS
+        )
+
+    def valid_board(self) -> bool:
+        """
+        Checks that no digit is placed twice in a row, column or block.
+
+        Only cells with exactly one candidate (other than the placeholder 0) count as
+        placed. Conflicts are counted on every write (see PlacedDigits), so this is a
+        constant time read.
+
+        Returns:
+        - bool: True if no house contains a digit twice.
+        """
+        return self.__placed_digits.valid()
+
+    def get_cell(self, position: Tuple[int, int]) -> List[int]:
+        row, column = position
+        if row < 0 or column < 0:
+            raise IndexError("out of bounds for position ({},{})".format(row, column))
+
+        return list(MASK_TO_DIGITS[self.__masks[row, column]])
+
+    def set_cell(self, position: Tuple[int, int], new_value: list) -> None:
+        row, column = position
+        if row < 0 or column < 0:
+            raise IndexError("out of bounds for position ({},{})".format(row, column))
+        if not isinstance(new_value, list):
+            raise TypeError(
+                "Value has be of type list and not type: {}".format(type(new_value))
+            )
+        self.set_mask(row * COLUMNS + column, to_mask(new_value))
+
+    def get_mask(self, index: int) -> int:
+        return int(self.__flat[index])
+
+    def set_mask(self, index: int, mask: int) -> None:
+        old_mask = self.__flat[index]
+        if self.__trail is not None:
+            self.__trail.record(self, index, old_mask)
+        self.__track(index, old_mask, mask)
+        self.__flat[index] = mask
+
+    def __track(self, index: int, old_mask: int, new_mask: int) -> None:
+        self.__placed_digits.update(
+            index, SINGLE_DIGIT[old_mask], SINGLE_DIGIT[new_mask]
+        )
+        self.__candidate_counts.update(index, POPCOUNT[old_mask], POPCOUNT[new_mask])
+
+    def restore(self, index: int, old_mask: int) -> None:
+        # called by the trail to undo a write, must not be recorded again
+        self.__track(index, self.__flat[index], old_mask)
+        self.__flat[index] = old_mask
+
+    def set_trail(self, trail: Union[None, Trail]) -> None:
+        """
+        Records every following write on the given trail, so it can be undone.
+
+        Parameters:
+        - trail (Union[None, Trail]): The trail to record on, None stops recording.
+        """
+        self.__trail = trail
+
+    def get_trail(self) -> Union[None, Trail]:
+        return self.__trail
+
+    def get_candidate_counts(self) -> CandidateCounts:
+        return self.__candidate_counts
+
+    def get_masks(self) -> np.ndarray:
+        """
+        Returns a read only view on the masks of all cells in row major order.
+
+        Returns:
+        - np.ndarray: A 1D uint16 NumPy array of length ROWS * COLUMNS.
+        """
+        masks = self.__flat.view()
+        masks.flags.writeable = False
+        return masks
+
+    def get_shape(self) -> Tuple[int, int]:
+        return self.__masks.shape
+
+    def candidates_to_remove(self) -> int:
+        return int(POPCOUNT_ARRAY[self.__flat].sum()) - ROWS * COLUMNS
+
+    def sum_of_unassigned_variables(self) -> int:
+        return int(np.count_nonzero(POPCOUNT_ARRAY[self.__flat] != 1))
+
+    def copy(self) -> "BitmaskGrid":
+        # the copy doesn't share the trail of the original grid
+        grid = BitmaskGrid.__new__(BitmaskGrid)
+        grid.__set_masks(
+            self.__masks.copy(),
+            self.__placed_digits.copy(),
+            self.__candidate_counts.copy(),
+        )
+        return grid
+
+    def __deepcopy__(self, memo) -> "BitmaskGrid":
+        return self.copy()
+
+    def __getstate__(self) -> dict:
+        # the flat view would be pickled as an array of its own, the trail isn't sent
+        return {
+            "masks": self.__masks,
+            "placed_digits": self.__placed_digits,
+            "candidate_counts": self.__candidate_counts,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__set_masks(
+            state["masks"], state["placed_digits"], state["candidate_counts"]
+        )
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for mask in self.__flat:
+            yield list(MASK_TO_DIGITS[mask])
+
+    def __str__(self) -> str:
+        """
+        Returns a formatted string representation of the Sudoku puzzle.
+
+        Returns:
+        - str: The formatted string representation of the Sudoku puzzle.
+        """
+
+        result = ""
+        for index, cell in enumerate(self):
+            if index % (COLUMNS / 3) == 0 and index != 0 and index % 9 != 0:
+                result += "| "
+            if index % COLUMNS == 0 and index != 0:
+                result += "\n"
+            if index % (ROWS * 3) == 0 and index != 0:
+                result += "-" * 39 + "\n"
+            result += f"{cell} "
+
+        return result.strip()
+
+
+if __name__ == "__main__":
+    grid = BitmaskGrid(
+        "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+    )
+    print(grid)
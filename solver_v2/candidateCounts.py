@@ -0,0 +1,82 @@
+from typing import List, Set, Union
+from solver_v2.candidates import DIGITS
+from common.houses import PEER_TUPLES
+
+
+class CandidateCounts:
+    """
+    Keeps the cells of a grid in buckets by their number of candidates.
+
+    The grids report every change of a cell with update(), so the cell with the
+    fewest candidates (minimum remaining values) is found by looking at the lowest
+    non empty bucket instead of scanning all 81 cells. Ties can be broken by the
+    degree of a cell, its number of undecided peers, which is only computed for the
+    cells of that bucket.
+
+    A cell counts as decided if it has exactly one candidate, like in
+    SudokuCSP.valid_solution.
+
+    Methods:
+    - update(index: int, old_count: int, new_count: int) -> None:
+        Registers that the number of candidates of a cell changed.
+
+    - fewest_candidates(by_degree: bool = False) -> Union[None, int]:
+        Returns an undecided cell with the fewest candidates.
+
+    - get_degree(index: int) -> int:
+        Returns the number of undecided peers of a cell.
+    """
+
+    def __init__(self, counts: List[int]) -> None:
+        """
+        Parameters:
+        - counts (List[int]): The number of candidates of every cell by flat index.
+        """
+        self.__counts = list(counts)
+        self.__buckets: List[Set[int]] = [set() for _ in range(DIGITS + 1)]
+        for index, count in enumerate(counts):
+            self.__buckets[count].add(index)
+
+    def update(self, index: int, old_count: int, new_count: int) -> None:
+        if old_count != new_count:
+            self.__counts[index] = new_count
+            self.__buckets[old_count].discard(index)
+            self.__buckets[new_count].add(index)
+
+    def fewest_candidates(self, by_degree: bool = False) -> Union[None, int]:
+        """
+        Returns the undecided cell with the fewest candidates, if several cells have
+        as few candidates the first of them.
+
+        Parameters:
+        - by_degree (bool): Breaks ties by the most undecided peers instead, the
+          cell constrains the most other cells.
+
+        Returns:
+        - Union[None, int]: The flat index of the cell, None if every cell is decided
+          or has no candidates left.
+        """
+        for count in range(2, DIGITS + 1):
+            bucket = self.__buckets[count]
+            if not bucket:
+                continue
+            if not by_degree or len(bucket) == 1:
+                return min(bucket)
+            return max(bucket, key=lambda index: (self.get_degree(index), -index))
+        return None
+
+    def get_count(self, index: int) -> int:
+        return self.__counts[index]
+
+    def get_degree(self, index: int) -> int:
+        counts = self.__counts
+        return sum(counts[peer] != 1 for peer in PEER_TUPLES[index])
+
+    def copy(self) -> "CandidateCounts":
+        candidate_counts = CandidateCounts.__new__(CandidateCounts)
+        candidate_counts.__counts = self.__counts.copy()
+        candidate_counts.__buckets = [bucket.copy() for bucket in self.__buckets]
+        return candidate_counts
+
+    def __deepcopy__(self, memo) -> "CandidateCounts":
+        return self.copy()
@@ -0,0 +1,56 @@
+from typing import List, Tuple
+import numpy as np
+
+DIGITS = 10
+
+# bit d of a mask is set if the digit d is a candidate of the cell.
+# bit 0 stands for the placeholder [0] of a cell that wasn't filled in yet,
+# which keeps the empty mask free to represent a cell without any candidates.
+UNFILLED = 1
+ALL_CANDIDATES = sum(1 << digit for digit in range(1, DIGITS))
+
+# lookup tables for every possible mask
+MASK_TO_DIGITS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(digit for digit in range(DIGITS) if mask >> digit & 1)
+    for mask in range(1 << DIGITS)
+)
+POPCOUNT: Tuple[int, ...] = tuple(len(digits) for digits in MASK_TO_DIGITS)
+POPCOUNT_ARRAY = np.array(POPCOUNT, dtype=np.uint8)
+# the digit of a cell with exactly one candidate, 0 for every other mask
+SINGLE_DIGIT: Tuple[int, ...] = tuple(
+    digits[0] if len(digits) == 1 else 0 for digits in MASK_TO_DIGITS
+)
+
+
+def to_mask(candidates: List[int]) -> int:
+    """
+    Encodes a list of candidates as a bitmask.
+
+    Parameters:
+    - candidates (list): The candidates of a cell, e.g. [1, 4, 9] or [0].
+
+    Returns:
+    - int: The bitmask with bit d set for every candidate d.
+
+    Raises:
+    - ValueError: If a candidate is not a digit between 0 and 9.
+    """
+    mask = 0
+    for candidate in candidates:
+        if not 0 <= candidate < DIGITS:
+            raise ValueError("Candidate: {} is not a digit".format(candidate))
+        mask |= 1 << int(candidate)
+    return mask
+
+
+def to_candidates(mask: int) -> List[int]:
+    """
+    Decodes a bitmask into the sorted list of its candidates.
+
+    Parameters:
+    - mask (int): The bitmask of a cell.
+
+    Returns:
+    - list: The candidates, e.g. [1, 4, 9] for the mask 0b1000010010.
+    """
+    return list(MASK_TO_DIGITS[mask])
@@ -0,0 +1,288 @@
+"""
+Bulk loading of puzzle corpora.
+
+A corpus is a text file with one puzzle of ROWS * COLUMNS digits per line, 0 for an
+empty cell. Instead of building a grid per line, the whole buffer is parsed in one
+vectorized pass into an (N, 81) uint8 array of digits (parse_puzzles), or the file
+is memory mapped and grids are built per puzzle on demand (PuzzleCorpus).
+"""
+
+from typing import BinaryIO, Iterator, List, Tuple, Union
+import os
+import numpy as np
+from solver_v2.candidates import DIGITS
+from common.houses import CELLS
+from solver_v2.sudokuGrid import InvalidSudokuInput, SudokuGrid
+
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+
+# number of offending line numbers listed in an error message
+REPORTED_LINES = 10
+
+
+class InvalidCorpusInput(InvalidSudokuInput):
+    """
+    Raised if lines of a corpus aren't valid puzzles.
+
+    Attributes:
+    - lines (List[int]): The 1-based numbers of all offending lines.
+    """
+
+    def __init__(self, message: str, lines: List[int]) -> None:
+        listed = ", ".join(str(line) for line in lines[:REPORTED_LINES])
+        if len(lines) > REPORTED_LINES:
+            listed += ", ... ({} lines)".format(len(lines))
+        super().__init__("{} in line: {}".format(message, listed))
+        self.lines = lines
+
+
+def parse_puzzles(buffer: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    Parses newline separated puzzles into an array of digits.
+
+    Lines may end with "\\n" or "\\r\\n", a missing newline after the last line is fine.
+
+    Parameters:
+    - buffer (Union[bytes, bytearray, memoryview]): The content of a corpus.
+
+    Returns:
+    - np.ndarray: A (N, 81) uint8 NumPy array, row i holds the digits of line i + 1.
+
+    Raises:
+    - InvalidCorpusInput: If a line doesn't have 81 characters or contains a
+      character that is not a digit, listing the offending line numbers.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if data.size == 0:
+        return np.empty((0, CELLS), dtype=np.uint8)
+
+    ends = np.flatnonzero(data == NEWLINE)
+    if data[-1] != NEWLINE:
+        ends = np.append(ends, data.size)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+
+    lengths = ends - starts
+    # drop the "\r" of windows line endings
+    crlf = lengths > 0
+    crlf[crlf] = data[ends[crlf] - 1] == CARRIAGE_RETURN
+    lengths -= crlf
+
+    wrong_length = np.flatnonzero(lengths != CELLS)
+    if wrong_length.size:
+        raise InvalidCorpusInput(
+            "Length of parsed sudoku needs to be {}".format(CELLS),
+            (wrong_length + 1).tolist(),
+        )
+
+    strides = np.diff(starts)
+    if strides.size == 0 or np.all(strides == strides[0]):
+        # every line has the same ending, the buffer is a 2D array with padding
+        stride = int(strides[0]) if strides.size else CELLS
+        rows = np.lib.stride_tricks.as_strided(
+            data[starts[0] :],
+            shape=(starts.size, CELLS),
+            strides=(stride, 1),
+            writeable=False,
+        )
+    else:
+        rows = data[starts[:, None] + np.arange(CELLS)]
+
+    # characters below "0" wrap around and end up above 9 as well
+    digits = rows - np.uint8(ord("0"))
+    not_a_digit = np.flatnonzero(np.any(digits >= DIGITS, axis=1))
+    if not_a_digit.size:
+        raise InvalidCorpusInput(
+            "Parsed sudoku contains character that is not a digit",
+            (not_a_digit + 1).tolist(),
+        )
+    return digits
+
+
+def load_puzzles(source: Union[str, BinaryIO]) -> np.ndarray:
+    """
+    Reads a corpus from a file and parses it with parse_puzzles.
+
+    Parameters:
+    - source (Union[str, BinaryIO]): The path of the corpus or a file opened in
+      binary mode.
+
+    Returns:
+    - np.ndarray: A (N, 81) uint8 NumPy array of digits.
+
+    Raises:
+    - InvalidCorpusInput: If a line of the corpus isn't a valid puzzle.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            return parse_puzzles(file.read())
+    return parse_puzzles(source.read())
+
+
+class PuzzleCorpus:
+    """
+    Memory maps a corpus of fixed width lines for random access.
+
+    The file isn't read into memory: get_view() is a zero-copy view on the mapped
+    pages, so worker processes opening the same corpus share the page cache. Digits,
+    strings and grids are only built for the puzzles that are accessed. A corpus is
+    pickled by its path, a worker maps the file again instead of receiving a copy.
+
+    Methods:
+    - __len__() -> int:
+        Returns the number of puzzles.
+
+    - __getitem__(key: Union[int, slice]) -> np.ndarray:
+        Returns the digits of a puzzle as (81,) or of a slice as (k, 81) uint8 array.
+
+    - get_view() -> np.ndarray:
+        Returns the (N, 81) uint8 view on the characters of the file.
+
+    - get_string(index: int) -> str / get_grid(index: int, grid_class) -> grid:
+        Builds the input of an engine for a single puzzle.
+
+    - shard(shard: int, shards: int) -> range / iter_shard(shard, shards):
+        Splits the corpus into contiguous parts, e.g. one per worker.
+
+    Raises:
+    - InvalidCorpusInput: If the lines of the file don't all have 81 characters or
+      (if validated) contain a character that is not a digit.
+    """
+
+    def __init__(self, path: str, validate: bool = True) -> None:
+        """
+        Opens and memory maps a corpus.
+
+        Parameters:
+        - path (str): The path of the corpus, lines end with "\\n" or "\\r\\n".
+        - validate (bool): Checks all characters to be digits, which reads the whole
+          file once. Skip it for corpora that are known to be valid.
+
+        Raises:
+        - InvalidCorpusInput: If the file isn't a corpus of fixed width lines.
+        """
+        self.__path = path
+        self.__view = self.__map(path)
+        if validate:
+            self.__validate()
+
+    def __map(self, path: str) -> np.ndarray:
+        if os.path.getsize(path) == 0:
+            return np.empty((0, CELLS), dtype=np.uint8)
+
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        # the ending of the first line fixes the width of every line
+        ending = data[CELLS : CELLS + 2].tobytes()
+        if data.size == CELLS:
+            stride = CELLS
+        elif ending[:1] == b"\n":
+            stride = CELLS + 1
+        elif ending == b"\r\n":
+            stride = CELLS + 2
+        else:
+            raise InvalidCorpusInput(
+                "Length of parsed sudoku needs to be {}".format(CELLS), [1]
+            )
+
+        # the ending of the last line is optional
+        puzzles = -(-data.size // stride)
+        endings = np.lib.stride_tricks.as_strided(
+            data[CELLS:],
+            shape=(min(puzzles - 1, data.size // stride), stride - CELLS),
+            strides=(stride, 1),
+            writeable=False,
+        )
+        expected = np.frombuffer(ending[: stride - CELLS], dtype=np.uint8)
+        wrong_length = np.flatnonzero(np.any(endings != expected, axis=1)) + 1
+        if not wrong_length.size and data.size not in (
+            puzzles * stride,
+            (puzzles - 1) * stride + CELLS,
+        ):
+            wrong_length = np.array([puzzles])
+        if wrong_length.size:
+            raise InvalidCorpusInput(
+                "Length of parsed sudoku needs to be {}".format(CELLS),
+                wrong_length.tolist(),
+            )
+
+        return np.lib.stride_tricks.as_strided(
+            data, shape=(puzzles, CELLS), strides=(stride, 1), writeable=False
+        )
+
+    def __validate(self) -> None:
+        # characters below "0" wrap around and end up above 9 as well
+        not_a_digit = np.flatnonzero(
+            np.any(self.__view - np.uint8(ord("0")) >= DIGITS, axis=1)
+        )
+        if not_a_digit.size:
+            raise InvalidCorpusInput(
+                "Parsed sudoku contains character that is not a digit",
+                (not_a_digit + 1).tolist(),
+            )
+
+    def get_path(self) -> str:
+        return self.__path
+
+    def get_view(self) -> np.ndarray:
+        return self.__view
+
+    def __len__(self) -> int:
+        return self.__view.shape[0]
+
+    def __getitem__(self, key: Union[int, slice]) -> np.ndarray:
+        return self.__view[key] - np.uint8(ord("0"))
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_string(self, index: int) -> str:
+        return self.__view[index].tobytes().decode("ascii")
+
+    def get_grid(self, index: int, grid_class: type = SudokuGrid):
+        """
+        Builds a grid for a single puzzle of the corpus.
+
+        Parameters:
+        - index (int): The index of the puzzle, 0 is the first line.
+        - grid_class (type): SudokuGrid, BitmaskGrid or any class that takes the
+          sudoku string.
+
+        Returns:
+        - The grid holding the puzzle.
+        """
+        return grid_class(self.get_string(index))
+
+    def shard(self, shard: int, shards: int) -> range:
+        """
+        Returns the indices of one of shards contiguous, equally sized parts.
+
+        Parameters:
+        - shard (int): The part, between 0 and shards - 1.
+        - shards (int): The number of parts, e.g. the number of workers.
+
+        Returns:
+        - range: The indices of the puzzles in the part.
+
+        Raises:
+        - ValueError: If shard isn't one of the shards parts.
+        """
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(
+                "Shard: {} is not in range of {} shards".format(shard, shards)
+            )
+        return range(len(self) * shard // shards, len(self) * (shard + 1) // shards)
+
+    def iter_shard(self, shard: int, shards: int) -> Iterator[Tuple[int, np.ndarray]]:
+        for index in self.shard(shard, shards):
+            yield index, self[index]
+
+    def __getstate__(self) -> dict:
+        # map the file again when unpickled instead of copying the pages
+        return {"path": self.__path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__path = state["path"]
+        self.__view = self.__map(self.__path)
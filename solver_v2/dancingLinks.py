@@ -0,0 +1,235 @@
+"""
+Dancing Links (Knuth's Algorithm X) engine for the exact cover form of a sudoku.
+
+Every candidate (cell, digit) is a row that covers 4 of the 324 constraints:
+the cell is filled, and the digit appears in the row, the column and the block of
+the cell. A solution is a set of rows covering every constraint exactly once.
+"""
+
+from typing import Iterator, List, Tuple, Union
+from solver_v2.candidates import DIGITS
+from common.houses import CELLS, cell_position
+from solver_v2.sudokuGrid import SudokuGrid
+
+# cell, row-digit, column-digit and block-digit constraints
+CONSTRAINTS = 4 * CELLS
+ROOT = 0
+
+
+def _constraints(index: int, digit: int) -> Tuple[int, int, int, int]:
+    # the constraint columns (1-based, 0 is the root) covered by a candidate
+    row, column = cell_position(index)
+    block = (row // 3) * 3 + column // 3
+    offset = digit - 1
+    return (
+        1 + index,
+        1 + CELLS + row * 9 + offset,
+        1 + 2 * CELLS + column * 9 + offset,
+        1 + 3 * CELLS + block * 9 + offset,
+    )
+
+
+def _links() -> Tuple[List[int], ...]:
+    # the links of the full matrix, copied for every search
+    headers = CONSTRAINTS + 1
+    left = [header - 1 for header in range(headers)]
+    right = [header + 1 for header in range(headers)]
+    left[ROOT], right[CONSTRAINTS] = CONSTRAINTS, ROOT
+    up = list(range(headers))
+    down = list(range(headers))
+    column = list(range(headers))
+    size = [0] * headers
+    candidate = [(0, 0)] * headers
+    # the node of every candidate in its cell constraint
+    cell_nodes = [[0] * DIGITS for _ in range(CELLS)]
+
+    for index in range(CELLS):
+        for digit in range(1, DIGITS):
+            first = len(column)
+            cell_nodes[index][digit] = first
+            for offset, header in enumerate(_constraints(index, digit)):
+                node = first + offset
+                left.append(first + (offset - 1) % 4)
+                right.append(first + (offset + 1) % 4)
+                up.append(up[header])
+                down.append(header)
+                down[up[header]] = node
+                up[header] = node
+                column.append(header)
+                size[header] += 1
+                candidate.append((index, digit))
+
+    return left, right, up, down, column, size, candidate, cell_nodes
+
+
+_LEFT, _RIGHT, _UP, _DOWN, _COLUMN, _SIZE, _CANDIDATE, _CELL_NODES = _links()
+
+
+class DancingLinks:
+    """
+    Solves a sudoku as exact cover problem with Dancing Links.
+
+    The links of the 729 x 324 matrix are built fresh for every search from a
+    template, so the engine can be searched several times.
+
+    Methods:
+    - solve() -> Union[None, SudokuGrid]:
+        Returns the first solution found or None.
+
+    - count_solutions(limit: Union[None, int] = None) -> int:
+        Counts the solutions, stopping as soon as limit solutions are found.
+
+    - iter_solutions() -> Iterator[SudokuGrid]:
+        Enumerates all solutions.
+
+    Raises:
+    - InvalidSudokuInput: If the sudoku string isn't 81 digits.
+    """
+
+    def __init__(self, sudoku_str: str) -> None:
+        """
+        Initializes the engine with a puzzle.
+
+        Parameters:
+        - sudoku_str (str): 81 digits like the input of SudokuGrid, 0 for empty cells.
+
+        Raises:
+        - InvalidSudokuInput: If the sudoku string has an invalid length or contains a
+          character that is not a digit.
+        """
+        grid = SudokuGrid(sudoku_str)
+        self.__givens: List[int] = [cell[0] for cell in grid]
+        self.__nodes = 0
+
+    def solve(self) -> Union[None, SudokuGrid]:
+        for solution in self.iter_solutions():
+            return solution
+        return None
+
+    def count_solutions(self, limit: Union[None, int] = None) -> int:
+        """
+        Counts the solutions of the puzzle.
+
+        Parameters:
+        - limit (Union[None, int]): Stops the search after limit solutions, e.g. 2 to
+          check that a puzzle has a unique solution. None counts all of them.
+
+        Returns:
+        - int: The number of solutions, at most limit.
+        """
+        solutions = 0
+        if limit is not None and limit <= 0:
+            return solutions
+        for _ in self.__search():
+            solutions += 1
+            if solutions == limit:
+                break
+        return solutions
+
+    def iter_solutions(self) -> Iterator[SudokuGrid]:
+        for digits in self.__search():
+            yield SudokuGrid("".join(str(digit) for digit in digits))
+
+    def get_nodes(self) -> int:
+        # the number of candidates tried by the last search
+        return self.__nodes
+
+    def __search(self) -> Iterator[List[int]]:
+        """
+        Runs Algorithm X on fresh links with the givens already selected.
+
+        Returns:
+        - Iterator[List[int]]: The 81 digits of every solution, the list is reused
+          between solutions and only valid until the next one is requested.
+        """
+        left, right, up, down = _LEFT[:], _RIGHT[:], _UP[:], _DOWN[:]
+        column, size, candidate = _COLUMN, _SIZE[:], _CANDIDATE
+        digits = self.__givens[:]
+        self.__nodes = 0
+
+        def cover(header: int) -> None:
+            right[left[header]] = right[header]
+            left[right[header]] = left[header]
+            row = down[header]
+            while row != header:
+                node = right[row]
+                while node != row:
+                    up[down[node]] = up[node]
+                    down[up[node]] = down[node]
+                    size[column[node]] -= 1
+                    node = right[node]
+                row = down[row]
+
+        def uncover(header: int) -> None:
+            row = up[header]
+            while row != header:
+                node = left[row]
+                while node != row:
+                    size[column[node]] += 1
+                    up[down[node]] = node
+                    down[up[node]] = node
+                    node = left[node]
+                row = up[row]
+            right[left[header]] = header
+            left[right[header]] = header
+
+        # select the rows of the givens, two givens sharing a constraint can't be
+        # part of any solution
+        covered = set()
+        for index, digit in enumerate(digits):
+            if digit == 0:
+                continue
+            node = _CELL_NODES[index][digit]
+            headers = _constraints(index, digit)
+            if covered.intersection(headers):
+                return
+            covered.update(headers)
+            for offset in range(4):
+                cover(column[node + offset])
+
+        def search() -> Iterator[List[int]]:
+            if right[ROOT] == ROOT:
+                yield digits
+                return
+
+            # the constraint with the fewest candidates left
+            header, fewest = ROOT, CELLS
+            other = right[ROOT]
+            while other != ROOT:
+                if size[other] < fewest:
+                    header, fewest = other, size[other]
+                    if fewest <= 1:
+                        break
+                other = right[other]
+            if fewest == 0:
+                return
+
+            cover(header)
+            row = down[header]
+            while row != header:
+                self.__nodes += 1
+                index, digit = candidate[row]
+                digits[index] = digit
+                node = right[row]
+                while node != row:
+                    cover(column[node])
+                    node = right[node]
+
+                yield from search()
+
+                node = left[row]
+                while node != row:
+                    uncover(column[node])
+                    node = left[node]
+                digits[index] = 0
+                row = down[row]
+            uncover(header)
+
+        yield from search()
+
+
+if __name__ == "__main__":
+    hard_sudoku = "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+    weird_sudoku = "100000000000000000000000000000000000010000000000000000000000000000000000000000000"
+    print(DancingLinks(hard_sudoku).solve())
+    print(DancingLinks(weird_sudoku).count_solutions(limit=2))
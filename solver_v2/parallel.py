@@ -0,0 +1,188 @@
+"""
+Searching a single hard puzzle on several processes.
+
+The search tree is expanded in the calling process down to a frontier depth, the
+subtrees below the frontier are searched on a process pool. A solve returns with
+the first solution any worker finds and terminates the others, a count sums the
+solutions of all subtrees.
+"""
+
+from multiprocessing import Pool
+from typing import List, Tuple, Union
+import os
+from solver_v2.batch import SolveOptions
+from solver_v2.sudokuCSP import SudokuCSP
+from solver_v2.sudokuGrid import SudokuGrid
+
+
+def frontier(
+    puzzle: str, depth: int, options: SolveOptions = SolveOptions()
+) -> Tuple[List[SudokuGrid], List[SudokuGrid]]:
+    """
+    Expands the search tree of a puzzle breadth first.
+
+    Parameters:
+    - puzzle (str): 81 digits, 0 for empty cells.
+    - depth (int): The number of levels to expand, 0 keeps the deduced root.
+    - options (SolveOptions): The grid class and heuristic that choose the cells.
+
+    Returns:
+    - Tuple[List[SudokuGrid], List[SudokuGrid]]: The unsolved grids of the frontier
+      and the solutions found above it.
+
+    Raises:
+    - InvalidSudokuInput: If the puzzle isn't 81 digits.
+    """
+    root = options.grid_class(puzzle)
+    sudoku = SudokuCSP(
+        root,
+        options.heuristic,
+        value_ordering=options.value_ordering,
+        arc_consistency=options.arc_consistency,
+        subsets=options.subsets,
+        fish=options.fish,
+        policy=options.policy,
+    )
+    sudoku.fill_in_candidates()
+    if not (root.valid_board() and sudoku.logical_deduction(root)):
+        return [], []
+
+    grids, solutions = [root], []
+    for _ in range(depth):
+        children = []
+        for grid in grids:
+            if sudoku.valid_solution(grid):
+                solutions.append(grid)
+            else:
+                children.extend(sudoku.branch(grid))
+        grids = children
+
+    unsolved = []
+    for grid in grids:
+        (solutions if sudoku.valid_solution(grid) else unsolved).append(grid)
+    return unsolved, solutions
+
+
+def _solve_subtree(task: Tuple[SudokuGrid, SolveOptions]) -> Union[None, str]:
+    grid, options = task
+    solution = SudokuCSP(
+        grid,
+        options.heuristic,
+        options.search_mode,
+        options.value_ordering,
+        options.arc_consistency,
+        options.subsets,
+        options.fish,
+        policy=options.policy,
+    ).backtracking(grid)
+    if solution is None:
+        return None
+    return _to_string(solution)
+
+
+def _count_subtree(task: Tuple[SudokuGrid, SolveOptions, Union[None, int]]) -> int:
+    grid, options, limit = task
+    return SudokuCSP(
+        grid,
+        options.heuristic,
+        value_ordering=options.value_ordering,
+        arc_consistency=options.arc_consistency,
+        subsets=options.subsets,
+        fish=options.fish,
+        policy=options.policy,
+    ).count_solutions(limit, grid)
+
+
+def _to_string(grid: SudokuGrid) -> str:
+    return "".join(str(cell[0]) for cell in grid)
+
+
+def parallel_solve(
+    puzzle: str,
+    workers: Union[None, int] = None,
+    depth: int = 3,
+    options: SolveOptions = SolveOptions(),
+):
+    """
+    Solves a puzzle by searching the subtrees below the frontier in parallel.
+
+    Parameters:
+    - puzzle (str): 81 digits, 0 for empty cells.
+    - workers (Union[None, int]): The number of processes, os.cpu_count() if None.
+    - depth (int): The frontier depth. Deeper frontiers give more, smaller subtrees
+      that balance better but are expanded serially first.
+    - options (SolveOptions): The grid class, heuristic and search mode to use.
+
+    Returns:
+    - The solution as a grid of options.grid_class, None if there is none.
+
+    Raises:
+    - InvalidSudokuInput: If the puzzle isn't 81 digits.
+    """
+    subtrees, solutions = frontier(puzzle, depth, options)
+    if solutions:
+        return solutions[0]
+
+    tasks = [(grid, options) for grid in subtrees]
+    with Pool(_workers(workers)) as pool:
+        for solution in pool.imap_unordered(_solve_subtree, tasks):
+            if solution is not None:
+                # leaving the with block terminates the workers still searching
+                return options.grid_class(solution)
+    return None
+
+
+def parallel_count_solutions(
+    puzzle: str,
+    limit: Union[None, int] = 2,
+    workers: Union[None, int] = None,
+    depth: int = 3,
+    options: SolveOptions = SolveOptions(),
+) -> int:
+    """
+    Counts the solutions of a puzzle by counting the subtrees in parallel.
+
+    Parameters:
+    - puzzle (str): 81 digits, 0 for empty cells.
+    - limit (Union[None, int]): Stops as soon as the subtrees counted so far add up
+      to limit, None counts all solutions.
+    - workers (Union[None, int]): The number of processes, os.cpu_count() if None.
+    - depth (int): The frontier depth.
+    - options (SolveOptions): The grid class and heuristic to use.
+
+    Returns:
+    - int: The number of solutions, at most limit.
+
+    Raises:
+    - InvalidSudokuInput: If the puzzle isn't 81 digits.
+    """
+    if limit is not None and limit <= 0:
+        return 0
+
+    subtrees, solutions = frontier(puzzle, depth, options)
+    count = len(solutions)
+    if limit is not None and count >= limit:
+        return limit
+
+    tasks = [(grid, options, limit) for grid in subtrees]
+    with Pool(_workers(workers)) as pool:
+        for solutions_of_subtree in pool.imap_unordered(_count_subtree, tasks):
+            count += solutions_of_subtree
+            if limit is not None and count >= limit:
+                return limit
+    return count
+
+
+def _workers(workers: Union[None, int]) -> int:
+    if workers is None:
+        return os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Workers: {} needs to be at least 1".format(workers))
+    return workers
+
+
+if __name__ == "__main__":
+    hard_sudoku = "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+    weird_sudoku = "100000000000000000000000000000000000010000000000000000000000000000000000000000000"
+    print(parallel_solve(hard_sudoku))
+    print(parallel_count_solutions(weird_sudoku, limit=1000))
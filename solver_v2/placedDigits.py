@@ -0,0 +1,70 @@
+from typing import List
+from solver_v2.candidates import DIGITS
+from common.houses import HOUSES, CELL_HOUSE_TUPLES
+
+
+class PlacedDigits:
+    """
+    Keeps track of the digits placed in every house of a grid.
+
+    The grids report every change of a placed digit with update(), which touches the
+    3 houses of the cell only. A conflict (a digit placed twice in a house) is
+    therefore detected at assignment time and valid() is a constant time read
+    instead of a rescan of all 27 houses.
+
+    Digits are counted per house instead of only kept as a mask, so that removing one
+    of two conflicting digits (e.g. when a trail is undone) is tracked correctly.
+
+    Methods:
+    - update(index: int, old_digit: int, new_digit: int) -> None:
+        Registers that the placed digit of a cell changed, 0 stands for no digit.
+
+    - valid() -> bool:
+        Returns True if no digit is placed twice in a house.
+
+    - placed_mask(house: int) -> int:
+        Returns the bitmask of the digits placed in the given house.
+    """
+
+    def __init__(self) -> None:
+        self.__counts: List[int] = [0] * (HOUSES * DIGITS)
+        self.__placed: List[int] = [0] * HOUSES
+        self.__conflicts = 0
+
+    def update(self, index: int, old_digit: int, new_digit: int) -> None:
+        if old_digit == new_digit:
+            return
+
+        counts = self.__counts
+        placed = self.__placed
+        for house in CELL_HOUSE_TUPLES[index]:
+            if old_digit:
+                slot = house * DIGITS + old_digit
+                counts[slot] -= 1
+                if counts[slot] == 1:
+                    self.__conflicts -= 1
+                elif counts[slot] == 0:
+                    placed[house] &= ~(1 << old_digit)
+            if new_digit:
+                slot = house * DIGITS + new_digit
+                counts[slot] += 1
+                if counts[slot] == 2:
+                    self.__conflicts += 1
+                elif counts[slot] == 1:
+                    placed[house] |= 1 << new_digit
+
+    def valid(self) -> bool:
+        return self.__conflicts == 0
+
+    def placed_mask(self, house: int) -> int:
+        return self.__placed[house]
+
+    def copy(self) -> "PlacedDigits":
+        placed_digits = PlacedDigits.__new__(PlacedDigits)
+        placed_digits.__counts = self.__counts.copy()
+        placed_digits.__placed = self.__placed.copy()
+        placed_digits.__conflicts = self.__conflicts
+        return placed_digits
+
+    def __deepcopy__(self, memo) -> "PlacedDigits":
+        return self.copy()
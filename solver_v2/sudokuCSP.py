@@ -1,5 +1,7 @@
-import numpy as np
-from typing import Union, Tuple, List, Set
+from collections import deque
+from itertools import combinations
+from contextlib import closing
+from typing import Union, Tuple, List, Set, Deque, Dict, Iterable, Iterator
 from enum import Enum
 from solver_v2.sudokuGrid import (
     SudokuGrid,
@@ -11,13 +13,52 @@ from solver_v2.sudokuGrid import (
     all_houses,
     all_rows,
 )
+from solver_v2.candidates import (
+    ALL_CANDIDATES,
+    MASK_TO_DIGITS,
+    POPCOUNT,
+    UNFILLED,
+)
+from solver_v2.allDifferent import consistent_masks
+from common.houses import (
+    CELLS,
+    CELL_HOUSE_TUPLES,
+    HOUSES,
+    HOUSE_CELL_TUPLES,
+    INTERSECTION_TUPLES,
+    PEER_TUPLES,
+    cell_index,
+    cell_position,
+)
+from common.stackSearch import SearchStatus, StackSearch, copy_search
+from solver_v2.techniques import (
+    PipelinePolicy,
+    Schedule,
+    Technique,
+    TechniqueStats,
+    default_techniques,
+)
+from common.trail import SearchMode
+
+
+class Contradiction(Exception):
+    pass
 
 
 class Heuristics(Enum):
+    # the cell with the fewest candidates (minimum remaining values)
     LEAST_VALUES = 1
+    # same, ties are broken by the most undecided peers (degree)
     LEAST_CONSTRAINT_VARIABLE = 2
 
 
+class ValueOrdering(Enum):
+    # the candidates in the order of the cell
+    FIRST = 1
+    # the candidates that remove the fewest candidates of undecided peers first
+    LEAST_CONSTRAINING = 2
+
+
 DEBUG = False
 
 
@@ -32,22 +73,239 @@ import time
 
 class SudokuCSP:
     def __init__(
-        self, grid: SudokuGrid, heuristic: Union[Heuristics, None] = None
+        self,
+        grid: SudokuGrid,
+        heuristic: Union[Heuristics, None] = None,
+        search_mode: SearchMode = SearchMode.COPY,
+        value_ordering: ValueOrdering = ValueOrdering.FIRST,
+        arc_consistency: bool = False,
+        subsets: bool = False,
+        fish: bool = False,
+        techniques: Union[None, List[Technique]] = None,
+        policy: PipelinePolicy = PipelinePolicy.RESTART,
     ) -> None:
         self.grid = grid
         self.heuristic = heuristic
+        self.search_mode = search_mode
+        self.value_ordering = value_ordering
+        self.subsets = subsets
+        self.arc_consistency = arc_consistency
+        self.fish = fish
+        # the techniques logical_deduction runs after propagation, if not given the
+        # flags above add subsets, house_arc_consistency and fish to the default
+        self.techniques = (
+            default_techniques(subsets, arc_consistency, fish)
+            if techniques is None
+            else techniques
+        )
+        self.policy = policy
+        self.propagation_stats = TechniqueStats()
+        self.propagation_schedule = Schedule()
+        # number of candidates tried by the searches of this instance
+        self.nodes = 0
+        # number of candidates removed by house_arc_consistency
+        self.arc_consistency_removed = 0
+        # number of candidates removed by fish_patterns
+        self.fish_removed = 0
+
+    def logical_deduction(
+        self, grid: SudokuGrid, changed: Union[None, Iterable[Tuple[int, int]]] = None
+    ) -> bool:
+        """
+        Applies constraint propagation and the techniques until none of them deduces
+        anything. The decided cells are propagated before every technique, the
+        policy decides if the techniques start from the top again after one made
+        progress (RESTART) or the next one runs (SWEEP). ADAPTIVE is RESTART, but if
+        changed is given, techniques whose Schedule says they don't pay off at the
+        nodes of the search are skipped. Techniques that look at houses only get
+        the houses whose cells changed since they last ran, and root_only
+        techniques are skipped if changed is given.
+        The calls, time and removed candidates are recorded in technique_stats().
+
+        Parameters:
+        - grid (SudokuGrid): The grid to deduce on.
+        - changed (Union[None, Iterable]): Optional. The cells that were decided since the
+          last deduction on the grid. If None, every decided cell is propagated.
+
+        Returns:
+        - bool: False if the deduction ran into a contradiction, True otherwise.
+        """
+        if changed is None:
+            queue = deque(
+                index
+                for index in range(CELLS)
+                if self.__is_decided(grid.get_mask(index))
+            )
+        else:
+            queue = deque(cell_index(position) for position in changed)
+
+        techniques = [
+            technique
+            for technique in self.techniques
+            if changed is None or not technique.root_only
+        ]
+        # per by_house technique the houses that changed since it last ran
+        dirty = {}
+        if any(technique.by_house for technique in techniques):
+            houses = (
+                set(range(HOUSES))
+                if changed is None
+                else {house for index in queue for house in CELL_HOUSE_TUPLES[index]}
+            )
+            dirty = {
+                position: set(houses)
+                for position, technique in enumerate(techniques)
+                if technique.by_house
+            }
+            masks = grid.get_masks().tolist()
+
+        # the schedules only adapt to the nodes, the root gets every technique
+        adaptive = self.policy == PipelinePolicy.ADAPTIVE and changed is not None
+
+        try:
+            self.__propagate(grid, queue, adaptive)
+            while True:
+                progress = False
+                # the grid changed since the dirty houses were last updated
+                stale = bool(dirty)
+                for position, technique in enumerate(techniques):
+                    if adaptive and not technique.schedule.due():
+                        continue
+                    houses = None
+                    if technique.by_house:
+                        if stale:
+                            self.__mark_dirty(grid, masks, dirty)
+                            stale = False
+                        houses = dirty[position]
+                        if not houses:
+                            continue
+
+                    removed = self.__apply(technique, grid, queue, houses, adaptive)
+                    if houses is not None:
+                        # the houses it changed are marked dirty again
+                        houses.clear()
+
+                    if removed:
+                        progress = True
+                        stale = bool(dirty)
+                        self.__propagate(grid, queue, adaptive)
+                        if self.policy != PipelinePolicy.SWEEP:
+                            break
+                if not progress:
+                    break
+        except Contradiction:
+            return False
+        return True
+
+    def __apply(
+        self,
+        technique: Technique,
+        grid: SudokuGrid,
+        queue: Deque[int],
+        houses: Union[None, Set[int]],
+        adaptive: bool,
+    ) -> int:
+        start = time.perf_counter()
+        removed, worth = 0, 0
+        try:
+            removed = worth = technique.apply(self, grid, queue, houses)
+        except Contradiction:
+            # closing a branch is worth all the candidates left in it
+            worth = grid.candidates_to_remove()
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            technique.stats.record(seconds, removed)
+            if adaptive:
+                technique.schedule.record(seconds, worth)
+                technique.schedule.update(self.propagation_schedule.rate)
+        return removed
+
+    def __propagate(self, grid: SudokuGrid, queue: Deque[int], adaptive: bool) -> None:
+        start = time.perf_counter()
+        removed = 0
+        try:
+            removed = self.propagate(grid, queue)
+        finally:
+            seconds = time.perf_counter() - start
+            self.propagation_stats.record(seconds, removed)
+            # an empty queue says nothing about the yield of propagation
+            if adaptive and removed:
+                self.propagation_schedule.record(seconds, removed)
+
+    def __mark_dirty(self, grid: SudokuGrid, masks: List[int], dirty: dict) -> None:
+        # adds the houses of the cells that changed since the masks were taken to
+        # every dirty set and updates the masks
+        changed = set()
+        for index, mask in enumerate(grid.get_masks().tolist()):
+            if mask != masks[index]:
+                masks[index] = mask
+                changed.update(CELL_HOUSE_TUPLES[index])
+        if changed:
+            for houses in dirty.values():
+                houses |= changed
+
+    def technique_stats(self) -> Dict[str, TechniqueStats]:
+        """
+        Returns the stats of propagation and every technique of the pipeline.
+
+        Returns:
+        - Dict[str, TechniqueStats]: The stats by name, propagation as "propagate"
+          followed by the techniques in pipeline order.
+        """
+        stats = {"propagate": self.propagation_stats}
+        for technique in self.techniques:
+            stats[technique.name] = technique.stats
+        return stats
+
+    def propagate(self, grid: SudokuGrid, queue: Deque[int]) -> int:
+        """
+        Removes the values of newly decided cells from the candidates of their peers.
+
+        Only the 20 peers of each queued cell are visited. Peers that get decided by a
+        removal are queued in turn, so the work done is proportional to the number of
+        changes instead of a sweep over all houses.
+
+        Parameters:
+        - grid (SudokuGrid): The grid to propagate on.
+        - queue (deque): The indices of the cells that were decided, gets emptied.
+
+        Returns:
+        - int: number of removed candidates
+
+        Raises:
+        - Contradiction: If a cell is left without any candidate.
+        """
+        report = 0
+        while queue:
+            index = queue.popleft()
+            mask = grid.get_mask(index)
+            if mask == 0:
+                raise Contradiction(
+                    "No candidates left for {}".format(cell_position(index))
+                )
+            if not self.__is_decided(mask):
+                continue
+
+            for peer in PEER_TUPLES[index]:
+                peer_mask = grid.get_mask(peer)
+                if not peer_mask & mask:
+                    continue
+
+                peer_mask &= ~mask
+                report += 1
+                grid.set_mask(peer, peer_mask)
 
-    def logical_deduction(self, grid: SudokuGrid):
-        # if simple elimination cant do further deduction set hidden singles try.
-        # if hidden single found a deduction set simple elimination look and so on
-        while True:
-            removed = self.simple_elimination(grid)
-            # print_debug("simple elimination removed: {} candidates".format(removed))
-            if removed == 0:
-                removed += self.hidden_single(grid)
-                # print_debug("hidden single removed: {} candidates".format(removed))
-            if removed == 0:
-                break
+                if peer_mask == 0:
+                    raise Contradiction(
+                        "No candidates left for {}".format(cell_position(peer))
+                    )
+                if POPCOUNT[peer_mask] == 1:
+                    queue.append(peer)
+        return report
+
+    def __is_decided(self, mask: int) -> bool:
+        return POPCOUNT[mask] == 1 and mask != UNFILLED
 
     def simple_elimination(self, grid: SudokuGrid) -> int:
         """
@@ -58,74 +316,408 @@ class SudokuCSP:
         - int: number of removed candidates
         """
         report = 0
-        for house in all_houses:
-            for cell_position in house:
-                cell = grid.get_cell(cell_position)
-                if len(cell) == 1 and cell[0] != 0:
-                    value_to_remove = cell[0]
+        for house in HOUSE_CELL_TUPLES:
+            for index in house:
+                mask = grid.get_mask(index)
+                if self.__is_decided(mask):
                     report += self.__remove_candidate_from_house(
-                        house, cell_position, value_to_remove
+                        grid, house, index, mask
                     )
         return report
 
     def __remove_candidate_from_house(
         self,
-        house: list(Tuple[int, int]),
-        cell_position: Tuple[int, int],
-        value_to_remove: int,
+        grid: SudokuGrid,
+        house: Tuple[int, ...],
+        index: int,
+        mask_to_remove: int,
     ) -> int:
         """
         Removes the specified value from the candidates of other cells in the given house.
 
         Parameters:
-        - house (list): The list of cell positions representing a house (row, column, or block).
-        - cell_position (tuple): The position of the cell containing the value to be removed.
-        - value_to_remove (int): The value to be removed from other cells in the house.
+        - grid (SudokuGrid): The grid to remove the candidates from.
+        - house (tuple): The indices of the cells of a house (row, column, or block).
+        - index (int): The index of the cell containing the value to be removed.
+        - mask_to_remove (int): The mask of the value to be removed from other cells in the house.
 
         Returns:
         - int: number of removed candidates
         """
         report = 0
-        for other_cell_position in house:
-            if (
-                other_cell_position != cell_position
-                and value_to_remove in self.grid.get_cell(other_cell_position)
-            ):
-                updated_candidates, removed = self.__remove_element(
-                    self.grid.get_cell(other_cell_position),
-                    value_to_remove,
-                )
-                report += removed
-                self.grid.set_cell(other_cell_position, updated_candidates)
+        for other_index in house:
+            other_mask = grid.get_mask(other_index)
+            if other_index != index and other_mask & mask_to_remove:
+                report += 1
+                grid.set_mask(other_index, other_mask & ~mask_to_remove)
         return report
 
-    def __remove_element(
-        self, arr: np.ndarray, value_to_remove: Union[1, 2, 3, 4, 5, 6, 7, 8, 9]
-    ) -> Tuple[np.ndarray, int]:
+    def hidden_single(self, grid, queue: Union[None, Deque[int]] = None) -> int:
+        # if there is only one instance of a candidate in house - keep only it
+        # the decided cells are appended to the queue if one is given
+
+        removed = 0
+        for house in HOUSE_CELL_TUPLES:
+            masks = [grid.get_mask(index) for index in house]
+
+            # candidates seen at least once and more than once in the house
+            once, twice = 0, 0
+            for mask in masks:
+                twice |= once & mask
+                once |= mask
+
+            hidden = once & ~twice & ALL_CANDIDATES
+            while hidden:
+                candidate = hidden & -hidden
+                hidden ^= candidate
+                index = next(i for i, mask in zip(house, masks) if mask & candidate)
+
+                # the cell can have been reduced to another hidden single already
+                mask = grid.get_mask(index)
+                if not mask & candidate or mask == candidate:
+                    continue
+
+                removed += POPCOUNT[mask] - 1
+                grid.set_mask(index, candidate)
+                if queue is not None:
+                    queue.append(index)
+        return removed
+
+    def locked_candidates(
+        self, grid: SudokuGrid, queue: Union[None, Deque[int]] = None
+    ) -> int:
         """
-        Removes a specified value from the given NumPy array.
+        Applies locked candidates on every intersection of a block with a row or a
+        column. A digit of the block that is only left in the intersection is removed
+        from the rest of the line (pointing), a digit of the line that is only left in
+        the intersection from the rest of the block (box/line reduction).
 
         Parameters:
-        - arr (np.ndarray): The NumPy array from which to remove the value.
-        - value_to_remove (int): The value to be removed.
+        - grid (SudokuGrid): The grid to deduce on, intersections with cells without
+          filled in candidates are skipped.
+        - queue (Union[None, deque]): Optional. The decided cells are appended to it.
 
         Returns:
-        - np.ndarray: The modified NumPy array.
+        - int: number of removed candidates
+
+        Raises:
+        - Contradiction: If a cell has no candidates left.
+        """
+        masks = grid.get_masks().tolist()
+        removed = 0
+        for cells, block_rest, line_rest in INTERSECTION_TUPLES:
+            shared = masks[cells[0]] | masks[cells[1]] | masks[cells[2]]
+            block = 0
+            for index in block_rest:
+                block |= masks[index]
+            line = 0
+            for index in line_rest:
+                line |= masks[index]
+            if (shared | block | line) & UNFILLED:
+                continue
+
+            pointing = shared & ~block & ALL_CANDIDATES
+            claiming = shared & ~line & ALL_CANDIDATES
+            for digits, rest in ((pointing, line_rest), (claiming, block_rest)):
+                if not digits:
+                    continue
+                for index in rest:
+                    mask = masks[index]
+                    if not mask & digits:
+                        continue
+                    masks[index] = mask & ~digits
+                    removed += POPCOUNT[mask] - POPCOUNT[masks[index]]
+                    self.__set_reduced_mask(grid, index, masks[index], queue)
+        return removed
+
+    def naked_subsets(
+        self,
+        grid: SudokuGrid,
+        size: int,
+        queue: Union[None, Deque[int]] = None,
+        houses: Union[None, Iterable[int]] = None,
+    ) -> int:
         """
-        removed = 1 if value_to_remove in arr else 0
+        Applies naked subsets: if the candidates of size undecided cells of a house add
+        up to size digits, the digits go to these cells and are removed from the
+        other cells of the house.
 
-        filtered_array = list(
-            filter(lambda candidate: candidate != value_to_remove, arr)
-        )
-        return (filtered_array, removed)
+        Parameters:
+        - grid (SudokuGrid): The grid to deduce on, houses with cells without filled
+          in candidates are skipped.
+        - size (int): The number of cells, 2 for pairs, 3 for triples and so on.
+        - queue (Union[None, deque]): Optional. The decided cells are appended to it.
+        - houses (Union[None, Iterable[int]]): Optional. The indices of the houses to
+          look at, all houses if None.
 
-    def hidden_single(self, grid) -> int:
-        # if there is only one instance of a candidate in house - keep only it
+        Returns:
+        - int: number of removed candidates
+
+        Raises:
+        - Contradiction: If size cells of a house have fewer than size candidates.
+        """
+        removed = 0
+        for house in self.__houses(houses):
+            masks = {index: grid.get_mask(index) for index in house}
+            if any(mask & UNFILLED for mask in masks.values()):
+                continue
+            undecided = [index for index in house if POPCOUNT[masks[index]] > 1]
+            # with as few undecided cells the subset would be all of them
+            if len(undecided) <= size:
+                continue
+
+            small = [index for index in undecided if POPCOUNT[masks[index]] <= size]
+            for subset in combinations(small, size):
+                union = 0
+                for index in subset:
+                    union |= masks[index]
+                if POPCOUNT[union] < size:
+                    raise Contradiction(
+                        "Too few candidates for {}".format(
+                            [cell_position(index) for index in subset]
+                        )
+                    )
+                if POPCOUNT[union] > size:
+                    continue
+
+                for index in undecided:
+                    if index in subset or not masks[index] & union:
+                        continue
+                    mask = masks[index] & ~union
+                    removed += POPCOUNT[masks[index]] - POPCOUNT[mask]
+                    self.__set_reduced_mask(grid, index, mask, queue)
+                    masks[index] = mask
+        return removed
+
+    def hidden_subsets(
+        self,
+        grid: SudokuGrid,
+        size: int,
+        queue: Union[None, Deque[int]] = None,
+        houses: Union[None, Iterable[int]] = None,
+    ) -> int:
+        """
+        Applies hidden subsets: if size digits of a house are candidates of only size
+        cells, these cells hold them and lose their other candidates.
+
+        Parameters:
+        - grid (SudokuGrid): The grid to deduce on, houses with cells without filled
+          in candidates are skipped.
+        - size (int): The number of digits, 2 for pairs, 3 for triples and so on.
+        - queue (Union[None, deque]): Optional. The decided cells are appended to it.
+        - houses (Union[None, Iterable[int]]): Optional. The indices of the houses to
+          look at, all houses if None.
+
+        Returns:
+        - int: number of removed candidates
+
+        Raises:
+        - Contradiction: If size digits of a house are left in fewer than size cells.
+        """
+        removed = 0
+        for house in self.__houses(houses):
+            masks = [grid.get_mask(index) for index in house]
+            if any(mask & UNFILLED for mask in masks):
+                continue
+
+            # the digits of the decided cells, their peers in the house may not have
+            # been propagated yet, e.g. if the cell was decided in an earlier house
+            placed = 0
+            for mask in masks:
+                if POPCOUNT[mask] == 1:
+                    placed |= mask
+
+            # the cells of the house each digit of an undecided cell can go to
+            positions = {}
+            for position, mask in enumerate(masks):
+                if POPCOUNT[mask] == 1:
+                    continue
+                mask &= ~placed
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    positions[bit] = positions.get(bit, 0) | 1 << position
+            # hidden singles aren't part of a subset
+            positions = {
+                bit: cells
+                for bit, cells in positions.items()
+                if 2 <= POPCOUNT[cells] <= size
+            }
+            if len(positions) < size:
+                continue
+
+            for subset in combinations(positions, size):
+                cells = 0
+                digits = 0
+                for bit in subset:
+                    cells |= positions[bit]
+                    digits |= bit
+                if POPCOUNT[cells] < size:
+                    raise Contradiction(
+                        "Too few cells for {} digits in house {}".format(size, house)
+                    )
+                if POPCOUNT[cells] > size:
+                    continue
+
+                for position, index in enumerate(house):
+                    if not cells >> position & 1 or not masks[position] & ~digits:
+                        continue
+                    mask = masks[position] & digits
+                    removed += POPCOUNT[masks[position]] - POPCOUNT[mask]
+                    self.__set_reduced_mask(grid, index, mask, queue)
+                    masks[position] = mask
+        return removed
+
+    def fish_patterns(
+        self, grid: SudokuGrid, size: int, queue: Union[None, Deque[int]] = None
+    ) -> int:
+        """
+        Applies basic fish: if a digit is left in only size columns of size rows,
+        each of these columns holds it in one of the rows and it is removed from the
+        other cells of the columns, the same with rows and columns swapped. Size 2
+        is the X-Wing, 3 the Swordfish and 4 the Jellyfish.
+
+        Every digit gets a bitboard, the mask of the columns it can go to for every
+        row, so a fish is the union of size of these masks.
+
+        Parameters:
+        - grid (SudokuGrid): The grid to deduce on, nothing is done if a cell has no
+          filled in candidates.
+        - size (int): The number of rows or columns of the fish.
+        - queue (Union[None, deque]): Optional. The decided cells are appended to it.
+
+        Returns:
+        - int: number of removed candidates, also added to fish_removed
+
+        Raises:
+        - Contradiction: If a digit of size rows is left in fewer than size columns
+          or the other way round.
+        """
+        masks = grid.get_masks().tolist()
+        if any(mask & UNFILLED for mask in masks):
+            return 0
+
+        removed = 0
+        for digit in range(1, DIGITS):
+            bit = 1 << digit
+            for by_columns in (False, True):
+                # board[line]: the cross lines of the line the digit can go to
+                board = [0] * ROWS
+                for index, mask in enumerate(masks):
+                    if mask & bit:
+                        row, column = divmod(index, COLUMNS)
+                        if by_columns:
+                            row, column = column, row
+                        board[row] |= 1 << column
+
+                # placed digits and hidden singles aren't part of a fish
+                base = [
+                    line for line in range(ROWS) if 2 <= POPCOUNT[board[line]] <= size
+                ]
+                for lines in combinations(base, size):
+                    cover = 0
+                    for line in lines:
+                        cover |= board[line]
+                    if POPCOUNT[cover] < size:
+                        raise Contradiction(
+                            "Digit {} fits in too few lines for {}".format(digit, lines)
+                        )
+                    if POPCOUNT[cover] > size:
+                        continue
+
+                    for line in range(ROWS):
+                        if line in lines or not board[line] & cover:
+                            continue
+                        for cross in MASK_TO_DIGITS[board[line] & cover]:
+                            index = (
+                                cross * COLUMNS + line
+                                if by_columns
+                                else line * COLUMNS + cross
+                            )
+                            masks[index] &= ~bit
+                            removed += 1
+                            self.__set_reduced_mask(grid, index, masks[index], queue)
+                        board[line] &= ~cover
+
+        self.fish_removed += removed
+        return removed
+
+    def __houses(self, houses: Union[None, Iterable[int]]) -> Iterable[Tuple[int, ...]]:
+        if houses is None:
+            return HOUSE_CELL_TUPLES
+        return [HOUSE_CELL_TUPLES[house] for house in sorted(houses)]
+
+    def __set_reduced_mask(
+        self,
+        grid: SudokuGrid,
+        index: int,
+        mask: int,
+        queue: Union[None, Deque[int]],
+    ) -> None:
+        grid.set_mask(index, mask)
+        if mask == 0:
+            raise Contradiction(
+                "No candidates left for {}".format(cell_position(index))
+            )
+        if queue is not None and POPCOUNT[mask] == 1:
+            queue.append(index)
+
+    def house_arc_consistency(
+        self,
+        grid: SudokuGrid,
+        queue: Union[None, Deque[int]] = None,
+        houses: Union[None, Iterable[int]] = None,
+    ) -> int:
+        """
+        Makes houses generalized arc consistent, every candidate left in a house is
+        part of an assignment of pairwise different digits to all of its cells (see
+        solver_v2.allDifferent). This covers naked and hidden subsets of every size.
+
+        A house whose candidates get removed queues the other houses of the changed
+        cells, so all houses checked are consistent when it returns.
+
+        Parameters:
+        - grid (SudokuGrid): The grid to prune, cells without filled in candidates
+          are skipped with their houses.
+        - queue (Union[None, deque]): Optional. The decided cells are appended to it.
+        - houses (Union[None, Iterable[int]]): Optional. The indices of the houses to
+          start with, all houses if None.
 
+        Returns:
+        - int: number of removed candidates, also added to arc_consistency_removed
+
+        Raises:
+        - Contradiction: If the cells of a house can't hold pairwise different digits.
+        """
+        worklist = deque(range(HOUSES) if houses is None else houses)
+        pending = set(worklist)
         removed = 0
-        for house in all_houses:
-            for candidate in range(1, DIGITS):
-                removed += self.find_only_canidate_in_house(grid, candidate, house)
+        while worklist:
+            house = worklist.popleft()
+            pending.discard(house)
+            cells = HOUSE_CELL_TUPLES[house]
+            masks = [grid.get_mask(index) for index in cells]
+            if any(mask & UNFILLED for mask in masks):
+                continue
+
+            pruned = consistent_masks(masks)
+            if pruned is None:
+                raise Contradiction("No digit for every cell of house {}".format(house))
+
+            for index, mask, pruned_mask in zip(cells, masks, pruned):
+                if mask == pruned_mask:
+                    continue
+                removed += POPCOUNT[mask] - POPCOUNT[pruned_mask]
+                grid.set_mask(index, pruned_mask)
+                if queue is not None and POPCOUNT[pruned_mask] == 1:
+                    queue.append(index)
+                for other in CELL_HOUSE_TUPLES[index]:
+                    # the house itself is consistent already
+                    if other != house and other not in pending:
+                        pending.add(other)
+                        worklist.append(other)
+
+        self.arc_consistency_removed += removed
         return removed
 
     def find_only_canidate_in_house(
@@ -158,58 +750,228 @@ class SudokuCSP:
         return self.__all_variables_assigned(grid) and self.__valid_state(grid)
 
     def __all_variables_assigned(self, grid: SudokuGrid):
+        # a cell without candidates isn't assigned either, it is a contradiction
         for cell in grid:
-            if len(cell) > 1:
+            if len(cell) != 1:
                 return False
         return True
 
     def solve(self):
-        print("Starting Backtracking")
+        print_debug("Starting Backtracking")
         return self.backtracking(self.grid)
 
     def backtracking(self, root_state: SudokuGrid, memo={}) -> Union[None, SudokuGrid]:
-        if self.valid_solution(root_state):
-            return root_state
-
-        # choose variable to explore
-        cell_to_explore = self.__choose_cell_to_explore(root_state)
-        # assign values to variable
-        for candidate in root_state.get_cell(cell_to_explore):
-            new_state = copy.deepcopy(root_state)
-            new_state.set_cell(cell_to_explore, [candidate])
-            # test if assignment is valid before creating copy
-            if not new_state.valid_board():
-                continue
+        if self.search_mode == SearchMode.TRAIL:
+            return self.__trail_backtracking(root_state)
+        # every candidate is tried on a copy, the levels are kept on a stack
+        return copy_search(
+            root_state, self.__choose_branch, self.__copy_candidate, self.valid_solution
+        )
 
-            self.logical_deduction(new_state)
-            # did logical_deduction create invalid state?
-            if not new_state.valid_board():
-                continue
+    def __copy_candidate(
+        self, grid: SudokuGrid, cell_to_explore: Tuple[int, int], candidate: int
+    ) -> Union[None, SudokuGrid]:
+        new_state = copy.deepcopy(grid)
+        if self.__try_candidate(new_state, cell_to_explore, candidate):
+            return new_state
+        return None
+
+    def branch(self, grid: SudokuGrid) -> List[SudokuGrid]:
+        """
+        Expands one node of the search tree, e.g. to hand its subtrees to other workers.
 
-            solution = self.backtracking(new_state)
+        Parameters:
+        - grid (SudokuGrid): A grid after logical_deduction, that isn't solved yet.
 
-            if solution != None:
-                return solution
-        return None
+        Returns:
+        - List[SudokuGrid]: A copy of the grid per candidate of the cell the search
+          would explore next, with the candidate assigned and deduced on. Candidates
+          that run into a contradiction are left out.
+        """
+        cell_to_explore = self.__choose_cell_to_explore(grid)
+        children = []
+        for candidate in self.__order_candidates(grid, cell_to_explore):
+            child = copy.deepcopy(grid)
+            child.set_cell(cell_to_explore, [candidate])
+            self.nodes += 1
+            if (
+                child.valid_board()
+                and self.logical_deduction(child, [cell_to_explore])
+                and child.valid_board()
+            ):
+                children.append(child)
+        return children
+
+    def __trail_backtracking(self, grid: SudokuGrid) -> Union[None, SudokuGrid]:
+        """
+        Searches for a solution by mutating the given grid in place.
+
+        Every write of an explored branch is recorded on a trail and undone when the
+        branch fails, instead of deep copying the grid for every candidate.
+
+        Returns:
+        - Union[None, SudokuGrid]: The given grid holding the solution, or None if there
+          is none, in which case the grid is restored to its initial state.
+        """
+        with closing(self.search(grid)) as search:
+            if search.run() == SearchStatus.SOLVED:
+                return grid
+            return None
+
+    def search(self, grid: Union[None, SudokuGrid] = None) -> StackSearch:
+        """
+        Returns a search on the grid in place that can be paused and resumed.
+
+        The search keeps its levels on an explicit stack instead of recursing, run()
+        takes a budget of candidates to try and returns SearchStatus.PAUSED when it
+        runs out, the next run() continues where it stopped. The grid isn't prepared,
+        like for backtracking, fill_in_candidates and logical_deduction run before.
+
+        Parameters:
+        - grid (Union[None, SudokuGrid]): Optional. The grid to search, self.grid if
+          None.
+
+        Returns:
+        - StackSearch: The search, close() it to detach its trail from the grid.
+        """
+        if grid is None:
+            grid = self.grid
+        return StackSearch(
+            grid, self.__choose_branch, self.__try_candidate, self.valid_solution
+        )
+
+    def __choose_branch(self, grid: SudokuGrid) -> Tuple[Tuple[int, int], List[int]]:
+        cell_to_explore = self.__choose_cell_to_explore(grid)
+        return cell_to_explore, self.__order_candidates(grid, cell_to_explore)
+
+    def __try_candidate(
+        self, grid: SudokuGrid, cell_to_explore: Tuple[int, int], candidate: int
+    ) -> bool:
+        # assigns the candidate and deduces, False if the grid got inconsistent
+        grid.set_cell(cell_to_explore, [candidate])
+        self.nodes += 1
+        return (
+            grid.valid_board()
+            and self.logical_deduction(grid, [cell_to_explore])
+            and grid.valid_board()
+        )
+
+    def count_solutions(
+        self, limit: Union[None, int] = 2, grid: Union[None, SudokuGrid] = None
+    ) -> int:
+        """
+        Counts the solutions of a grid, e.g. to check that a puzzle is unique.
+
+        The empty cells are filled in with all candidates and logical_deduction runs
+        once on the whole grid before the search, which keeps going after the first
+        solution and stops as soon as limit solutions are found. The grid is searched
+        in place and restored afterwards.
+
+        Parameters:
+        - limit (Union[None, int]): The number of solutions to stop at, 2 is enough to
+          tell unique puzzles apart. None counts all solutions.
+        - grid (Union[None, SudokuGrid]): Optional. The grid to count the solutions
+          of, self.grid if None.
+
+        Returns:
+        - int: The number of solutions, at most limit.
+        """
+        if grid is None:
+            grid = self.grid
+        if limit is not None and limit <= 0:
+            return 0
+
+        solutions = 0
+        with closing(self.__all_solutions(grid)) as search:
+            for _ in search:
+                solutions += 1
+                if solutions == limit:
+                    break
+        return solutions
+
+    def iter_solutions(
+        self, grid: Union[None, SudokuGrid] = None
+    ) -> Iterator[SudokuGrid]:
+        """
+        Lazily yields every solution of a grid as it is found.
+
+        The search runs in place on a trail like count_solutions, only the yielded
+        solutions are copies. Memory is bounded by the depth of the search, no matter
+        how many solutions there are. The grid is restored once the iteration is
+        exhausted or closed, e.g. by breaking out of a for loop.
+
+        Parameters:
+        - grid (Union[None, SudokuGrid]): Optional. The grid to solve, self.grid if
+          None.
+
+        Returns:
+        - Iterator[SudokuGrid]: The solutions, in the order of the search.
+        """
+        if grid is None:
+            grid = self.grid
+        with closing(self.__all_solutions(grid)) as search:
+            for solution in search:
+                yield copy.deepcopy(solution)
+
+    def __all_solutions(self, grid: SudokuGrid) -> Iterator[SudokuGrid]:
+        # prepares the grid for the search, yields it at every solution and restores
+        # it when closed
+        with closing(self.search(grid)) as search:
+            try:
+                self.__fill_in_candidates(grid)
+                if grid.valid_board() and self.logical_deduction(grid):
+                    while search.run() == SearchStatus.SOLVED:
+                        yield grid
+            finally:
+                search.get_trail().undo(0)
 
     def __choose_cell_to_explore(self, grid: SudokuGrid):
         if self.heuristic == Heuristics.LEAST_VALUES:
             return self.__find_variable_with_least_values(grid)
+        if self.heuristic == Heuristics.LEAST_CONSTRAINT_VARIABLE:
+            return self.__find_variable_with_least_values(grid, by_degree=True)
 
         return self.__first_unassigned_cell(grid)
 
-    def __find_variable_with_least_values(self, grid: SudokuGrid):
-        min_candidates_cell: Tuple[Tuple[int, int], int] = ((None, None), 10)
-        for row in all_rows:
-            for cell in row:
-                sum_candidates = len(grid.get_cell(cell))
-                if sum_candidates == 1 or sum_candidates > min_candidates_cell[1]:
-                    continue
-
-                min_candidates_cell = (cell, sum_candidates)
-        if min_candidates_cell[0] == (None, None):
+    def __find_variable_with_least_values(
+        self, grid: SudokuGrid, by_degree: bool = False
+    ) -> Tuple[int, int]:
+        # the grid keeps its cells in buckets by number of candidates, no scan needed
+        index = grid.get_candidate_counts().fewest_candidates(by_degree)
+        if index is None:
             raise ValueError("Grid is already solved")
-        return min_candidates_cell[0]
+        return cell_position(index)
+
+    def __order_candidates(self, grid: SudokuGrid, cell: Tuple[int, int]) -> List[int]:
+        """
+        Returns the candidates of a cell in the order the search tries them.
+
+        With ValueOrdering.LEAST_CONSTRAINING a candidate comes first the fewer
+        undecided peers have it as a candidate as well, so the assignment leaves the
+        most options to the rest of the grid. Ties keep the order of the cell.
+
+        Parameters:
+        - grid (SudokuGrid): The grid the cell belongs to.
+        - cell (Tuple[int, int]): The position of the cell to explore.
+
+        Returns:
+        - List[int]: The candidates of the cell.
+        """
+        candidates = grid.get_cell(cell)
+        if self.value_ordering != ValueOrdering.LEAST_CONSTRAINING:
+            return candidates
+
+        # decided peers don't hold the candidates of the cell after propagation
+        candidate_counts = grid.get_candidate_counts()
+        peer_masks = [
+            grid.get_mask(peer)
+            for peer in PEER_TUPLES[cell_index(cell)]
+            if candidate_counts.get_count(peer) > 1
+        ]
+        return sorted(
+            candidates,
+            key=lambda candidate: sum(mask >> candidate & 1 for mask in peer_masks),
+        )
 
     def __first_unassigned_cell(self, grid: SudokuGrid) -> Tuple[int, int]:
         for row in all_rows:
@@ -225,14 +987,12 @@ class SudokuCSP:
         Returns:
         - None
         """
-        grid = self.grid
-        rows, columns = grid.get_shape()
-        for row in range(rows):
-            for column in range(columns):
-                cell = grid.get_cell((row, column))
-                if len(cell) == 1 and cell == [0]:
-                    candidates = list(range(1, DIGITS))
-                    grid.set_cell((row, column), candidates)
+        self.__fill_in_candidates(self.grid)
+
+    def __fill_in_candidates(self, grid: SudokuGrid) -> None:
+        for index in range(CELLS):
+            if grid.get_mask(index) == UNFILLED:
+                grid.set_mask(index, ALL_CANDIDATES)
 
 
 if __name__ == "__main__":
@@ -242,7 +1002,7 @@ if __name__ == "__main__":
     easy_sudoku = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
     medium = "100070009008096300050000020010000000940060072000000040030000080004720100200050003"
 
-    s2 = SudokuCSP(SudokuGrid(hard_sudoku), Heuristics.LEAST_VALUES)
+    s2 = SudokuCSP(SudokuGrid(hard_sudoku), Heuristics.LEAST_VALUES, SearchMode.TRAIL)
     s2.fill_in_candidates()
     s2.logical_deduction(s2.grid)
     print(s2.grid)
@@ -252,3 +1012,4 @@ if __name__ == "__main__":
     print(s2.solve())
     end_time = time.time()
     print("Calculation took: {}seconds".format(end_time - start_time))
+    print("{} candidates tried.".format(s2.nodes))
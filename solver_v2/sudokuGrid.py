@@ -1,28 +1,18 @@
 from typing import Union, Tuple
+import copy
 import numpy as np
-from typing import Set
-
-ROWS, COLUMNS = (9, 9)
-DIGITS = 10
-
-# same for rows
-all_rows = [[(row, column) for column in range(COLUMNS)] for row in range(ROWS)]
-
-# return columns' lists of cells
-all_columns = [[(row, column) for row in range(ROWS)] for column in range(COLUMNS)]
-
-# same for blocks
-# this list comprehension is unreadable, but quite cool!
-all_blocks = [
-    [
-        ((row // 3) * 3 + column // 3, (row % 3) * 3 + column % 3)
-        for column in range(COLUMNS)
-    ]
-    for row in range(ROWS)
-]
-
-# combine three
-all_houses = all_columns + all_rows + all_blocks
+from solver_v2.candidates import DIGITS, to_mask, to_candidates
+from common.houses import (
+    ROWS,
+    COLUMNS,
+    all_blocks,
+    all_columns,
+    all_houses,
+    all_rows,
+)
+from solver_v2.candidateCounts import CandidateCounts
+from solver_v2.placedDigits import PlacedDigits
+from common.trail import Trail
 
 
 class InvalidSudokuInput(Exception):
@@ -63,6 +53,8 @@ class SudokuGrid:
         - InvalidSudokuInput: If the provided sudoku string has an invalid length or contains a character that is not a digit.
         """
         grid = np.empty((ROWS, COLUMNS), dtype=np.ndarray)
+        self.__trail: Union[None, Trail] = None
+        self.__placed_digits = PlacedDigits()
 
         if type(sudoku_str) is str:
             self.__grid = self.__parse_sudoku(grid, sudoku_str)
@@ -73,6 +65,12 @@ class SudokuGrid:
 
             self.__grid = grid
 
+        for index, cell in enumerate(self.__grid.flat):
+            self.__placed_digits.update(index, 0, self.__placed_digit(cell))
+        self.__candidate_counts = CandidateCounts(
+            [len(cell) for cell in self.__grid.flat]
+        )
+
     def __parse_sudoku(self, grid: np.ndarray, grid_str: str) -> np.ndarray:
         """
         Parse a string representing a Sudoku grid into a 2D NumPy array.
@@ -114,25 +112,12 @@ class SudokuGrid:
         return grid
 
     def valid_board(self) -> bool:
-        return (
-            self.__valid_houses(all_rows)
-            and self.__valid_houses(all_columns)
-            and self.__valid_houses(all_blocks)
-        )
+        # conflicts are counted on every set_cell, see PlacedDigits
+        return self.__placed_digits.valid()
 
-    def __valid_houses(self, houses):
-        for house in houses:
-            seen: Set[int] = set()
-            for cell in house:
-                cell_data = self.get_cell(cell)
-                if len(cell_data) != 1:
-                    continue
-
-                if cell_data[0] in seen:
-                    return False
-
-                seen.add(cell_data[0])
-        return True
+    def __placed_digit(self, cell: list) -> int:
+        # the digit placed in a cell or 0 if it has none or several candidates
+        return cell[0] if len(cell) == 1 else 0
 
     def get_cell(self, position: Tuple[int, int]) -> []:
         row, column = position
@@ -149,11 +134,69 @@ class SudokuGrid:
             raise TypeError(
                 "Value has be of type list and not type: {}".format(type(new_value))
             )
+        old_value = self.__get_grid()[row][column]
+        if self.__trail is not None:
+            self.__trail.record(self, (row, column), old_value)
+        self.__track(row * COLUMNS + column, old_value, new_value)
         self.__get_grid()[row][column] = new_value
 
+    def __track(self, index: int, old_value: list, new_value: list) -> None:
+        self.__placed_digits.update(
+            index, self.__placed_digit(old_value), self.__placed_digit(new_value)
+        )
+        self.__candidate_counts.update(index, len(old_value), len(new_value))
+
+    def get_mask(self, index: int) -> int:
+        row, column = divmod(index, COLUMNS)
+        return to_mask(self.__get_grid()[row][column])
+
+    def set_mask(self, index: int, mask: int) -> None:
+        self.set_cell(divmod(index, COLUMNS), to_candidates(mask))
+
+    def get_masks(self) -> np.ndarray:
+        """
+        Returns the candidates of all cells as bitmasks in row major order.
+
+        Returns:
+        - np.ndarray: A 1D uint16 NumPy array of length ROWS * COLUMNS.
+        """
+        return np.array(
+            [to_mask(cell) for cell in self.__get_grid().flat], dtype=np.uint16
+        )
+
+    def restore(self, position: Tuple[int, int], old_value: list) -> None:
+        # called by the trail to undo a set_cell, must not be recorded again
+        row, column = position
+        self.__track(row * COLUMNS + column, self.__get_grid()[row][column], old_value)
+        self.__get_grid()[row][column] = old_value
+
+    def set_trail(self, trail: Union[None, Trail]) -> None:
+        """
+        Records every following set_cell on the given trail, so it can be undone.
+
+        Parameters:
+        - trail (Union[None, Trail]): The trail to record on, None stops recording.
+        """
+        self.__trail = trail
+
+    def get_trail(self) -> Union[None, Trail]:
+        return self.__trail
+
+    def get_candidate_counts(self) -> CandidateCounts:
+        return self.__candidate_counts
+
     def __get_grid(self) -> np.ndarray:
         return self.__grid
 
+    def __deepcopy__(self, memo) -> "SudokuGrid":
+        # the copy doesn't share the trail of the original grid
+        grid = SudokuGrid.__new__(SudokuGrid)
+        grid.__grid = copy.deepcopy(self.__grid, memo)
+        grid.__trail = None
+        grid.__placed_digits = self.__placed_digits.copy()
+        grid.__candidate_counts = self.__candidate_counts.copy()
+        return grid
+
     def get_shape(self) -> tuple([int, int]):
         return self.__get_grid().shape
 
@@ -0,0 +1,251 @@
+"""
+The deduction techniques SudokuCSP.logical_deduction runs after propagation.
+
+A technique is an object with a name, a few flags for the pipeline and an apply()
+method that removes candidates from a grid, mostly by calling the method of the
+same name on SudokuCSP. The pipeline keeps the order of its list, so the cheap
+techniques go first, and records the calls, time and removed candidates of every
+technique in its stats. That way the techniques can be picked and measured per
+solver instead of by editing logical_deduction.
+"""
+
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Deque, Iterable, List, Union
+from solver_v2.sudokuGrid import SudokuGrid
+
+# subsets of up to 4 cells, with the hidden ones that covers every subset of a house
+MAX_SUBSET_SIZE = 4
+# X-Wing, Swordfish and Jellyfish, larger fish have a smaller complementary one
+MAX_FISH_SIZE = 4
+
+# weight of the latest call in the averaged yield of the adaptive policy
+YIELD_WEIGHT = 0.1
+# a technique pays off at the nodes if it removes at least this share of the
+# candidates per microsecond that propagation removes
+MIN_YIELD_SHARE = 0.1
+# the most node calls an unprofitable technique is skipped for in a row
+MAX_BACKOFF = 64
+
+
+class PipelinePolicy(Enum):
+    # run the techniques cheapest first, restart from the top on any progress
+    RESTART = 1
+    # run every technique once per sweep, repeat until a sweep deduces nothing
+    SWEEP = 2
+    # like RESTART, but at the nodes of the search techniques that don't pay off
+    # are skipped for exponentially more calls, see Schedule
+    ADAPTIVE = 3
+
+
+class TechniqueStats:
+    """
+    The cost and yield of a technique, summed over all its calls.
+
+    Attributes:
+    - calls (int): Number of times the technique was applied.
+    - seconds (float): Wall time spent in the technique.
+    - removed (int): Number of candidates it removed.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.removed = 0
+
+    def record(self, seconds: float, removed: int) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.removed += removed
+
+    def __repr__(self) -> str:
+        return "TechniqueStats(calls={}, seconds={:.6f}, removed={})".format(
+            self.calls, self.seconds, self.removed
+        )
+
+
+class Schedule:
+    """
+    Decides if a technique is applied at a node of the search in the ADAPTIVE
+    policy, from its yield at the nodes so far.
+
+    The yield is the number of removed candidates per microsecond, averaged with
+    a weight of YIELD_WEIGHT for the latest call. A technique pays off while its
+    yield is at least MIN_YIELD_SHARE of the yield of propagation. If it doesn't,
+    it is skipped for the next 1, 2, 4, ... MAX_BACKOFF calls, every call it gets
+    after that measures it again, so it comes back once it pays off again.
+
+    Attributes:
+    - rate (Union[None, float]): The averaged yield, None before the first call.
+    - backoff (int): The number of calls skipped after the last unprofitable call.
+    """
+
+    def __init__(self) -> None:
+        self.rate: Union[None, float] = None
+        self.backoff = 0
+        self.__wait = 0
+
+    def due(self) -> bool:
+        # counts the skipped calls down, True if the technique runs this time
+        if self.__wait:
+            self.__wait -= 1
+            return False
+        return True
+
+    def record(self, seconds: float, removed: int) -> None:
+        rate = removed / max(seconds * 1e6, 1e-3)
+        if self.rate is None:
+            self.rate = rate
+        else:
+            self.rate += YIELD_WEIGHT * (rate - self.rate)
+
+    def update(self, reference: Union[None, float]) -> None:
+        """
+        Sets the calls to skip after a call of the technique.
+
+        Parameters:
+        - reference (Union[None, float]): The yield of propagation, None if it
+          wasn't measured yet, then the technique runs again.
+        """
+        if reference is None or self.rate >= MIN_YIELD_SHARE * reference:
+            self.backoff = 0
+        else:
+            self.backoff = min(max(2 * self.backoff, 1), MAX_BACKOFF)
+        self.__wait = self.backoff
+
+
+class Technique(ABC):
+    """
+    A deduction step of the pipeline, subclasses implement apply().
+
+    Attributes:
+    - name (str): Identifies the technique in SudokuCSP.technique_stats().
+    - by_house (bool): Set by subclasses that look at one house at a time. The
+      pipeline passes them the houses whose cells changed since their last call.
+    - root_only (bool): Only applied when logical_deduction starts from scratch,
+      not at the nodes of the search, where only a few cells changed.
+    - stats (TechniqueStats): The calls, time and removed candidates so far.
+    - schedule (Schedule): The yield at the nodes for the ADAPTIVE policy.
+
+    Techniques keep their stats and schedule, so a list shared by the solvers of
+    a batch adapts to the batch.
+    """
+
+    by_house = False
+
+    def __init__(self, name: str, root_only: bool = False) -> None:
+        self.name = name
+        self.root_only = root_only
+        self.stats = TechniqueStats()
+        self.schedule = Schedule()
+
+    @abstractmethod
+    def apply(
+        self,
+        sudoku: Any,
+        grid: SudokuGrid,
+        queue: Deque[int],
+        houses: Union[None, Iterable[int]] = None,
+    ) -> int:
+        """
+        Removes the candidates the technique rules out.
+
+        Parameters:
+        - sudoku (SudokuCSP): The solver the technique runs for.
+        - grid (SudokuGrid): The grid to deduce on.
+        - queue (deque): The decided cells are appended to it.
+        - houses (Union[None, Iterable[int]]): For by_house techniques the indices of
+          the houses to look at, None for all of them.
+
+        Returns:
+        - int: number of removed candidates
+
+        Raises:
+        - Contradiction: If the grid has no solution.
+        """
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, self.name)
+
+
+class HiddenSingle(Technique):
+    def __init__(self, root_only: bool = False) -> None:
+        super().__init__("hidden_single", root_only)
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.hidden_single(grid, queue)
+
+
+class LockedCandidates(Technique):
+    def __init__(self, root_only: bool = False) -> None:
+        super().__init__("locked_candidates", root_only)
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.locked_candidates(grid, queue)
+
+
+class NakedSubsets(Technique):
+    by_house = True
+
+    def __init__(self, size: int, root_only: bool = False) -> None:
+        super().__init__("naked_subsets_{}".format(size), root_only)
+        self.size = size
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.naked_subsets(grid, self.size, queue, houses)
+
+
+class HiddenSubsets(Technique):
+    by_house = True
+
+    def __init__(self, size: int, root_only: bool = False) -> None:
+        super().__init__("hidden_subsets_{}".format(size), root_only)
+        self.size = size
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.hidden_subsets(grid, self.size, queue, houses)
+
+
+class HouseArcConsistency(Technique):
+    by_house = True
+
+    def __init__(self, root_only: bool = False) -> None:
+        super().__init__("house_arc_consistency", root_only)
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.house_arc_consistency(grid, queue, houses)
+
+
+class Fish(Technique):
+    def __init__(self, size: int, root_only: bool = False) -> None:
+        super().__init__("fish_{}".format(size), root_only)
+        self.size = size
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        return sudoku.fish_patterns(grid, self.size, queue)
+
+
+def default_techniques(
+    subsets: bool = False, arc_consistency: bool = False, fish: bool = False
+) -> List[Technique]:
+    """
+    Builds the pipeline SudokuCSP uses if it isn't given one, cheapest first.
+
+    Parameters:
+    - subsets (bool): Adds naked and hidden subsets of up to MAX_SUBSET_SIZE cells,
+      pairs before triples before quads.
+    - arc_consistency (bool): Adds house_arc_consistency after those.
+    - fish (bool): Adds fish of up to MAX_FISH_SIZE lines last.
+
+    Returns:
+    - List[Technique]: New techniques with empty stats.
+    """
+    techniques: List[Technique] = [HiddenSingle(), LockedCandidates()]
+    if subsets:
+        for size in range(2, MAX_SUBSET_SIZE + 1):
+            techniques += [NakedSubsets(size), HiddenSubsets(size)]
+    if arc_consistency:
+        techniques.append(HouseArcConsistency())
+    if fish:
+        techniques += [Fish(size) for size in range(2, MAX_FISH_SIZE + 1)]
+    return techniques
@@ -1,20 +1,37 @@
 from enum import Enum
 import copy
-from typing import Union, List, TypeVar, Generic
+from collections import deque
+from contextlib import closing
+from typing import Union, List, Set, Dict, Tuple, TypeVar, Generic
 from sudoku.sudokuGrid import SudokuGrid
+from common.stackSearch import SearchStatus, StackSearch, copy_search
+from common.trail import SearchMode, Trail
 import numpy as np
 
 T = TypeVar("T")
 
 
 class Heuristics(Enum):
+    # the variable with the fewest legal values (minimum remaining values)
     LEAST_VALUES = 1
+    # same, ties are broken by the most unassigned neighbours (degree)
     LEAST_CONSTRAINT_VARIABLE = 2
 
 
+class Inference(Enum):
+    # only the constraints of the assigned variable are checked
+    NONE = 1
+    # the values of unassigned neighbours that conflict with the assignment are pruned
+    FORWARD_CHECKING = 2
+    # prunes until every arc between two constrained variables is consistent
+    AC3 = 3
+
+
 class CONSTRAINT(Enum):
     EQUALS = "EQUALS"
     NOT_EQUALS = "NOT_EQUALS"
+    # any number of variables hold pairwise different values, see AllDifferent
+    ALL_DIFFERENT = "ALL_DIFFERENT"
 
 
 class Variable(Generic[T]):
@@ -50,6 +67,16 @@ class Variable(Generic[T]):
             "New domain: {} doesn't contain value: {}".format(domain, current_value)
         )
 
+    def restore(self, key: str, old_value) -> None:
+        # called by the trail to undo a change, skips the domain checks
+        if key == "value":
+            self.__value = old_value
+            return
+        if key == "domain":
+            self.__domain = old_value
+            return
+        raise ValueError("Variable has no attribute: {} to restore".format(key))
+
     def get_variable_name(self) -> str:
         return self.__unique_name
 
@@ -100,6 +127,12 @@ class Constraint:
             raise ValueError("Invalid constraint type: {}".format(constraint))
         self.__constraint = constraint
 
+    def get_variables(self) -> Tuple[Variable, Variable]:
+        return self.__v1, self.__v2
+
+    def get_constraint(self) -> CONSTRAINT:
+        return self.__constraint
+
     def satisfied(self) -> bool:
         # if one field is null, all binary constraints are fulfilled, because there is nothing to compare to
         if self.__v1.get_value() == None or self.__v2.get_value() == None:
@@ -108,7 +141,7 @@ class Constraint:
             return True
         if self.__constraint == CONSTRAINT.EQUALS:
             return self.__v1.get_value() == self.__v2.get_value()
-        if self.__constraint == CONSTRAINT.NOT_EQUALS:
+        if self.__constraint in (CONSTRAINT.NOT_EQUALS, CONSTRAINT.ALL_DIFFERENT):
             return self.__v1.get_value() != self.__v2.get_value()
 
     def __str__(self) -> str:
@@ -120,6 +153,285 @@ class Constraint:
         return res
 
 
+class AllDifferent(Constraint):
+    """
+    An n-ary constraint, the assigned variables of its scope hold pairwise different
+    values. One AllDifferent replaces the n * (n - 1) / 2 NOT_EQUALS constraints of
+    a sudoku house.
+
+    Methods:
+    - satisfied() -> bool:
+        True if no value is held by two assigned variables.
+
+    - revise(singletons: bool = False) -> Union[None, List[Tuple[Variable, List]]]:
+        The domains of the unassigned variables without the values taken in the scope.
+
+    Raises:
+    - ValueError: If the scope has less than two variables.
+    """
+
+    def __init__(self, variables: List[Variable]) -> None:
+        if len(variables) < 2:
+            raise ValueError(
+                "AllDifferent needs at least 2 variables, got {}".format(len(variables))
+            )
+        super().__init__(variables[0], variables[1], CONSTRAINT.ALL_DIFFERENT)
+        self.__variables = tuple(variables)
+
+    def get_variables(self) -> Tuple[Variable, ...]:
+        return self.__variables
+
+    def satisfied(self) -> bool:
+        seen = set()
+        for variable in self.__variables:
+            value = variable.get_value()
+            if value is None:
+                continue
+            if value in seen:
+                return False
+            seen.add(value)
+        return True
+
+    def revise(
+        self, singletons: bool = False
+    ) -> Union[None, List[Tuple[Variable, List]]]:
+        """
+        Removes the values of the assigned variables of the scope from the domains of
+        the unassigned ones in one pass over the scope (forward checking).
+
+        Parameters:
+        - singletons (bool): Unassigned variables with a single value left take it
+          as well, until no domain changes. Together with a check that the
+          unassigned variables have at least as many values as there are of them,
+          this prunes at least as much as arc consistency of the pairwise
+          NOT_EQUALS constraints.
+
+        Returns:
+        - Union[None, List[Tuple[Variable, List]]]: None if two variables have the
+          same value or a domain got wiped out, otherwise the unassigned variables
+          with a changed domain and their new domain. The variables aren't changed.
+        """
+        # value -> position of the unassigned variable it is the last value of,
+        # -1 if an assigned variable holds it
+        taken: Dict = {}
+        unassigned = []
+        for variable in self.__variables:
+            if not variable.value_is_assigned():
+                unassigned.append(variable)
+                continue
+            if variable.get_value() in taken:
+                return None
+            taken[variable.get_value()] = -1
+
+        domains = [variable.get_domain() for variable in unassigned]
+        changed = [False] * len(unassigned)
+        while True:
+            for position, domain in enumerate(domains):
+                pruned = [
+                    value for value in domain if taken.get(value, position) == position
+                ]
+                if not pruned:
+                    return None
+                if len(pruned) != len(domain):
+                    domains[position] = pruned
+                    changed[position] = True
+            if not singletons:
+                break
+
+            grown = False
+            for position, domain in enumerate(domains):
+                if len(domain) != 1:
+                    continue
+                owner = taken.get(domain[0])
+                if owner is None:
+                    taken[domain[0]] = position
+                    grown = True
+                elif owner != position:
+                    return None
+            if not grown:
+                break
+
+        if singletons:
+            values = {value for domain in domains for value in domain}
+            if len(values) < len(domains):
+                return None
+        return [
+            (variable, domain)
+            for variable, domain, change in zip(unassigned, domains, changed)
+            if change
+        ]
+
+    def __str__(self) -> str:
+        res = ""
+        for variable in self.__variables:
+            res += variable.__str__()
+        res += CONSTRAINT.ALL_DIFFERENT.name
+        return res
+
+
+class LegalValues:
+    """
+    Keeps the unassigned variables of a state in buckets by their number of legal
+    values, the values of their domain no assigned neighbour holds.
+
+    Neighbours are the variables sharing a NOT_EQUALS or ALL_DIFFERENT constraint.
+    Every assignment
+    updates the neighbours of the variable only, so the variable with the fewest
+    legal values is found by looking at the lowest non empty bucket instead of
+    checking every value of every variable. The domains are read when the tracker is
+    created, later changes are reported with set_domain().
+
+    Methods:
+    - assign(index: int, old_value, new_value) -> None:
+        Registers that the value of a variable changed, None means unassigned.
+
+    - set_domain(index: int, domain) -> None:
+        Registers that the domain of a variable got pruned or restored.
+
+    - fewest_legal_values(by_degree: bool = False) -> Union[None, int]:
+        Returns an unassigned variable with the fewest legal values.
+    """
+
+    def __init__(
+        self,
+        variables: List[Variable],
+        constraints: Union[None, List[Constraint]] = None,
+    ) -> None:
+        self.__positions: Dict[str, int] = {
+            variable.get_variable_name(): index
+            for index, variable in enumerate(variables)
+        }
+        neighbours: List[Set[int]] = [set() for _ in variables]
+        for constraint in constraints or []:
+            if constraint.get_constraint() not in (
+                CONSTRAINT.NOT_EQUALS,
+                CONSTRAINT.ALL_DIFFERENT,
+            ):
+                continue
+            scope = [
+                self.__positions[variable.get_variable_name()]
+                for variable in constraint.get_variables()
+            ]
+            for position in scope:
+                neighbours[position].update(scope)
+                neighbours[position].discard(position)
+        # a neighbour in several constraints still holds its value only once
+        self.__neighbours: List[List[int]] = [
+            sorted(neighbours_of_variable) for neighbours_of_variable in neighbours
+        ]
+
+        self.__domains: List[Set] = [
+            set(variable.get_domain()) for variable in variables
+        ]
+        # per variable and value the number of assigned neighbours holding the value
+        self.__conflicts: List[Dict] = [{} for _ in variables]
+        self.__legal: List[int] = [len(domain) for domain in self.__domains]
+        self.__assigned: List[bool] = [False] * len(variables)
+        self.__buckets: List[Set[int]] = [
+            set() for _ in range(max(self.__legal, default=0) + 1)
+        ]
+        for index in range(len(variables)):
+            self.__buckets[self.__legal[index]].add(index)
+
+        for index, variable in enumerate(variables):
+            if variable.value_is_assigned():
+                self.assign(index, None, variable.get_value())
+
+    def assign(self, index: int, old_value, new_value) -> None:
+        if old_value == new_value:
+            return
+
+        if old_value is not None:
+            for neighbour in self.__neighbours[index]:
+                self.__change_conflicts(neighbour, old_value, -1)
+        if new_value is not None:
+            for neighbour in self.__neighbours[index]:
+                self.__change_conflicts(neighbour, new_value, 1)
+
+        if new_value is None:
+            self.__assigned[index] = False
+            self.__buckets[self.__legal[index]].add(index)
+        elif old_value is None:
+            self.__assigned[index] = True
+            self.__buckets[self.__legal[index]].discard(index)
+
+    def set_domain(self, index: int, domain) -> None:
+        # the conflicts of values outside of the domain aren't counted, a pruned
+        # value only comes back when the trail undoes the assignments after it
+        self.__domains[index] = set(domain)
+        conflicts = self.__conflicts[index]
+        legal = sum(not conflicts.get(value) for value in self.__domains[index])
+
+        if not self.__assigned[index]:
+            self.__buckets[self.__legal[index]].discard(index)
+            if legal >= len(self.__buckets):
+                self.__buckets.extend(
+                    set() for _ in range(legal - len(self.__buckets) + 1)
+                )
+            self.__buckets[legal].add(index)
+        self.__legal[index] = legal
+
+    def __change_conflicts(self, index: int, value, change: int) -> None:
+        if value not in self.__domains[index]:
+            return
+        conflicts = self.__conflicts[index]
+        before = conflicts.get(value, 0)
+        conflicts[value] = before + change
+        if before and conflicts[value]:
+            return
+
+        # the value got legal or illegal
+        legal = self.__legal[index]
+        self.__legal[index] = legal - change
+        if not self.__assigned[index]:
+            self.__buckets[legal].discard(index)
+            self.__buckets[legal - change].add(index)
+
+    def fewest_legal_values(self, by_degree: bool = False) -> Union[None, int]:
+        """
+        Returns the unassigned variable with the fewest legal values, if several have
+        as few the first of them. A variable without legal values is returned first,
+        its branch fails right away.
+
+        Parameters:
+        - by_degree (bool): Breaks ties by the most unassigned neighbours instead.
+
+        Returns:
+        - Union[None, int]: The position of the variable, None if all are assigned.
+        """
+        for bucket in self.__buckets:
+            if not bucket:
+                continue
+            if not by_degree or len(bucket) == 1:
+                return min(bucket)
+            return max(bucket, key=lambda index: (self.get_degree(index), -index))
+        return None
+
+    def get_position(self, variable_name: str) -> int:
+        return self.__positions[variable_name]
+
+    def get_legal_values(self, index: int) -> int:
+        return self.__legal[index]
+
+    def get_degree(self, index: int) -> int:
+        return sum(
+            not self.__assigned[neighbour] for neighbour in self.__neighbours[index]
+        )
+
+    def __deepcopy__(self, memo) -> "LegalValues":
+        # the positions and neighbours never change and are shared between copies,
+        # set_domain replaces a domain instead of changing it
+        legal_values = LegalValues.__new__(LegalValues)
+        legal_values.__positions = self.__positions
+        legal_values.__neighbours = self.__neighbours
+        legal_values.__domains = self.__domains.copy()
+        legal_values.__conflicts = [conflicts.copy() for conflicts in self.__conflicts]
+        legal_values.__legal = self.__legal.copy()
+        legal_values.__assigned = self.__assigned.copy()
+        legal_values.__buckets = [bucket.copy() for bucket in self.__buckets]
+        return legal_values
+
+
 class CSP(Generic[T]):
     def __init__(
         self,
@@ -129,6 +441,25 @@ class CSP(Generic[T]):
         self.__variables = variables
         self.__constraints = constraints
 
+        # the first variable of every name, like the former scan of the list
+        self.__variables_by_name: Dict[str, Variable[T]] = {}
+        for variable in variables:
+            self.__variables_by_name.setdefault(variable.get_variable_name(), variable)
+
+        # positions of the constraints on each variable, tuples of ints are shared
+        # instead of copied when the state gets deep copied
+        incident: Dict[str, List[int]] = {}
+        for position, constraint in enumerate(constraints or []):
+            for variable in constraint.get_variables():
+                positions = incident.setdefault(variable.get_variable_name(), [])
+                if position not in positions[-1:]:
+                    positions.append(position)
+        self.__incident: Dict[str, Tuple[int, ...]] = {
+            name: tuple(positions) for name, positions in incident.items()
+        }
+        # built on first use by _get_arcs
+        self.__arcs: Union[None, Dict[str, Tuple[Tuple[str, CONSTRAINT], ...]]] = None
+
     def _get_variables(self) -> List[Variable[T]]:
         return self.__variables
 
@@ -136,10 +467,58 @@ class CSP(Generic[T]):
         return self.__constraints
 
     def get_variable_by_name(self, variable_name: str) -> Variable[T]:
-        for variable in self._get_variables():
-            if variable.get_variable_name() == variable_name:
-                return variable
-        raise ValueError("variable name: {} doesnt exist".format(variable_name))
+        variable = self.__variables_by_name.get(variable_name)
+        if variable is None:
+            raise ValueError("variable name: {} doesnt exist".format(variable_name))
+        return variable
+
+    def get_constraints_of_variable(self, variable_name: str) -> List[Constraint]:
+        return [
+            self.__constraints[position]
+            for position in self._get_incident(variable_name)
+        ]
+
+    def _get_incident(self, variable_name: str) -> Tuple[int, ...]:
+        return self.__incident.get(variable_name, ())
+
+    def _get_arcs(self, variable_name: str) -> Tuple[Tuple[str, CONSTRAINT], ...]:
+        """
+        Returns the binary constraints of a variable as (neighbour name, relation).
+
+        The relation is EQUALS or NOT_EQUALS, both directions of an arc are listed
+        under their variable, a binary ALL_DIFFERENT constraint is a NOT_EQUALS arc.
+        AllDifferent constraints aren't split into arcs, they prune their scope at
+        once, see _get_all_different.
+        """
+        if self.__arcs is None:
+            arcs: Dict[str, Dict[Tuple[str, CONSTRAINT], None]] = {}
+            for constraint in self.__constraints or []:
+                if isinstance(constraint, AllDifferent):
+                    continue
+                relation = (
+                    CONSTRAINT.EQUALS
+                    if constraint.get_constraint() == CONSTRAINT.EQUALS
+                    else CONSTRAINT.NOT_EQUALS
+                )
+                names = [
+                    variable.get_variable_name()
+                    for variable in constraint.get_variables()
+                ]
+                for name in names:
+                    for other in names:
+                        if other != name:
+                            # a dict keeps every arc once, in the order of the constraints
+                            arcs.setdefault(name, {})[(other, relation)] = None
+            self.__arcs = {name: tuple(arcs_of) for name, arcs_of in arcs.items()}
+        return self.__arcs.get(variable_name, ())
+
+    def _get_all_different(self, variable_name: str) -> Tuple[int, ...]:
+        # the positions of the AllDifferent constraints of a variable
+        return tuple(
+            position
+            for position in self._get_incident(variable_name)
+            if isinstance(self.__constraints[position], AllDifferent)
+        )
 
     def _all_variables_assigned(self) -> bool:
         for variable in self._get_variables():
@@ -171,6 +550,22 @@ class State(CSP, Generic[T]):
         constraints: Union[None, List[Constraint]] = None,
     ) -> None:
         super().__init__(variables, constraints)
+        self.__trail: Union[None, Trail] = None
+        self.__legal_values: Union[None, LegalValues] = None
+
+    def set_trail(self, trail: Union[None, Trail]) -> None:
+        self.__trail = trail
+
+    def get_trail(self) -> Union[None, Trail]:
+        return self.__trail
+
+    def get_legal_values(self) -> LegalValues:
+        # created on first use, the assignments of _assign keep it up to date
+        if self.__legal_values is None:
+            self.__legal_values = LegalValues(
+                self._get_variables(), self._get_constraints()
+            )
+        return self.__legal_values
 
     def valid_solution(self) -> bool:
         return self._all_variables_assigned() and self.valid_state()
@@ -183,11 +578,221 @@ class State(CSP, Generic[T]):
                 return False
         return True
 
+    def valid_assignment(self, variable: Variable[T]) -> bool:
+        """
+        Checks the constraints on a single variable, after it got assigned only those
+        can have become unsatisfied. The state is valid if it was before.
+
+        Parameters:
+        - variable (Variable): The variable that got assigned, found by its name.
+
+        Returns:
+        - bool: True if every constraint on the variable is satisfied.
+        """
+        constraints = self._get_constraints()
+        for position in self._get_incident(variable.get_variable_name()):
+            if not constraints[position].satisfied():
+                return False
+        return True
+
     def _next_state(self, variable: Variable[T], value: [T]):
         new_state = copy.deepcopy(self)
-        new_state.get_variable_by_name(variable.get_variable_name()).set_value(value)
+        new_state._assign(variable, value)
         return new_state
 
+    def _assign(self, variable: Variable[T], value: [T]) -> None:
+        # assigns the value in place, the old value is recorded on the trail if set
+        variable = self.get_variable_by_name(variable.get_variable_name())
+        old_value = variable.get_value()
+        variable.set_value(value)
+        if self.__trail is not None:
+            self.__trail.record(self, variable, old_value)
+        self.__track(variable, old_value, value)
+
+    def _set_domain(self, variable: Variable[T], domain: List[T]) -> None:
+        # prunes the domain in place, the old domain is recorded on the trail if set
+        variable = self.get_variable_by_name(variable.get_variable_name())
+        old_domain = variable.get_domain()
+        variable.set_domain(domain)
+        if self.__trail is not None:
+            self.__trail.record(self, (variable, "domain"), old_domain)
+        self.__track_domain(variable, domain)
+
+    def restore(self, variable: Variable[T], old_value: [T]) -> None:
+        # called by the trail to undo an _assign, or a _set_domain with the key
+        # (variable, "domain")
+        if isinstance(variable, tuple):
+            variable, key = variable
+            variable.restore(key, old_value)
+            self.__track_domain(variable, old_value)
+            return
+        self.__track(variable, variable.get_value(), old_value)
+        variable.restore("value", old_value)
+
+    def __track(self, variable: Variable[T], old_value: [T], new_value: [T]) -> None:
+        if self.__legal_values is not None:
+            self.__legal_values.assign(
+                self.__legal_values.get_position(variable.get_variable_name()),
+                old_value,
+                new_value,
+            )
+
+    def __track_domain(self, variable: Variable[T], domain: List[T]) -> None:
+        if self.__legal_values is not None:
+            self.__legal_values.set_domain(
+                self.__legal_values.get_position(variable.get_variable_name()), domain
+            )
+
+    def forward_check(self, variable: Variable[T]) -> bool:
+        """
+        Prunes the value of an assigned variable from the domains of its unassigned
+        neighbours, or for EQUALS constraints everything else. Its ALL_DIFFERENT
+        constraints remove the values of all assigned variables of their scope.
+
+        Parameters:
+        - variable (Variable): The variable that got assigned, found by its name.
+
+        Returns:
+        - bool: False if the domain of a neighbour got wiped out, it is left as is.
+        """
+        name = variable.get_variable_name()
+        value = self.get_variable_by_name(name).get_value()
+        constraints = self._get_constraints()
+        for position in self._get_all_different(name):
+            revised = constraints[position].revise()
+            if revised is None:
+                return False
+            for neighbour, domain in revised:
+                self._set_domain(neighbour, domain)
+
+        for name, relation in self._get_arcs(name):
+            neighbour = self.get_variable_by_name(name)
+            if neighbour.value_is_assigned():
+                continue
+            domain = neighbour.get_domain()
+            pruned = [
+                candidate
+                for candidate in domain
+                if self.__supports(relation, candidate, value)
+            ]
+            if len(pruned) == len(domain):
+                continue
+            if not pruned:
+                return False
+            self._set_domain(neighbour, pruned)
+        return True
+
+    def arc_consistency(self, variable: Union[None, Variable[T]] = None) -> bool:
+        """
+        Prunes domains until every arc is consistent (AC-3): every value left in the
+        domain of a variable has a supporting value in the domain of each neighbour.
+        Assigned variables count with their value as domain. ALL_DIFFERENT
+        constraints are revised as a whole (AllDifferent.revise with singletons),
+        which prunes at least as much as their pairwise arcs.
+
+        Parameters:
+        - variable (Union[None, Variable]): Optional. The variable that got assigned,
+          only the arcs towards it are revised first. If None, every arc is.
+
+        Returns:
+        - bool: False if a domain got wiped out or the value of an assigned variable
+          lost its support, the domains are left partly pruned.
+        """
+        # the queue holds arcs (name, neighbour name, relation) and the positions of
+        # AllDifferent constraints
+        constraints = self._get_constraints()
+        if variable is None:
+            names = [other.get_variable_name() for other in self._get_variables()]
+            queue = deque(
+                (name, neighbour, relation)
+                for name in names
+                for neighbour, relation in self._get_arcs(name)
+            )
+            queue.extend(
+                position
+                for position, constraint in enumerate(constraints or [])
+                if isinstance(constraint, AllDifferent)
+            )
+        else:
+            name = variable.get_variable_name()
+            queue = deque(
+                (neighbour, name, relation)
+                for neighbour, relation in self._get_arcs(name)
+            )
+            queue.extend(self._get_all_different(name))
+        pending = set(queue)
+
+        def changed(name: str, skip) -> None:
+            # queues everything that has to be revised after the domain of name
+            # changed, except skip
+            for other, relation in self._get_arcs(name):
+                arc = (other, name, relation)
+                if other != skip and arc not in pending:
+                    pending.add(arc)
+                    queue.append(arc)
+            for position in self._get_all_different(name):
+                if position != skip and position not in pending:
+                    pending.add(position)
+                    queue.append(position)
+
+        while queue:
+            item = queue.popleft()
+            pending.discard(item)
+            if isinstance(item, int):
+                revised = constraints[item].revise(singletons=True)
+                if revised is None:
+                    return False
+                for other, domain in revised:
+                    self._set_domain(other, domain)
+                    changed(other.get_variable_name(), item)
+                continue
+
+            revised = self.__revise(*item)
+            if revised is None:
+                return False
+            if revised:
+                changed(item[0], item[1])
+        return True
+
+    def __revise(
+        self, name: str, neighbour_name: str, relation: CONSTRAINT
+    ) -> Union[None, bool]:
+        # removes the values of a variable without support in the domain of the
+        # neighbour, returns None on a wipe out and if the domain changed otherwise
+        variable = self.get_variable_by_name(name)
+        neighbour_domain = self.__current_domain(
+            self.get_variable_by_name(neighbour_name)
+        )
+        if relation == CONSTRAINT.NOT_EQUALS and len(neighbour_domain) > 1:
+            # every value differs from one of them
+            return False
+
+        domain = self.__current_domain(variable)
+        supported = [
+            candidate
+            for candidate in domain
+            if any(
+                self.__supports(relation, candidate, other)
+                for other in neighbour_domain
+            )
+        ]
+        if len(supported) == len(domain):
+            return False
+        if not supported or variable.value_is_assigned():
+            return None
+        self._set_domain(variable, supported)
+        return True
+
+    def __current_domain(self, variable: Variable[T]) -> List[T]:
+        if variable.value_is_assigned():
+            return [variable.get_value()]
+        return variable.get_domain()
+
+    def __supports(self, relation: CONSTRAINT, value: T, other: T) -> bool:
+        if relation == CONSTRAINT.EQUALS:
+            return value == other
+        return value != other
+
     def __str__(self) -> str:
         res = ""
         for variable in self._get_variables():
@@ -198,41 +803,127 @@ class State(CSP, Generic[T]):
 
 class Backtracking(Generic[T]):
     def __init__(
-        self, init_state: State[T], heuristics: Union[None, Heuristics] = None
+        self,
+        init_state: State[T],
+        heuristics: Union[None, Heuristics] = None,
+        search_mode: SearchMode = SearchMode.COPY,
+        inference: Inference = Inference.NONE,
     ) -> None:
         self.__heuristics = heuristics
         self.__problem = init_state
+        self.__search_mode = search_mode
+        self.__inference = inference
 
     def solve(self) -> Union[State, None]:
-        return self.__backtracking(self.__problem)
+        # the search only checks the constraints of the variables it assigns
+        if not self.__problem.valid_state():
+            return None
+        if self.__search_mode == SearchMode.TRAIL:
+            return self.__trail_backtracking(self.__problem)
+
+        root_state = self.__problem
+        if self.__inference != Inference.NONE:
+            # the initial domains are pruned on a copy, like every state after it
+            root_state = copy.deepcopy(root_state)
+            if not self.__infer(root_state):
+                return None
+        return self.__backtracking(root_state)
+
+    def __backtracking(self, root_state: State) -> Union[State, None]:
+        # every candidate is tried on a copy, the levels are kept on a stack
+        return copy_search(
+            root_state,
+            self.__choose_branch,
+            self.__copy_candidate,
+            lambda state: state.valid_solution(),
+        )
 
-    def __backtracking(
-        self, root_state: State, seen: List[State] = []
+    def __copy_candidate(
+        self, state: State, variable: Variable, candidate
     ) -> Union[State, None]:
+        new_state = state._next_state(variable, candidate)
+        if new_state.valid_assignment(variable) and self.__infer(new_state, variable):
+            return new_state
+        return None
 
-        if root_state in seen:
+    def __trail_backtracking(self, state: State) -> Union[State, None]:
+        """
+        Searches for a solution by assigning the variables of the given state in place.
+
+        Assignments of a failed branch are undone from a trail instead of deep copying
+        the state for every candidate.
+
+        Returns:
+        - Union[State, None]: The given state holding the solution, or None if there
+          is none, in which case the state is restored to its initial assignment.
+        """
+        with closing(self.__stack_search()) as search:
+            if self.__infer(state) and search.run() == SearchStatus.SOLVED:
+                return state
+            # the pruning of the initial domains is on the trail as well
+            search.get_trail().undo(0)
             return None
 
-        if root_state.valid_solution():
-            return root_state
-
-        variable_to_assign = self.__variable_to_assign(root_state)
-
-        for candidate in variable_to_assign.get_domain():
-            new_state = root_state._next_state(variable_to_assign, candidate)
-            if new_state.valid_state():
-
-                solution = self.__backtracking(new_state)
-
-                if solution != None:
-                    return solution
+    def search(self) -> StackSearch:
+        """
+        Returns a search on the initial state in place that can be paused and resumed,
+        see common.stackSearch. The levels are kept on an explicit stack, so the
+        number of variables isn't bounded by the recursion limit.
+
+        With inference the initial domains are pruned right away, recorded on the
+        trail of the search. If that wipes out a domain the search fails on its own.
+
+        Returns:
+        - StackSearch: The search, close() it to detach its trail from the state.
+        """
+        search = self.__stack_search()
+        self.__infer(self.__problem)
+        return search
+
+    def __stack_search(self) -> StackSearch:
+        return StackSearch(
+            self.__problem,
+            self.__choose_branch,
+            self.__try_candidate,
+            lambda state: state.valid_solution(),
+        )
 
-        return None
+    def __choose_branch(self, state: State) -> Tuple[Variable, List]:
+        variable_to_assign = self.__variable_to_assign(state)
+        if variable_to_assign is None:
+            # every variable is assigned but the state isn't valid
+            return None, []
+        return variable_to_assign, variable_to_assign.get_domain()
+
+    def __try_candidate(self, state: State, variable: Variable, candidate) -> bool:
+        state._assign(variable, candidate)
+        return state.valid_assignment(variable) and self.__infer(state, variable)
+
+    def __infer(self, state: State, variable: Union[None, Variable] = None) -> bool:
+        # prunes domains after variable got assigned, or after the initial
+        # assignments if None. False if a domain got wiped out
+        if self.__inference == Inference.FORWARD_CHECKING:
+            if variable is not None:
+                return state.forward_check(variable)
+            return all(
+                state.forward_check(assigned)
+                for assigned in state._get_variables()
+                if assigned.value_is_assigned()
+            )
+        if self.__inference == Inference.AC3:
+            return state.arc_consistency(variable)
+        return True
 
     def __variable_to_assign(self, state: State) -> Union[Variable, None]:
         if self.__heuristics == None:
             return self.__first_unassigned_variable(state._get_variables())
-        raise NotImplementedError("Implement other heuristics")
+
+        index = state.get_legal_values().fewest_legal_values(
+            by_degree=self.__heuristics == Heuristics.LEAST_CONSTRAINT_VARIABLE
+        )
+        if index is None:
+            return None
+        return state._get_variables()[index]
 
     def __first_unassigned_variable(self, variables: List[Variable]) -> Variable:
         for variable in variables:
@@ -1,29 +1,10 @@
 from typing import Union, Tuple
 import numpy as np
 from typing import Set
+from common.houses import ROWS, COLUMNS, all_blocks, all_columns, all_rows
 
-ROWS, COLUMNS = (9, 9)
 DIGITS = 10
 
-# same for rows
-all_rows = [[(row, column) for column in range(COLUMNS)] for row in range(ROWS)]
-
-# return columns' lists of cells
-all_columns = [[(row, column) for row in range(ROWS)] for column in range(COLUMNS)]
-
-# same for blocks
-# this list comprehension is unreadable, but quite cool!
-all_blocks = [
-    [
-        ((row // 3) * 3 + column // 3, (row % 3) * 3 + column % 3)
-        for column in range(COLUMNS)
-    ]
-    for row in range(ROWS)
-]
-
-# combine three
-all_houses = all_columns + all_rows + all_blocks
-
 
 class InvalidSudokuInput(Exception):
     pass
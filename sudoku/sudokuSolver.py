@@ -1,30 +1,18 @@
 import numpy as np
 from typing import Union, Tuple, List, Set
-from sudoku.sudokuGrid import SudokuGrid, ROWS, COLUMNS, DIGITS
-from sudoku.backtracking import Variable, Constraint, CONSTRAINT, State, Backtracking
+from sudoku.sudokuGrid import SudokuGrid, COLUMNS, DIGITS
+from sudoku.backtracking import (
+    AllDifferent,
+    Variable,
+    Constraint,
+    State,
+    Backtracking,
+)
+from common.houses import all_houses, all_rows
 import time
 
 DEBUG = True
 
-# same for rows
-all_rows = [[(row, column) for column in range(COLUMNS)] for row in range(ROWS)]
-
-# return columns' lists of cells
-all_columns = [[(row, column) for row in range(ROWS)] for column in range(COLUMNS)]
-
-# same for blocks
-# this list comprehension is unreadable, but quite cool!
-all_blocks = [
-    [
-        ((row // 3) * 3 + column // 3, (row % 3) * 3 + column % 3)
-        for column in range(COLUMNS)
-    ]
-    for row in range(ROWS)
-]
-
-# combine three
-all_houses = all_columns + all_rows + all_blocks
-
 
 def print_debug(msg):
     if DEBUG:
@@ -292,51 +280,12 @@ class SudokuCSPAdapter:
     def __generate_sudoku_constraints(
         variables: List[Variable[int]],
     ) -> List[Constraint]:
-        constraints: List[Constraint] = []
-        # Generate constraints for each row
-        variable_positions = [variable.get_variable_name() for variable in variables]
-
-        for row in range(9):
-            for col1 in range(8):
-                for col2 in range(col1 + 1, 9):
-                    v1 = variables[
-                        variable_positions.index("({}, {})".format(row, col1))
-                    ]
-                    v2 = variables[
-                        variable_positions.index("({}, {})".format(row, col2))
-                    ]
-                    constraints.append(Constraint(v1, v2, CONSTRAINT.NOT_EQUALS))
-
-        # Generate constraints for each column
-        for col in range(9):
-            for row1 in range(8):
-                for row2 in range(row1 + 1, 9):
-                    v1 = variables[
-                        variable_positions.index("({}, {})".format(row1, col))
-                    ]
-                    v2 = variables[
-                        variable_positions.index("({}, {})".format(row2, col))
-                    ]
-                    constraints.append(Constraint(v1, v2, CONSTRAINT.NOT_EQUALS))
-
-        # Generate constraints for each 3x3 subgrid
-        for start_row in range(0, 9, 3):
-            for start_col in range(0, 9, 3):
-                for i in range(8):
-                    for j in range(i + 1, 9):
-                        v1 = variables[
-                            variable_positions.index(
-                                "({}, {})".format(start_row + i // 3, start_col + i % 3)
-                            )
-                        ]
-                        v2 = variables[
-                            variable_positions.index(
-                                "({}, {})".format(start_row + j // 3, start_col + j % 3)
-                            )
-                        ]
-                        constraints.append(Constraint(v1, v2, CONSTRAINT.NOT_EQUALS))
-
-        return constraints
+        # one AllDifferent per column, row and block, the variables are in row major
+        # order (see __cells_to_variables)
+        return [
+            AllDifferent([variables[row * COLUMNS + column] for row, column in house])
+            for house in all_houses
+        ]
 
     @staticmethod
     def __cells_to_variables(sudoku_grid: SudokuGrid) -> List[Variable[int]]:
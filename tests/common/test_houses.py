@@ -0,0 +1,70 @@
+from common.houses import (
+    CELLS,
+    HOUSES,
+    CELL_HOUSE_TUPLES,
+    HOUSE_CELL_TUPLES,
+    INTERSECTION_TUPLES,
+    PEER_TUPLES,
+    all_houses,
+    all_peers,
+    cell_index,
+    cell_position,
+)
+
+"""
+Testing the precomputed lookup tables
+"""
+
+
+def test_cell_index_and_position():
+    assert cell_index((0, 0)) == 0
+    assert cell_index((1, 0)) == 9
+    assert cell_index((8, 8)) == 80
+    for index in range(CELLS):
+        assert cell_index(cell_position(index)) == index
+
+
+def test_house_cells_match_all_houses():
+    assert len(HOUSE_CELL_TUPLES) == HOUSES
+    for house, positions in zip(HOUSE_CELL_TUPLES, all_houses):
+        assert house == tuple(cell_index(position) for position in positions)
+
+
+def test_cell_houses():
+    assert len(CELL_HOUSE_TUPLES) == CELLS
+    assert CELL_HOUSE_TUPLES[10] == (1, 10, 18), "column 1, row 1 and block 0"
+    assert CELL_HOUSE_TUPLES[80] == (8, 17, 26)
+    for index in range(CELLS):
+        for house in CELL_HOUSE_TUPLES[index]:
+            assert index in HOUSE_CELL_TUPLES[house]
+
+
+def test_all_peers():
+    assert len(all_peers) == 81
+    for cell, peers in all_peers.items():
+        assert len(peers) == 20, "every cell has 20 peers"
+        assert cell not in peers
+    assert (0, 8) in all_peers[(0, 0)] and (8, 0) in all_peers[(0, 0)]
+    assert (2, 2) in all_peers[(0, 0)] and (3, 3) not in all_peers[(0, 0)]
+
+
+def test_cell_peers():
+    assert len(PEER_TUPLES) == CELLS
+    for index in range(CELLS):
+        expected = {
+            other
+            for house in CELL_HOUSE_TUPLES[index]
+            for other in HOUSE_CELL_TUPLES[house]
+        } - {index}
+        assert set(PEER_TUPLES[index]) == expected
+        assert len(PEER_TUPLES[index]) == 20
+
+
+def test_intersections():
+    assert len(INTERSECTION_TUPLES) == 54
+    blocks = [set(HOUSE_CELL_TUPLES[block]) for block in range(18, 27)]
+    lines = [set(HOUSE_CELL_TUPLES[line]) for line in range(18)]
+    for shared, block_rest, line_rest in INTERSECTION_TUPLES:
+        assert len(shared) == 3 and len(block_rest) == 6 and len(line_rest) == 6
+        assert set(shared) | set(block_rest) in blocks
+        assert set(shared) | set(line_rest) in lines
@@ -0,0 +1,150 @@
+import copy
+import sys
+import pytest
+from common.stackSearch import SearchStatus
+from common.trail import SearchMode
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics
+from sudoku.backtracking import Backtracking, State, Variable, Constraint, CONSTRAINT
+
+"""
+Testing the StackSearch() class and its use by both engines
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+HARD_SOLUTION = (
+    "895476312426931857371528694569713428284659731137842569952387146713264985648195273"
+)
+# the digits of a rectangle of empty cells in two blocks can be swapped
+TWO_SOLUTIONS = (
+    "895476010426931857371528694569713428284659731137842569952387146713264985648195070"
+)
+
+
+def to_string(grid) -> str:
+    return "".join(str(cell[0]) for cell in grid)
+
+
+def prepared_sudoku(grid_class, sudoku_str: str) -> SudokuCSP:
+    sudoku = SudokuCSP(grid_class(sudoku_str), Heuristics.LEAST_VALUES)
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    return sudoku
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_run(grid_class):
+    sudoku = prepared_sudoku(grid_class, HARD_SUDOKU)
+    search = sudoku.search()
+    assert search.run() == SearchStatus.SOLVED
+    assert to_string(sudoku.grid) == HARD_SOLUTION
+    assert search.get_nodes() == sudoku.nodes
+    assert sudoku.grid.get_trail() is search.get_trail()
+
+    search.close()
+    assert sudoku.grid.get_trail() is None
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_pause_and_resume(grid_class):
+    sudoku = prepared_sudoku(grid_class, HARD_SUDOKU)
+    nodes = SudokuCSP(copy.deepcopy(sudoku.grid), Heuristics.LEAST_VALUES).search()
+    assert nodes.run() == SearchStatus.SOLVED
+
+    search = sudoku.search()
+    runs = 1
+    while search.run(budget=10) == SearchStatus.PAUSED:
+        runs += 1
+    assert to_string(sudoku.grid) == HARD_SOLUTION
+    assert search.get_nodes() == nodes.get_nodes()
+    assert runs == -(-nodes.get_nodes() // 10)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_all_solutions_then_exhausted(grid_class):
+    sudoku = prepared_sudoku(grid_class, TWO_SOLUTIONS)
+    before = to_string(sudoku.grid)
+    search = sudoku.search()
+    solutions = []
+    while search.run() == SearchStatus.SOLVED:
+        solutions.append(to_string(sudoku.grid))
+    assert len(set(solutions)) == 2
+    assert search.is_exhausted()
+    assert search.get_depth() == 0
+    assert search.run() == SearchStatus.EXHAUSTED
+    assert to_string(sudoku.grid) == before, "the grid should be restored"
+
+
+def test_solved_state():
+    sudoku = prepared_sudoku(BitmaskGrid, HARD_SOLUTION)
+    search = sudoku.search()
+    assert search.run() == SearchStatus.SOLVED
+    assert search.run() == SearchStatus.EXHAUSTED
+    assert search.get_nodes() == 0
+
+
+def test_zero_and_negative_budget():
+    search = prepared_sudoku(BitmaskGrid, HARD_SUDOKU).search()
+    assert search.run(budget=0) == SearchStatus.PAUSED
+    assert search.get_nodes() == 0
+    with pytest.raises(ValueError):
+        search.run(budget=-1)
+
+
+def test_deeper_than_recursion_limit():
+    # a chain of variables that have to alternate, the search is as deep as the chain
+    variables = [
+        Variable[int]("v{}".format(index), None, [1, 2])
+        for index in range(sys.getrecursionlimit() + 100)
+    ]
+    constraints = [
+        Constraint(v1, v2, CONSTRAINT.NOT_EQUALS)
+        for v1, v2 in zip(variables, variables[1:])
+    ]
+    state = State[int](variables, constraints)
+    solution = Backtracking(state, search_mode=SearchMode.TRAIL).solve()
+    assert solution is state
+    assert [variable.get_value() for variable in variables[:4]] == [1, 2, 1, 2]
+
+
+def test_copy_search_deeper_than_recursion_limit():
+    # the default search copies the state per level, a long chain is slow, so the
+    # recursion limit is lowered to just above the frames of the test instead
+    variables = [
+        Variable[int]("v{}".format(index), None, [1, 2]) for index in range(100)
+    ]
+    constraints = [
+        Constraint(v1, v2, CONSTRAINT.NOT_EQUALS)
+        for v1, v2 in zip(variables, variables[1:])
+    ]
+    state = State[int](variables, constraints)
+    depth, frame = 0, sys._getframe()
+    while frame is not None:
+        depth, frame = depth + 1, frame.f_back
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(depth + 50)
+    try:
+        solution = Backtracking(state).solve()
+    finally:
+        sys.setrecursionlimit(limit)
+    assert solution is not None and solution.valid_solution()
+    assert variables[0].get_value() is None, "the copy search leaves the state as is"
+
+
+def test_backtracking_search_pause():
+    variables = [
+        Variable[int]("v{}".format(index), None, [1, 2, 3]) for index in range(3)
+    ]
+    constraints = [
+        Constraint(variables[0], variables[1], CONSTRAINT.EQUALS),
+        Constraint(variables[1], variables[2], CONSTRAINT.EQUALS),
+        Constraint(variables[0], variables[2], CONSTRAINT.NOT_EQUALS),
+    ]
+    search = Backtracking(State[int](variables, constraints)).search()
+    assert search.run(budget=2) == SearchStatus.PAUSED
+    assert search.run() == SearchStatus.EXHAUSTED
+    for variable in variables:
+        assert variable.get_value() == None, "all assignments should be undone"
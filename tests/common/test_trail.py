@@ -0,0 +1,90 @@
+import pytest
+from common.trail import Trail, SearchMode
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics
+
+"""
+Testing the Trail() class and the in place search of SudokuCSP
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_undo_restores_cells(grid_class):
+    grid = grid_class()
+    trail = Trail()
+    grid.set_trail(trail)
+
+    grid.set_cell((0, 0), [1, 2, 3])
+    mark = trail.mark()
+    grid.set_cell((0, 0), [2])
+    grid.set_cell((8, 8), [4, 5])
+    assert len(trail) == 3
+
+    trail.undo(mark)
+    assert grid.get_cell((0, 0)) == [1, 2, 3]
+    assert grid.get_cell((8, 8)) == [0]
+    assert len(trail) == mark
+
+    trail.undo(0)
+    assert grid.get_cell((0, 0)) == [0]
+
+
+def test_undo_invalid_mark():
+    trail = Trail()
+    with pytest.raises(ValueError, match="Mark: 1 is not on the trail of length 0"):
+        trail.undo(1)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_grid_without_trail_records_nothing(grid_class):
+    grid = grid_class()
+    trail = Trail()
+    grid.set_trail(trail)
+    grid.set_trail(None)
+    grid.set_cell((0, 0), [1])
+    assert len(trail) == 0
+
+
+def test_bitmask_grid_set_mask_is_recorded():
+    grid = BitmaskGrid()
+    trail = Trail()
+    grid.set_trail(trail)
+    grid.set_mask(10, 0b110)
+    trail.undo(0)
+    assert grid.get_cell((1, 1)) == [0]
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_trail_search_finds_same_solution_as_copy_search(grid_class):
+    solutions = []
+    for search_mode in SearchMode:
+        sudoku = SudokuCSP(
+            grid_class(HARD_SUDOKU), Heuristics.LEAST_VALUES, search_mode
+        )
+        sudoku.fill_in_candidates()
+        sudoku.logical_deduction(sudoku.grid)
+        solution = sudoku.backtracking(sudoku.grid)
+        assert sudoku.valid_solution(solution)
+        solutions.append(list(solution))
+
+    assert solutions[0] == solutions[1]
+
+
+def test_trail_search_without_solution_restores_grid():
+    grid = BitmaskGrid(
+        "120000000000000000003000000000000000000000000000000000000000000000000000000000000"
+    )
+    sudoku = SudokuCSP(grid, search_mode=SearchMode.TRAIL)
+    sudoku.fill_in_candidates()
+    # 3 is the only candidate left for (0, 2) in its row but it is taken in its block
+    grid.set_cell((0, 2), [3])
+    before = list(grid)
+
+    assert sudoku.backtracking(grid) is None
+    assert list(grid) == before
+    assert grid.get_trail() is None, "the trail is detached after the search"
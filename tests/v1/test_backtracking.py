@@ -3,6 +3,8 @@ import numpy as np
 from sudoku.backtracking import Backtracking
 from sudoku.sudokuGrid import SudokuGrid, ROWS, COLUMNS
 from sudoku.backtracking import State, Variable, Constraint, CONSTRAINT
+from sudoku.backtracking import Heuristics, Inference, LegalValues, AllDifferent
+from common.trail import SearchMode, Trail
 
 
 @pytest.fixture
@@ -23,12 +25,88 @@ def example_constraints(example_variables):
     ]
 
 
-def test_backtracking_least_values_heuristics():
-    pass
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_backtracking_least_values_heuristics(
+    example_variables, example_constraints, search_mode
+):
+    # v3 has the fewest values and is assigned first, so v2 can't become 1
+    root_state = State[int](example_variables, [example_constraints[2]])
+    backtracking = Backtracking(root_state, Heuristics.LEAST_VALUES, search_mode)
+    res = backtracking.solve()
+    assert res != None
+    assert res.get_variable_by_name("v3").get_value() == 1
+    assert res.get_variable_by_name("v2").get_value() == 2
+    assert res.get_variable_by_name("v1").get_value() == 1
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_backtracking_first_field_heuristics(
+    example_variables, example_constraints, search_mode
+):
+    root_state = State[int](example_variables, [example_constraints[2]])
+    backtracking = Backtracking(root_state, None, search_mode)
+    res = backtracking.solve()
+    assert res != None
+    assert res.get_variable_by_name("v1").get_value() == 1
+    assert res.get_variable_by_name("v2").get_value() == 1
+    assert res.get_variable_by_name("v3").get_value() == 2
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_backtracking_least_constraint_variable_heuristics(
+    example_variables, example_constraints, search_mode
+):
+    root_state = State[int](example_variables, [example_constraints[2]])
+    backtracking = Backtracking(
+        root_state, Heuristics.LEAST_CONSTRAINT_VARIABLE, search_mode
+    )
+    res = backtracking.solve()
+    assert res != None and res.valid_solution()
+
 
+def test_legal_values(example_variables, example_constraints):
+    legal_values = LegalValues(example_variables, example_constraints)
+    assert [legal_values.get_legal_values(index) for index in range(3)] == [3, 3, 2]
+    assert legal_values.fewest_legal_values() == 2
 
-def test_backtracking_first_field_heuristics():
-    pass
+    # v2 = 1 leaves v1 and v3 with one legal value less, the EQUALS isn't counted
+    legal_values.assign(1, None, 1)
+    assert legal_values.get_legal_values(0) == 2
+    assert legal_values.get_legal_values(2) == 1
+    assert legal_values.fewest_legal_values() == 2
+
+    legal_values.assign(1, 1, None)
+    assert legal_values.get_legal_values(0) == 3
+    assert legal_values.get_legal_values(2) == 2
+
+
+def test_legal_values_by_degree(example_variables, example_constraints):
+    example_variables[2].set_domain([1, 2, 3])
+    legal_values = LegalValues(example_variables, example_constraints)
+    # all have three legal values, v2 has the most neighbours
+    assert legal_values.fewest_legal_values() == 0
+    assert legal_values.fewest_legal_values(by_degree=True) == 1
+    assert legal_values.get_degree(1) == 2
+
+
+def test_legal_values_all_assigned(example_variables):
+    legal_values = LegalValues(example_variables)
+    for index in range(3):
+        legal_values.assign(index, None, 1)
+    assert legal_values.fewest_legal_values() == None
+
+
+def test_legal_values_follow_trail_undo(example_variables, example_constraints):
+    root_state = State[int](example_variables, [example_constraints[2]])
+    legal_values = root_state.get_legal_values()
+    trail = Trail()
+    root_state.set_trail(trail)
+
+    root_state._assign(example_variables[1], 2)
+    assert legal_values.get_legal_values(2) == 1
+    trail.undo(0)
+    assert legal_values.get_legal_values(2) == 2
+    assert example_variables[1].get_value() == None
 
 
 def test_backtracking_simple_csp_no_heuristic_no_constraints(example_variables):
@@ -125,3 +203,88 @@ def test_backtracking_with_two_constraints_no_heuristic_lots_of_backtracking(
     assert res.get_variable_by_name("v1").get_value() == 3
     assert res.get_variable_by_name("v2").get_value() == 3
     assert res.get_variable_by_name("v3").get_value() == 2
+
+
+def test_backtracking_trail_search_with_constraints(
+    example_variables, example_constraints
+):
+    example_variables[1].set_domain([2, 3])
+    example_variables[2].set_domain([2])
+
+    root_state = State[int](
+        example_variables, [example_constraints[0], example_constraints[2]]
+    )
+    backtracking = Backtracking(root_state, search_mode=SearchMode.TRAIL)
+    res = backtracking.solve()
+    assert res is root_state, "the trail search assigns the state in place"
+
+    assert res.get_variable_by_name("v1").get_value() == 3
+    assert res.get_variable_by_name("v2").get_value() == 3
+    assert res.get_variable_by_name("v3").get_value() == 2
+
+
+def test_backtracking_trail_search_no_solution_restores_state(
+    example_variables, example_constraints
+):
+    root_state = State[int](
+        example_variables, [example_constraints[0], example_constraints[1]]
+    )
+    backtracking = Backtracking(root_state, search_mode=SearchMode.TRAIL)
+    assert backtracking.solve() == None
+
+    for variable in example_variables:
+        assert variable.get_value() == None, "all assignments should be undone"
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_backtracking_invalid_initial_assignment(
+    example_variables, example_constraints, search_mode
+):
+    example_variables[0].set_value(1)
+    example_variables[1].set_value(2)
+    root_state = State[int](example_variables, [example_constraints[0]])
+    assert Backtracking(root_state, search_mode=search_mode).solve() == None
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+@pytest.mark.parametrize(
+    "inference", [Inference.NONE, Inference.FORWARD_CHECKING, Inference.AC3]
+)
+@pytest.mark.parametrize("heuristics", [None, Heuristics.LEAST_VALUES])
+def test_backtracking_inference(search_mode, inference, heuristics):
+    # coloring the map of australia with three colors
+    regions = ["WA", "NT", "SA", "Q", "NSW", "V", "T"]
+    variables = {name: Variable[str](name, None, ["r", "g", "b"]) for name in regions}
+    borders = [
+        ("WA", "NT"),
+        ("WA", "SA"),
+        ("NT", "SA"),
+        ("NT", "Q"),
+        ("SA", "Q"),
+        ("SA", "NSW"),
+        ("SA", "V"),
+        ("Q", "NSW"),
+        ("NSW", "V"),
+    ]
+    constraints = [
+        Constraint(variables[v1], variables[v2], CONSTRAINT.NOT_EQUALS)
+        for v1, v2 in borders
+    ]
+    root_state = State[str](list(variables.values()), constraints)
+    res = Backtracking(root_state, heuristics, search_mode, inference).solve()
+    assert res != None and res.valid_solution()
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+@pytest.mark.parametrize("inference", [Inference.FORWARD_CHECKING, Inference.AC3])
+def test_backtracking_inference_no_solution(search_mode, inference):
+    # four variables, all different, three values
+    variables = [Variable[int](name, None, [1, 2, 3]) for name in "ABCD"]
+    variables[0].set_value(1)
+    root_state = State[int](variables, [AllDifferent(variables)])
+    backtracking = Backtracking(
+        root_state, Heuristics.LEAST_VALUES, search_mode, inference
+    )
+    assert backtracking.solve() == None
+    for variable in variables:
+        assert variable.get_domain() == [1, 2, 3], "the initial state isn't pruned"
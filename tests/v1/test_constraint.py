@@ -2,7 +2,9 @@ import pytest
 import numpy as np
 from sudoku.backtracking import Backtracking
 from sudoku.sudokuGrid import SudokuGrid, ROWS, COLUMNS
-from sudoku.backtracking import State, Variable, Constraint, CONSTRAINT
+from sudoku.backtracking import State, Variable, Constraint, CONSTRAINT, AllDifferent
+from sudoku.backtracking import Inference
+from common.trail import SearchMode
 
 
 @pytest.fixture
@@ -58,3 +60,80 @@ def test_constraint_equals_one_constraint_variable_is_null_not_equals(variables)
 
     constraint = Constraint(variables[0], variables[1], CONSTRAINT.NOT_EQUALS)
     assert constraint.satisfied() is True, "True because None == None"
+
+
+def test_all_different(variables):
+    constraint = AllDifferent(variables)
+    assert constraint.satisfied(), "unassigned variables don't conflict"
+    assert constraint.get_constraint() == CONSTRAINT.ALL_DIFFERENT
+    assert constraint.get_variables() == tuple(variables)
+
+    variables[0].set_value(1)
+    variables[1].set_value(2)
+    assert constraint.satisfied()
+    variables[1].set_value(3)
+    assert not constraint.satisfied()
+
+
+def test_all_different_revise(variables):
+    constraint = AllDifferent(variables)
+    assert constraint.revise() == [(variables[0], [1, 2]), (variables[1], [1, 2])]
+    assert variables[0].get_domain() == [1, 2, 3], "the variables aren't changed"
+
+    variables[0].set_value(1)
+    assert constraint.revise() == [(variables[1], [2])]
+    variables[1].set_value(1)
+    assert constraint.revise() is None
+
+
+def test_all_different_revise_singletons(variables):
+    constraint = AllDifferent(variables)
+    variables[0].set_domain([1, 3])
+    variables[1].set_domain([1, 2])
+    # v1 is left with 1 once the 3 of v3 is gone, which v2 loses then
+    assert constraint.revise() == [(variables[0], [1])]
+    assert constraint.revise(singletons=True) == [
+        (variables[0], [1]),
+        (variables[1], [2]),
+    ]
+
+    variables[1].set_domain([1, 3])
+    assert constraint.revise(singletons=True) is None
+
+    # three variables for two values
+    extra = Variable("v4", value=None, domain=[1, 2])
+    variables[0].set_domain([1, 2])
+    variables[1].set_domain([1, 2])
+    constraint = AllDifferent(variables + [extra])
+    assert constraint.revise() == []
+    assert constraint.revise(singletons=True) is None
+
+
+def test_all_different_too_few_variables(variables):
+    with pytest.raises(ValueError):
+        AllDifferent(variables[:1])
+
+
+def test_binary_all_different(variables):
+    constraint = Constraint(variables[0], variables[2], CONSTRAINT.ALL_DIFFERENT)
+    variables[0].set_value(3)
+    assert not constraint.satisfied()
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+@pytest.mark.parametrize("inference", [Inference.FORWARD_CHECKING, Inference.AC3])
+def test_binary_all_different_inference(variables, search_mode, inference):
+    # a binary ALL_DIFFERENT constraint is pruned like NOT_EQUALS
+    variables[0].set_domain([1])
+    variables[1].set_domain([1, 2])
+    constraints = [
+        Constraint(variables[0], variables[1], CONSTRAINT.ALL_DIFFERENT),
+        Constraint(variables[1], variables[2], CONSTRAINT.ALL_DIFFERENT),
+        Constraint(variables[0], variables[2], CONSTRAINT.ALL_DIFFERENT),
+    ]
+    state = State(variables, constraints)
+    res = Backtracking(state, None, search_mode, inference).solve()
+    assert res is not None and res.valid_solution()
+    assert [
+        res.get_variable_by_name(name).get_value() for name in ("v1", "v2", "v3")
+    ] == [1, 2, 3]
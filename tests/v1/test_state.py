@@ -2,7 +2,8 @@ import pytest
 import numpy as np
 from sudoku.backtracking import Backtracking
 from sudoku.sudokuGrid import SudokuGrid, ROWS, COLUMNS
-from sudoku.backtracking import State, Variable, Constraint, CONSTRAINT
+from sudoku.backtracking import State, Variable, Constraint, CONSTRAINT, AllDifferent
+from common.trail import Trail
 
 
 @pytest.fixture
@@ -167,3 +168,104 @@ def test_state_get_variable_by_name():
     assert (
         state.get_variable_by_name("v1") == v2
     ) == False, "should be False, because they are different variable"
+
+
+def test_get_variable_by_name(example_variables, example_constraints):
+    state = State(example_variables, example_constraints)
+    assert state.get_variable_by_name("B") is example_variables[1]
+    with pytest.raises(ValueError):
+        state.get_variable_by_name("D")
+
+
+def test_get_constraints_of_variable(example_variables, example_constraints):
+    state = State(example_variables, example_constraints)
+    assert state.get_constraints_of_variable("A") == [example_constraints[0]]
+    assert state.get_constraints_of_variable("B") == example_constraints
+    assert state.get_constraints_of_variable("D") == []
+    assert State(example_variables).get_constraints_of_variable("A") == []
+
+
+def test_valid_assignment_checks_incident_constraints(
+    example_variables, example_constraints
+):
+    state = State(example_variables, example_constraints)
+    example_variables[1].set_value(2)
+    example_variables[2].set_value(2)
+    assert not state.valid_assignment(example_variables[2])
+    # the constraints on A are satisfied, B != C isn't one of them
+    example_variables[0].set_value(2)
+    assert state.valid_assignment(example_variables[0])
+    assert not state.valid_state()
+
+
+def test_valid_assignment_after_deepcopy(example_variables, example_constraints):
+    state = State(example_variables, example_constraints)
+    new_state = state._next_state(example_variables[0], 1)
+    new_state._assign(example_variables[1], 2)
+    assert not new_state.valid_assignment(example_variables[1])
+    assert state.valid_assignment(example_variables[1])
+    assert new_state.get_variable_by_name("A") is not example_variables[0]
+
+
+def test_forward_check(example_variables, example_constraints):
+    state = State(example_variables, example_constraints)
+    state._assign(example_variables[1], 2)
+    assert state.forward_check(example_variables[1])
+    # A == B and B != C
+    assert example_variables[0].get_domain() == [2]
+    assert example_variables[2].get_domain() == [1, 3]
+
+
+def test_forward_check_wipe_out(example_variables, example_constraints):
+    example_variables[2].set_domain([2])
+    state = State(example_variables, example_constraints)
+    state._assign(example_variables[1], 2)
+    assert not state.forward_check(example_variables[1])
+    assert example_variables[2].get_domain() == [2], "wiped out domains are kept"
+
+
+def test_arc_consistency_chain():
+    variables = [
+        Variable("A", value=None, domain=[1]),
+        Variable("B", value=None, domain=[1, 2]),
+        Variable("C", value=None, domain=[2, 3]),
+    ]
+    state = State(
+        variables,
+        [
+            Constraint(variables[0], variables[1], CONSTRAINT.NOT_EQUALS),
+            Constraint(variables[1], variables[2], CONSTRAINT.NOT_EQUALS),
+        ],
+    )
+    assert state.arc_consistency()
+    assert [variable.get_domain() for variable in variables] == [[1], [2], [3]]
+
+
+def test_arc_consistency_all_different_wipe_out():
+    variables = [Variable(name, value=None, domain=[1, 2]) for name in "ABC"]
+    state = State(variables, [AllDifferent(variables)])
+    # the pairwise arcs are consistent, the scope as a whole has too few values
+    assert not state.arc_consistency()
+    state = State(variables, [AllDifferent(variables[:2])])
+    assert state.arc_consistency()
+    state._assign(variables[0], 1)
+    assert state.arc_consistency(variables[0])
+    assert variables[1].get_domain() == [2]
+
+
+def test_domain_pruning_is_undone(example_variables, example_constraints):
+    state = State(example_variables, example_constraints)
+    legal_values = state.get_legal_values()
+    trail = Trail()
+    state.set_trail(trail)
+
+    state._assign(example_variables[1], 2)
+    state.forward_check(example_variables[1])
+    assert legal_values.get_legal_values(0) == 1
+    assert legal_values.fewest_legal_values() == 0
+
+    trail.undo(0)
+    assert example_variables[0].get_domain() == [1, 2, 3]
+    assert example_variables[2].get_domain() == [1, 2, 3]
+    assert legal_values.get_legal_values(0) == 3
+    assert example_variables[1].get_value() == None
@@ -1,13 +1,11 @@
 import pytest
-from sudoku.sudokuSolver import (
-    SudokuSolver,
-    all_blocks,
-    all_columns,
-    all_rows,
-)
+from sudoku.sudokuSolver import SudokuCSPAdapter, SudokuSolver
+from common.houses import all_blocks, all_columns, all_rows
 import numpy as np
 
 from sudoku.sudokuGrid import ROWS, COLUMNS
+from sudoku.backtracking import Backtracking, CONSTRAINT, Heuristics, Inference
+from common.trail import SearchMode
 
 
 def test_fill_in_candidates_normal_sudoku():
@@ -554,3 +552,41 @@ def test_hidden_single_two_cell():
     assert solver.hidden_single(solver.get_sudoku_grid()) == 3
     assert np.array_equal(solver.get_sudoku_grid().get_cell((6, 7)), [7])
     assert np.array_equal(solver.get_sudoku_grid().get_cell((0, 7)), [7])
+
+
+def test_adapter_emits_all_different_per_house():
+    sudoku = SudokuSolver(
+        "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+    )
+    sudoku.fill_in_candidates()
+    state = SudokuCSPAdapter.soduku_to_init_state(sudoku.get_sudoku_grid())
+    constraints = state._get_constraints()
+    assert len(constraints) == 27
+    assert all(
+        constraint.get_constraint() == CONSTRAINT.ALL_DIFFERENT
+        for constraint in constraints
+    )
+    # the first house is the first column
+    assert [
+        variable.get_variable_name() for variable in constraints[0].get_variables()
+    ] == ["({}, 0)".format(row) for row in range(ROWS)]
+    assert len(state.get_constraints_of_variable("(4, 4)")) == 3
+
+
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+@pytest.mark.parametrize(
+    "inference", [Inference.NONE, Inference.FORWARD_CHECKING, Inference.AC3]
+)
+def test_adapter_state_solves(search_mode, inference):
+    sudoku = SudokuSolver(
+        "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+    )
+    sudoku.fill_in_candidates()
+    state = SudokuCSPAdapter.soduku_to_init_state(sudoku.get_sudoku_grid())
+    solution = Backtracking(
+        state, Heuristics.LEAST_VALUES, search_mode, inference
+    ).solve()
+    assert solution != None and solution.valid_solution()
+    assert str(solution) == (
+        "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+    )
@@ -1,6 +1,7 @@
 import pytest
 import re
-from sudoku.sudokuSolver import all_rows, all_columns, all_blocks, SudokuSolver
+from sudoku.sudokuSolver import SudokuSolver
+from common.houses import all_rows, all_columns, all_blocks
 import numpy as np
 from sudoku.sudokuGrid import SudokuGrid, InvalidSudokuInput, ROWS, COLUMNS
 
@@ -0,0 +1,64 @@
+import random
+from solver_v2.allDifferent import consistent_masks, maximum_matching
+from solver_v2.candidates import ALL_CANDIDATES, to_mask
+
+"""
+Testing the matching based arc consistency of a house
+"""
+
+
+def brute_force_masks(masks: list):
+    # the union of all assignments of pairwise different digits, used as reference
+    kept = [0] * len(masks)
+    found = False
+
+    def assign(cell: int, used: int, digits: list) -> None:
+        nonlocal found
+        if cell == len(masks):
+            found = True
+            for index, digit in enumerate(digits):
+                kept[index] |= 1 << digit
+            return
+        for digit in range(1, 10):
+            if masks[cell] >> digit & 1 and not used >> digit & 1:
+                assign(cell + 1, used | 1 << digit, digits + [digit])
+
+    assign(0, 0, [])
+    return kept if found else None
+
+
+def test_maximum_matching():
+    masks = [to_mask([1, 2]), to_mask([1]), to_mask([2, 3])]
+    assert maximum_matching(masks) == [to_mask([2]), to_mask([1]), to_mask([3])]
+    # two cells for a single digit
+    assert maximum_matching([to_mask([1]), to_mask([1])]).count(0) == 1
+
+
+def test_naked_pair():
+    masks = [to_mask([1, 2]), to_mask([1, 2])] + [ALL_CANDIDATES] * 7
+    pruned = consistent_masks(masks)
+    assert pruned[:2] == masks[:2]
+    assert pruned[2:] == [ALL_CANDIDATES & ~to_mask([1, 2])] * 7
+
+
+def test_hidden_triple():
+    others = ALL_CANDIDATES & ~to_mask([7, 8, 9])
+    masks = [ALL_CANDIDATES] * 3 + [others] * 6
+    pruned = consistent_masks(masks)
+    assert pruned[:3] == [to_mask([7, 8, 9])] * 3
+    assert pruned[3:] == [others] * 6
+
+
+def test_no_assignment():
+    masks = [to_mask([1, 2])] * 3 + [ALL_CANDIDATES] * 6
+    assert consistent_masks(masks) == None
+
+
+def test_matches_brute_force():
+    generator = random.Random(0)
+    for _ in range(50):
+        masks = [
+            sum(1 << digit for digit in range(1, 10) if generator.random() < 0.5)
+            for _ in range(9)
+        ]
+        assert consistent_masks(masks) == brute_force_masks(masks)
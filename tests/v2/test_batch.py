@@ -0,0 +1,109 @@
+import pytest
+from solver_v2.batch import SolveOptions, Status, solve_many, solve_one, _techniques
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.sudokuCSP import SudokuCSP
+from solver_v2.techniques import PipelinePolicy
+from common.trail import SearchMode
+
+"""
+Testing solve_many() and the results of the batch solver
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+EASY_SUDOKU = (
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+)
+GOLDEN_NUGGET = (
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000"
+)
+NO_SOLUTION = "11" + "0" * 79
+
+PUZZLES = [HARD_SUDOKU, EASY_SUDOKU, NO_SOLUTION, "123"]
+
+
+def test_solve_one():
+    result = solve_one(3, HARD_SUDOKU)
+    assert result.index == 3
+    assert result.puzzle == HARD_SUDOKU
+    assert result.status == Status.SOLVED
+    assert result.seconds > 0
+
+    grid = SudokuGrid(result.solution)
+    assert SudokuCSP(grid).valid_solution(grid)
+    for digit, given in zip(result.solution, HARD_SUDOKU):
+        assert given == "0" or digit == given
+
+
+@pytest.mark.parametrize(
+    "options",
+    [SolveOptions(), SolveOptions(SudokuGrid, None, SearchMode.COPY)],
+)
+def test_solve_one_status(options):
+    assert solve_one(0, EASY_SUDOKU, options).status == Status.SOLVED
+    assert solve_one(0, NO_SOLUTION, options).status == Status.NO_SOLUTION
+    assert solve_one(0, NO_SOLUTION, options).solution is None
+    assert solve_one(0, "123", options).status == Status.INVALID
+
+
+def test_solve_many_in_process():
+    results = list(solve_many(iter(PUZZLES), workers=1))
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.status for result in results] == [
+        Status.SOLVED,
+        Status.SOLVED,
+        Status.NO_SOLUTION,
+        Status.INVALID,
+    ]
+
+
+def test_solve_many_ordered():
+    results = list(solve_many(PUZZLES * 3, workers=2, chunksize=2))
+    assert [result.puzzle for result in results] == PUZZLES * 3
+    assert results == [
+        solve_one(index, puzzle)._replace(seconds=result.seconds)
+        for (index, puzzle), result in zip(enumerate(PUZZLES * 3), results)
+    ]
+
+
+def test_solve_many_unordered():
+    results = list(solve_many(PUZZLES * 3, workers=2, chunksize=1, ordered=False))
+    assert sorted(result.index for result in results) == list(range(12))
+    for result in results:
+        assert result.puzzle == (PUZZLES * 3)[result.index]
+
+
+def test_solve_many_invalid_arguments():
+    with pytest.raises(ValueError, match="Workers: 0 needs to be at least 1"):
+        next(solve_many(PUZZLES, workers=0))
+    with pytest.raises(ValueError, match="Chunksize: 0 needs to be at least 1"):
+        next(solve_many(PUZZLES, chunksize=0))
+
+
+def test_solve_many_adaptive_schedules():
+    options = SolveOptions(policy=PipelinePolicy.ADAPTIVE, subsets=True)
+    assert _techniques(SolveOptions()) is None
+    techniques = _techniques(options)
+    assert techniques is _techniques(options)
+    assert techniques is not _techniques(options._replace(fish=True))
+
+    calls = [technique.stats.calls for technique in techniques]
+    results = list(solve_many([GOLDEN_NUGGET], workers=1, options=options))
+    assert results[0].status == Status.SOLVED
+    # the schedules of the first puzzle are still there for the next one
+    schedules = [technique.schedule for technique in techniques]
+    assert techniques[0].schedule.rate is not None
+    after_first = [technique.stats.calls for technique in techniques]
+    assert after_first > calls
+
+    puzzles = [GOLDEN_NUGGET, EASY_SUDOKU]
+    results = list(solve_many(puzzles, workers=1, options=options))
+    assert [result.status for result in results] == [Status.SOLVED] * 2
+    assert [technique.schedule for technique in techniques] == schedules
+    assert all(
+        after > before
+        for after, before in zip(
+            [technique.stats.calls for technique in techniques], after_first
+        )
+    )
@@ -0,0 +1,171 @@
+import pytest
+import re
+import copy
+import pickle
+import numpy as np
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuGrid import SudokuGrid, InvalidSudokuInput, ROWS, COLUMNS
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics
+from solver_v2.candidates import to_mask, to_candidates, ALL_CANDIDATES, UNFILLED
+
+"""
+Testing the BitmaskGrid() class
+"""
+
+EASY_SUDOKU = (
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+)
+
+
+def test_to_mask_and_back():
+    assert to_mask([1, 4, 9]) == 0b1000010010
+    assert to_candidates(0b1000010010) == [1, 4, 9]
+    assert to_mask([0]) == UNFILLED
+    assert to_mask(list(range(1, 10))) == ALL_CANDIDATES
+    assert to_candidates(0) == [], "the empty mask is a cell without candidates"
+
+
+def test_to_mask_invalid_candidate():
+    with pytest.raises(ValueError, match="Candidate: 10 is not a digit"):
+        to_mask([1, 10])
+
+
+def test_grid_size():
+    grid = BitmaskGrid()
+    assert grid.get_shape() == (ROWS, COLUMNS)
+    assert grid.get_masks().dtype == np.uint16
+    assert grid.get_masks().nbytes == ROWS * COLUMNS * 2
+
+
+def test_default_grid_values():
+    grid = BitmaskGrid()
+    for cell in grid:
+        assert cell == [0], "every entry should be zero"
+
+
+def test_parsed_sudoku_matches_sudoku_grid():
+    grid = BitmaskGrid(EASY_SUDOKU)
+    reference = SudokuGrid(EASY_SUDOKU)
+
+    assert list(grid) == list(reference)
+    assert str(grid) == str(reference)
+
+
+def test_parsed_sudoku_short_string():
+    sudoku_to_short = EASY_SUDOKU[:79]
+    with pytest.raises(
+        InvalidSudokuInput,
+        match="Length or parsed sudoku needs to be {}, but is {}".format(
+            ROWS * COLUMNS, len(sudoku_to_short)
+        ),
+    ):
+        BitmaskGrid(sudoku_to_short)
+
+
+@pytest.mark.parametrize("character", ["-", "+", "a", " ", "²"])
+def test_parsed_sudoku_special_character(character):
+    sudoku = character + EASY_SUDOKU[1:]
+    with pytest.raises(
+        InvalidSudokuInput, match="Parsed sudoku contains character that is not a digit"
+    ):
+        BitmaskGrid(sudoku)
+
+
+def test_set_and_get_cell():
+    grid = BitmaskGrid()
+    grid.set_cell((1, 0), [3, 1, 2])
+
+    assert grid.get_cell((1, 0)) == [1, 2, 3], "candidates are returned sorted"
+    assert grid.get_mask(9) == to_mask([1, 2, 3]), "(1, 0) has the flat index 9"
+    assert grid.get_cell((0, 0)) == [0]
+
+
+def test_set_cell_type_error():
+    grid = BitmaskGrid()
+    new_value = 1
+    with pytest.raises(
+        TypeError,
+        match="Value has be of type list and not type: {}".format(type(new_value)),
+    ):
+        grid.set_cell((1, 0), new_value)
+
+
+def test_get_cell_out_of_bounds():
+    grid = BitmaskGrid()
+    with pytest.raises(
+        IndexError, match=re.escape("out of bounds for position (-1,0)")
+    ):
+        grid.get_cell((-1, 0))
+    with pytest.raises(IndexError):
+        grid.get_cell((9, 0))
+
+
+def test_set_mask():
+    grid = BitmaskGrid()
+    grid.set_mask(80, to_mask([7, 8]))
+    assert grid.get_cell((8, 8)) == [7, 8]
+
+
+def test_get_masks_is_read_only():
+    grid = BitmaskGrid()
+    with pytest.raises(ValueError):
+        grid.get_masks()[0] = 0
+
+
+def test_deepcopy_is_independent():
+    grid = BitmaskGrid(EASY_SUDOKU)
+    copied = copy.deepcopy(grid)
+    copied.set_cell((0, 2), [1, 2])
+
+    assert grid.get_cell((0, 2)) == [0]
+    assert copied.get_cell((0, 2)) == [1, 2]
+
+
+def test_valid_board():
+    grid = BitmaskGrid(EASY_SUDOKU)
+    assert grid.valid_board()
+
+    grid.set_cell((0, 2), [5])
+    assert not grid.valid_board(), "5 is placed twice in the first row"
+
+
+def test_valid_board_ignores_cells_with_candidates():
+    grid = BitmaskGrid(EASY_SUDOKU)
+    grid.set_cell((0, 2), [5, 3])
+    assert grid.valid_board()
+
+
+@pytest.mark.parametrize(
+    "position, value", [((0, 2), [6]), ((2, 0), [8]), ((8, 0), [5])]
+)
+def test_valid_board_houses(position, value):
+    grid = BitmaskGrid(EASY_SUDOKU)
+    reference = SudokuGrid(EASY_SUDOKU)
+    grid.set_cell(position, value)
+    reference.set_cell(position, value)
+
+    assert grid.valid_board() == reference.valid_board()
+
+
+def test_sudoku_csp_on_bitmask_grid():
+    sudoku = SudokuCSP(BitmaskGrid(EASY_SUDOKU), Heuristics.LEAST_VALUES)
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    solution = sudoku.solve()
+
+    reference = SudokuCSP(SudokuGrid(EASY_SUDOKU), Heuristics.LEAST_VALUES)
+    reference.fill_in_candidates()
+    reference.logical_deduction(reference.grid)
+
+    assert isinstance(solution, BitmaskGrid)
+    assert sudoku.valid_solution(solution)
+    assert list(solution) == list(reference.solve())
+
+
+def test_pickle_keeps_flat_view():
+    grid = BitmaskGrid(EASY_SUDOKU)
+    copied = pickle.loads(pickle.dumps(grid))
+    copied.set_mask(2, 1 << 4)
+    assert copied.get_cell((0, 2)) == [4]
+    assert copied.get_masks()[2] == 1 << 4
+    assert grid.get_cell((0, 2)) == [0]
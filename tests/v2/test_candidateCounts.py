@@ -0,0 +1,86 @@
+import copy
+import random
+import pytest
+from solver_v2.candidateCounts import CandidateCounts
+from common.trail import Trail
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.bitmaskGrid import BitmaskGrid
+
+"""
+Testing the CandidateCounts() class and the incremental buckets of both grids
+"""
+
+EASY_SUDOKU = (
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+)
+
+
+def rescan_fewest_candidates(grid):
+    # the former scan over all cells, used as reference
+    counts = [len(cell) for cell in grid]
+    undecided = [index for index, count in enumerate(counts) if count > 1]
+    if not undecided:
+        return None
+    return min(undecided, key=lambda index: (counts[index], index))
+
+
+def test_fewest_candidates():
+    candidate_counts = CandidateCounts([1] * 81)
+    assert candidate_counts.fewest_candidates() == None
+    candidate_counts.update(40, 1, 9)
+    candidate_counts.update(50, 1, 3)
+    candidate_counts.update(60, 1, 3)
+    assert candidate_counts.fewest_candidates() == 50
+    candidate_counts.update(50, 3, 1)
+    assert candidate_counts.fewest_candidates() == 60
+    assert candidate_counts.get_count(50) == 1
+
+
+def test_fewest_candidates_skips_contradictions():
+    candidate_counts = CandidateCounts([1] * 81)
+    candidate_counts.update(0, 1, 0)
+    assert candidate_counts.fewest_candidates() == None
+
+
+def test_fewest_candidates_by_degree():
+    candidate_counts = CandidateCounts([1] * 81)
+    # cell 80 shares the last row with cell 72, cell 40 has no undecided peer
+    for index in (40, 72, 80):
+        candidate_counts.update(index, 1, 2)
+    assert candidate_counts.fewest_candidates() == 40
+    assert candidate_counts.fewest_candidates(by_degree=True) == 72
+    assert candidate_counts.get_degree(72) == 1
+    assert candidate_counts.get_degree(40) == 0
+
+
+def test_copy_is_independent():
+    candidate_counts = CandidateCounts([1] * 81)
+    copied = copy.deepcopy(candidate_counts)
+    copied.update(3, 1, 2)
+    assert copied.fewest_candidates() == 3
+    assert candidate_counts.fewest_candidates() == None
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_fewest_candidates_after_undo(grid_class):
+    grid = grid_class(EASY_SUDOKU)
+    trail = Trail()
+    grid.set_trail(trail)
+    grid.set_cell((0, 2), [1, 2])
+    grid.set_cell((0, 3), [1, 2, 4])
+    assert grid.get_candidate_counts().fewest_candidates() == 2
+    trail.undo(0)
+    assert grid.get_candidate_counts().fewest_candidates() == None
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_fewest_candidates_matches_rescan(grid_class):
+    generator = random.Random(0)
+    grid = grid_class()
+    for _ in range(500):
+        position = (generator.randrange(9), generator.randrange(9))
+        candidates = generator.sample(range(1, 10), generator.randrange(1, 10))
+        grid.set_cell(position, candidates)
+        assert grid.get_candidate_counts().fewest_candidates() == (
+            rescan_fewest_candidates(grid)
+        )
@@ -0,0 +1,161 @@
+import io
+import pickle
+import pytest
+import numpy as np
+from solver_v2.corpus import (
+    InvalidCorpusInput,
+    PuzzleCorpus,
+    parse_puzzles,
+    load_puzzles,
+)
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuGrid import InvalidSudokuInput
+
+"""
+Testing the bulk parser and the memory mapped reader of puzzle corpora
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+EASY_SUDOKU = (
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+)
+
+
+def digits(sudoku_str: str) -> list:
+    return [int(char) for char in sudoku_str]
+
+
+def test_parse_puzzles():
+    puzzles = parse_puzzles("{}\n{}\n".format(HARD_SUDOKU, EASY_SUDOKU).encode())
+    assert puzzles.shape == (2, 81)
+    assert puzzles.dtype == np.uint8
+    assert puzzles[0].tolist() == digits(HARD_SUDOKU)
+    assert puzzles[1].tolist() == digits(EASY_SUDOKU)
+
+
+@pytest.mark.parametrize(
+    "corpus",
+    [
+        "{}\n{}",
+        "{}\r\n{}\r\n",
+        "{}\n{}\r\n",
+    ],
+)
+def test_parse_puzzles_line_endings(corpus):
+    puzzles = parse_puzzles(corpus.format(HARD_SUDOKU, EASY_SUDOKU).encode())
+    assert puzzles.tolist() == [digits(HARD_SUDOKU), digits(EASY_SUDOKU)]
+
+
+def test_parse_puzzles_empty():
+    assert parse_puzzles(b"").shape == (0, 81)
+
+
+def test_parse_puzzles_wrong_length():
+    corpus = "\n".join([HARD_SUDOKU, HARD_SUDOKU[:-1], HARD_SUDOKU, HARD_SUDOKU + "1"])
+    with pytest.raises(InvalidCorpusInput, match="needs to be 81 in line: 2, 4") as e:
+        parse_puzzles(corpus.encode())
+    assert e.value.lines == [2, 4]
+
+
+def test_parse_puzzles_not_a_digit():
+    corpus = "\n".join([HARD_SUDOKU, "." + HARD_SUDOKU[1:], "/" + HARD_SUDOKU[1:]])
+    with pytest.raises(InvalidSudokuInput, match="not a digit in line: 2, 3"):
+        parse_puzzles(corpus.encode())
+
+
+def test_parse_puzzles_reported_lines():
+    corpus = "\n".join(["1"] * 12)
+    with pytest.raises(InvalidCorpusInput, match=r"10, \.\.\. \(12 lines\)") as e:
+        parse_puzzles(corpus.encode())
+    assert e.value.lines == list(range(1, 13))
+
+
+def test_load_puzzles(tmp_path):
+    path = tmp_path / "corpus.txt"
+    path.write_text("{}\n{}\n".format(HARD_SUDOKU, EASY_SUDOKU))
+    assert load_puzzles(str(path)).shape == (2, 81)
+    assert load_puzzles(io.BytesIO(path.read_bytes())).shape == (2, 81)
+
+
+def write_corpus(tmp_path, content: str) -> str:
+    path = tmp_path / "corpus.txt"
+    path.write_bytes(content.encode())
+    return str(path)
+
+
+@pytest.mark.parametrize("ending", ["\n", "\r\n"])
+@pytest.mark.parametrize("last_ending", [True, False])
+def test_corpus(tmp_path, ending, last_ending):
+    content = ending.join([HARD_SUDOKU, EASY_SUDOKU, HARD_SUDOKU])
+    corpus = PuzzleCorpus(write_corpus(tmp_path, content + ending * last_ending))
+
+    assert len(corpus) == 3
+    assert corpus[1].tolist() == digits(EASY_SUDOKU)
+    assert corpus[-1].tolist() == digits(HARD_SUDOKU)
+    assert corpus[1:].tolist() == [digits(EASY_SUDOKU), digits(HARD_SUDOKU)]
+    assert [puzzle.tolist() for puzzle in corpus][0] == digits(HARD_SUDOKU)
+    assert corpus.get_string(1) == EASY_SUDOKU
+
+
+def test_corpus_view_is_zero_copy(tmp_path):
+    corpus = PuzzleCorpus(write_corpus(tmp_path, HARD_SUDOKU + "\n" + EASY_SUDOKU))
+    view = corpus.get_view()
+    assert view.shape == (2, 81)
+    base = view
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    assert not view.flags.writeable
+
+
+def test_corpus_empty(tmp_path):
+    corpus = PuzzleCorpus(write_corpus(tmp_path, ""))
+    assert len(corpus) == 0
+    assert list(corpus) == []
+
+
+def test_corpus_get_grid(tmp_path):
+    corpus = PuzzleCorpus(write_corpus(tmp_path, HARD_SUDOKU + "\n" + EASY_SUDOKU))
+    grid = corpus.get_grid(1)
+    assert grid.get_cell((0, 0)) == [5]
+    assert corpus.get_grid(0, BitmaskGrid).get_cell((0, 0)) == [8]
+
+
+@pytest.mark.parametrize(
+    "content, lines",
+    [
+        ("{0}\n{0}1\n{0}\n", [2, 3]),
+        ("{0}\n{0}\n{1}", [3]),
+        ("{1}\n{0}\n", [1]),
+    ],
+)
+def test_corpus_wrong_length(tmp_path, content, lines):
+    path = write_corpus(tmp_path, content.format(HARD_SUDOKU, HARD_SUDOKU[:-3]))
+    with pytest.raises(InvalidCorpusInput) as e:
+        PuzzleCorpus(path)
+    assert e.value.lines == lines
+
+
+def test_corpus_not_a_digit(tmp_path):
+    path = write_corpus(tmp_path, "\n".join([HARD_SUDOKU, "." + HARD_SUDOKU[1:]]))
+    with pytest.raises(InvalidCorpusInput, match="not a digit in line: 2"):
+        PuzzleCorpus(path)
+    assert len(PuzzleCorpus(path, validate=False)) == 2
+
+
+def test_corpus_shards(tmp_path):
+    corpus = PuzzleCorpus(write_corpus(tmp_path, (HARD_SUDOKU + "\n") * 10))
+    shards = [corpus.shard(shard, 3) for shard in range(3)]
+    assert [list(shard) for shard in shards] == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+    assert [index for index, _ in corpus.iter_shard(1, 3)] == [3, 4, 5]
+    with pytest.raises(ValueError, match="Shard: 3 is not in range of 3 shards"):
+        corpus.shard(3, 3)
+
+
+def test_corpus_pickled_by_path(tmp_path):
+    corpus = PuzzleCorpus(write_corpus(tmp_path, (HARD_SUDOKU + "\n") * 1000))
+    data = pickle.dumps(corpus)
+    assert len(data) < 1000
+    assert pickle.loads(data).get_string(999) == HARD_SUDOKU
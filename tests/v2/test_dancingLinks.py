@@ -0,0 +1,65 @@
+import pytest
+from solver_v2.dancingLinks import DancingLinks
+from solver_v2.sudokuGrid import SudokuGrid, InvalidSudokuInput
+
+"""
+Testing the DancingLinks() exact cover engine
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+WEIRD_SUDOKU = (
+    "100000000000000000000000000000000000010000000000000000000000000000000000000000000"
+)
+# the digits of a rectangle of empty cells in two blocks can be swapped
+TWO_SOLUTIONS = (
+    "895476010426931857371528694569713428284659731137842569952387146713264985648195070"
+)
+
+
+def solved(grid: SudokuGrid) -> bool:
+    return all(len(cell) == 1 and cell[0] != 0 for cell in grid) and grid.valid_board()
+
+
+def test_solve():
+    solution = DancingLinks(HARD_SUDOKU).solve()
+    assert isinstance(solution, SudokuGrid)
+    assert solved(solution)
+    for cell, given in zip(solution, HARD_SUDOKU):
+        assert given == "0" or cell == [int(given)]
+
+
+def test_solve_conflicting_givens():
+    assert DancingLinks("11" + "0" * 79).solve() is None
+    assert DancingLinks("11" + "0" * 79).count_solutions() == 0
+
+
+def test_count_solutions():
+    assert DancingLinks(HARD_SUDOKU).count_solutions() == 1
+    assert DancingLinks(TWO_SOLUTIONS).count_solutions() == 2
+    assert DancingLinks(TWO_SOLUTIONS).count_solutions(limit=1) == 1
+
+
+def test_count_solutions_limit():
+    assert DancingLinks(WEIRD_SUDOKU).count_solutions(limit=2) == 2
+    assert DancingLinks(WEIRD_SUDOKU).count_solutions(limit=100) == 100
+    assert DancingLinks(WEIRD_SUDOKU).count_solutions(limit=0) == 0
+
+
+def test_iter_solutions():
+    solutions = [str(grid) for grid in DancingLinks(TWO_SOLUTIONS).iter_solutions()]
+    assert len(solutions) == 2
+    assert solutions[0] != solutions[1]
+
+
+def test_search_twice():
+    engine = DancingLinks(TWO_SOLUTIONS)
+    assert engine.count_solutions() == 2
+    assert str(engine.solve()) == str(next(engine.iter_solutions()))
+    assert engine.count_solutions() == 2
+
+
+def test_invalid_input():
+    with pytest.raises(InvalidSudokuInput):
+        DancingLinks("1" * 80)
@@ -0,0 +1,64 @@
+import pytest
+from solver_v2.parallel import frontier, parallel_count_solutions, parallel_solve
+from solver_v2.batch import SolveOptions, solve_one
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.sudokuCSP import SudokuCSP
+
+"""
+Testing the parallel search of a single puzzle
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+WEIRD_SUDOKU = (
+    "100000000000000000000000000000000000010000000000000000000000000000000000000000000"
+)
+# the digits of a rectangle of empty cells in two blocks can be swapped
+TWO_SOLUTIONS = (
+    "895476010426931857371528694569713428284659731137842569952387146713264985648195070"
+)
+
+
+def test_frontier():
+    subtrees, solutions = frontier(HARD_SUDOKU, 2)
+    assert len(subtrees) > 1
+    assert solutions == []
+    for grid in subtrees:
+        assert grid.valid_board()
+
+    assert len(frontier(HARD_SUDOKU, 0)[0]) == 1
+    assert frontier("11" + "0" * 79, 2) == ([], [])
+
+
+def test_frontier_solutions_above_depth():
+    subtrees, solutions = frontier(TWO_SOLUTIONS, 5)
+    assert subtrees == []
+    assert len(solutions) == 2
+
+
+@pytest.mark.parametrize("depth", [0, 2])
+@pytest.mark.parametrize("options", [SolveOptions(), SolveOptions(SudokuGrid)])
+def test_parallel_solve(depth, options):
+    solution = parallel_solve(HARD_SUDOKU, workers=2, depth=depth, options=options)
+    assert isinstance(solution, options.grid_class)
+    assert SudokuCSP(solution).valid_solution(solution)
+    assert (
+        "".join(str(cell[0]) for cell in solution) == solve_one(0, HARD_SUDOKU).solution
+    )
+
+
+def test_parallel_solve_no_solution():
+    assert parallel_solve("11" + "0" * 79, workers=2) is None
+
+
+def test_parallel_count_solutions():
+    assert parallel_count_solutions(HARD_SUDOKU, None, workers=2) == 1
+    assert parallel_count_solutions(TWO_SOLUTIONS, None, workers=2, depth=1) == 2
+    assert parallel_count_solutions(WEIRD_SUDOKU, 20, workers=2, depth=2) == 20
+    assert parallel_count_solutions(WEIRD_SUDOKU, 0) == 0
+
+
+def test_parallel_invalid_workers():
+    with pytest.raises(ValueError, match="Workers: 0 needs to be at least 1"):
+        parallel_solve(HARD_SUDOKU, workers=0)
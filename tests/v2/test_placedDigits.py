@@ -0,0 +1,115 @@
+import copy
+import random
+import pytest
+from solver_v2.placedDigits import PlacedDigits
+from common.trail import Trail
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.bitmaskGrid import BitmaskGrid
+from common.houses import all_houses
+
+"""
+Testing the PlacedDigits() class and the incremental valid_board of both grids
+"""
+
+EASY_SUDOKU = (
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+)
+
+
+def rescan_valid_board(grid) -> bool:
+    # the former valid_board, used as reference
+    for house in all_houses:
+        digits = [
+            grid.get_cell(position)[0]
+            for position in house
+            if len(grid.get_cell(position)) == 1 and grid.get_cell(position)[0] != 0
+        ]
+        if len(digits) != len(set(digits)):
+            return False
+    return True
+
+
+def test_update_conflict():
+    placed_digits = PlacedDigits()
+    placed_digits.update(0, 0, 5)
+    assert placed_digits.valid()
+    # cell 8 shares the first row with cell 0
+    placed_digits.update(8, 0, 5)
+    assert not placed_digits.valid()
+    placed_digits.update(8, 5, 0)
+    assert placed_digits.valid()
+
+
+def test_update_conflict_three_times():
+    placed_digits = PlacedDigits()
+    for index in (0, 1, 2):
+        placed_digits.update(index, 0, 7)
+    placed_digits.update(2, 7, 0)
+    assert not placed_digits.valid()
+    placed_digits.update(1, 7, 3)
+    assert placed_digits.valid()
+
+
+def test_placed_mask():
+    placed_digits = PlacedDigits()
+    placed_digits.update(0, 0, 5)
+    placed_digits.update(10, 0, 1)
+    # houses of cell 0: column 0, row 9 and block 18
+    assert placed_digits.placed_mask(0) == 1 << 5
+    assert placed_digits.placed_mask(9) == 1 << 5
+    assert placed_digits.placed_mask(18) == 1 << 5 | 1 << 1
+    placed_digits.update(0, 5, 0)
+    assert placed_digits.placed_mask(18) == 1 << 1
+
+
+def test_copy_is_independent():
+    placed_digits = PlacedDigits()
+    placed_digits.update(0, 0, 5)
+    copied = copy.deepcopy(placed_digits)
+    copied.update(1, 0, 5)
+    assert not copied.valid()
+    assert placed_digits.valid()
+    assert placed_digits.placed_mask(9) == 1 << 5
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_valid_board_on_set_cell(grid_class):
+    grid = grid_class(EASY_SUDOKU)
+    assert grid.valid_board()
+    grid.set_cell((0, 2), [5])
+    assert not grid.valid_board()
+    # several candidates are not a placed digit
+    grid.set_cell((0, 2), [1, 5])
+    assert grid.valid_board()
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_valid_board_after_undo(grid_class):
+    grid = grid_class(EASY_SUDOKU)
+    trail = Trail()
+    grid.set_trail(trail)
+    grid.set_cell((0, 2), [3])
+    grid.set_cell((1, 1), [3])
+    assert not grid.valid_board()
+    trail.undo(0)
+    assert grid.valid_board()
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_valid_board_deepcopy(grid_class):
+    grid = grid_class(EASY_SUDOKU)
+    copied = copy.deepcopy(grid)
+    copied.set_cell((0, 2), [5])
+    assert not copied.valid_board()
+    assert grid.valid_board()
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_valid_board_matches_rescan(grid_class):
+    generator = random.Random(0)
+    grid = grid_class()
+    for _ in range(500):
+        position = (generator.randrange(9), generator.randrange(9))
+        candidates = generator.sample(range(1, 10), generator.choice((1, 1, 2)))
+        grid.set_cell(position, candidates)
+        assert grid.valid_board() == rescan_valid_board(grid)
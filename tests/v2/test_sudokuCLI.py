@@ -0,0 +1,98 @@
+import io
+import json
+import pytest
+from SudokuCLI import main
+
+"""
+Testing the command line solver
+"""
+
+HARD_SUDOKU = (
+    "805000002000901000300000000060700400200050000000000060000380000010000900040000070"
+)
+HARD_SOLUTION = (
+    "895476312426931857371528694569713428284659731137842569952387146713264985648195273"
+)
+NO_SOLUTION = "11" + "0" * 79
+INPUT = "{}\n{}\n123\n".format(HARD_SUDOKU, NO_SOLUTION)
+
+
+def run(argv: list, stdin: str = INPUT) -> list:
+    stdout = io.StringIO()
+    assert main(argv, io.StringIO(stdin), stdout) == 0
+    return stdout.getvalue().splitlines()
+
+
+def test_solution_format():
+    assert run([]) == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_jsonl_format():
+    lines = [json.loads(line) for line in run(["--format", "jsonl"])]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["solution"] == HARD_SOLUTION
+    assert lines[0]["status"] == "SOLVED"
+    assert lines[0]["nodes"] > 0
+    assert lines[0]["seconds"] > 0
+    assert lines[1]["solution"] is None
+
+
+def test_blank_lines():
+    # every input line gets an output line, a blank one is INVALID
+    stdin = "\n{}\n  \n{}\n".format(HARD_SUDOKU, NO_SOLUTION)
+    assert run([], stdin) == ["INVALID", HARD_SOLUTION, "INVALID", "NO_SOLUTION"]
+    lines = [json.loads(line) for line in run(["--format", "jsonl"], stdin)]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert lines[2]["status"] == "INVALID"
+
+
+def test_read_file(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text(INPUT)
+    assert run([str(path)], stdin="") == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_workers():
+    lines = run(["--workers", "2", "--chunksize", "1"], INPUT * 3)
+    assert lines == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"] * 3
+
+    lines = run(["--workers", "2", "--unordered", "--format", "jsonl"], INPUT * 3)
+    assert sorted(json.loads(line)["index"] for line in lines) == list(range(9))
+
+
+def test_value_ordering():
+    lines = run(["--value-ordering", "least_constraining"])
+    assert lines == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_arc_consistency():
+    lines = [
+        json.loads(line) for line in run(["--arc-consistency", "--format", "jsonl"])
+    ]
+    assert [line["status"] for line in lines] == ["SOLVED", "NO_SOLUTION", "INVALID"]
+    assert lines[0]["solution"] == HARD_SOLUTION
+
+
+def test_subsets():
+    lines = run(["--subsets", "--arc-consistency"])
+    assert lines == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_fish():
+    lines = run(["--fish", "--subsets"])
+    assert lines == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_policy():
+    for policy in ("sweep", "adaptive"):
+        lines = run(["--policy", policy, "--subsets"])
+        assert lines == [HARD_SOLUTION, "NO_SOLUTION", "INVALID"]
+
+
+def test_invalid_arguments():
+    with pytest.raises(SystemExit):
+        run(["--workers", "-1"])
+    with pytest.raises(SystemExit):
+        run(["--format", "csv"])
+    with pytest.raises(SystemExit):
+        run(["--value-ordering", "random"])
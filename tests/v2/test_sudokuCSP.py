@@ -0,0 +1,451 @@
+import pytest
+from collections import deque
+from solver_v2.sudokuGrid import SudokuGrid
+from common.houses import all_peers
+from solver_v2.bitmaskGrid import BitmaskGrid
+from common.trail import SearchMode
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics, Contradiction, ValueOrdering
+
+"""
+Testing the SudokuCSP() class
+"""
+
+GOLDEN_NUGGET = (
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000"
+)
+WEIRD_SUDOKU = (
+    "100000000000000000000000000000000000010000000000000000000000000000000000000000000"
+)
+# the digits of a rectangle of empty cells in two blocks can be swapped
+TWO_SOLUTIONS = (
+    "895476010426931857371528694569713428284659731137842569952387146713264985648195070"
+)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_propagate_one_cell(grid_class):
+    sudoku = SudokuCSP(
+        grid_class(
+            "100000000000000000000000000000000000000000000000000000000000000000000000000000000"
+        )
+    )
+    sudoku.fill_in_candidates()
+
+    assert sudoku.propagate(sudoku.grid, deque([0])) == 20
+    for peer in all_peers[(0, 0)]:
+        assert sudoku.grid.get_cell(peer) == [2, 3, 4, 5, 6, 7, 8, 9]
+    assert sudoku.grid.get_cell((4, 4)) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_propagate_decided_peers_are_queued(grid_class):
+    sudoku = SudokuCSP(
+        grid_class(
+            "100000000000000000000000000000000000000000000000000000000000000000000000000000000"
+        )
+    )
+    sudoku.fill_in_candidates()
+    sudoku.grid.set_cell((0, 1), [1, 2])
+
+    sudoku.propagate(sudoku.grid, deque([0]))
+    assert sudoku.grid.get_cell((0, 1)) == [2]
+    assert 2 not in sudoku.grid.get_cell(
+        (0, 8)
+    ), "(0, 1) got decided and was propagated as well"
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_propagate_contradiction(grid_class):
+    sudoku = SudokuCSP(
+        grid_class(
+            "100000000000000000000000000000000000000000000000000000000000000000000000000000000"
+        )
+    )
+    sudoku.fill_in_candidates()
+    sudoku.grid.set_cell((8, 0), [1])
+
+    with pytest.raises(Contradiction, match=r"No candidates left for \(8, 0\)"):
+        sudoku.propagate(sudoku.grid, deque([0]))
+
+
+def test_logical_deduction_reports_contradiction():
+    sudoku = SudokuCSP(
+        SudokuGrid(
+            "110000000000000000000000000000000000000000000000000000000000000000000000000000000"
+        )
+    )
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(sudoku.grid) is False
+
+
+def test_logical_deduction_only_changed_cells():
+    sudoku = SudokuCSP(
+        SudokuGrid(
+            "100000000000000000000000000000000000000000000000000000000000000000000000000000001"
+        )
+    )
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(sudoku.grid, [(0, 0)])
+    assert 1 not in sudoku.grid.get_cell((0, 1))
+    assert 1 in sudoku.grid.get_cell((8, 7)), "(8, 8) wasn't marked as changed"
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_backtracking_solution_has_no_empty_cells(grid_class):
+    sudoku = SudokuCSP(grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES)
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    solution = sudoku.solve()
+
+    assert sudoku.valid_solution(solution)
+    for cell in solution:
+        assert len(cell) == 1 and cell[0] != 0
+
+
+def test_valid_solution_rejects_empty_cells():
+    sudoku = SudokuCSP(
+        SudokuGrid(
+            "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+        )
+    )
+    assert sudoku.valid_solution(sudoku.grid)
+    sudoku.grid.set_cell((0, 0), [])
+    assert not sudoku.valid_solution(sudoku.grid)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+@pytest.mark.parametrize(
+    "heuristic",
+    [None, Heuristics.LEAST_VALUES, Heuristics.LEAST_CONSTRAINT_VARIABLE],
+)
+def test_count_solutions(grid_class, heuristic):
+    assert SudokuCSP(grid_class(GOLDEN_NUGGET), heuristic).count_solutions() == 1
+    assert SudokuCSP(grid_class(TWO_SOLUTIONS), heuristic).count_solutions() == 2
+    assert SudokuCSP(grid_class(TWO_SOLUTIONS), heuristic).count_solutions(None) == 2
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_least_constraining_value_solves(grid_class, search_mode):
+    sudoku = SudokuCSP(
+        grid_class(GOLDEN_NUGGET),
+        Heuristics.LEAST_VALUES,
+        search_mode,
+        ValueOrdering.LEAST_CONSTRAINING,
+    )
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    assert sudoku.valid_solution(sudoku.solve())
+    assert (
+        SudokuCSP(
+            grid_class(TWO_SOLUTIONS),
+            value_ordering=ValueOrdering.LEAST_CONSTRAINING,
+        ).count_solutions()
+        == 2
+    )
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_least_constraining_value_order(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(
+        grid, Heuristics.LEAST_VALUES, value_ordering=ValueOrdering.LEAST_CONSTRAINING
+    )
+    sudoku.fill_in_candidates()
+    grid.set_cell((0, 0), [1, 2])
+    # 1 is a candidate of one peer less than 2, so it is tried first
+    grid.set_cell((0, 1), [2, 3])
+    assert [child.get_cell((0, 0)) for child in sudoku.branch(grid)] == [[1], [2]]
+
+    grid.set_cell((0, 1), [1, 3])
+    assert [child.get_cell((0, 0)) for child in sudoku.branch(grid)] == [[2], [1]]
+
+    sudoku.value_ordering = ValueOrdering.FIRST
+    assert [child.get_cell((0, 0)) for child in sudoku.branch(grid)] == [[1], [2]]
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_house_arc_consistency(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # a naked pair in the first row, the cells are in the first block as well
+    grid.set_cell((0, 0), [1, 2])
+    grid.set_cell((0, 1), [1, 2])
+    queue = deque()
+    assert sudoku.house_arc_consistency(grid, queue, [9]) == 2 * 7 + 2 * 6
+    assert grid.get_cell((0, 5)) == [3, 4, 5, 6, 7, 8, 9]
+    assert grid.get_cell((2, 2)) == [3, 4, 5, 6, 7, 8, 9]
+    assert grid.get_cell((3, 0)) == list(range(1, 10))
+    assert sudoku.arc_consistency_removed == 26
+    assert len(queue) == 0
+
+    grid.set_cell((0, 2), [1, 2])
+    with pytest.raises(Contradiction):
+        sudoku.house_arc_consistency(grid)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_arc_consistency_solves_with_fewer_nodes(grid_class, search_mode):
+    nodes = []
+    for arc_consistency in (False, True):
+        sudoku = SudokuCSP(
+            grid_class(GOLDEN_NUGGET),
+            Heuristics.LEAST_VALUES,
+            search_mode,
+            arc_consistency=arc_consistency,
+        )
+        sudoku.fill_in_candidates()
+        sudoku.logical_deduction(sudoku.grid)
+        assert sudoku.valid_solution(sudoku.solve())
+        nodes.append(sudoku.nodes)
+    assert nodes[1] < nodes[0]
+    assert sudoku.arc_consistency_removed > 0
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_arc_consistency_count_solutions(grid_class):
+    sudoku = SudokuCSP(
+        grid_class(TWO_SOLUTIONS), Heuristics.LEAST_VALUES, arc_consistency=True
+    )
+    assert sudoku.count_solutions() == 2
+    sudoku = SudokuCSP(
+        grid_class(WEIRD_SUDOKU), Heuristics.LEAST_VALUES, arc_consistency=True
+    )
+    assert sudoku.count_solutions(limit=20) == 20
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_locked_candidates(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # pointing: the 1 of the first block is in the first row
+    for row in (1, 2):
+        for col in range(3):
+            grid.set_cell((row, col), list(range(2, 10)))
+    # box/line reduction: the 2 of the fifth row is in the fourth block
+    for col in range(3, 9):
+        grid.set_cell((4, col), [1] + list(range(3, 10)))
+    queue = deque()
+    assert sudoku.locked_candidates(grid, queue) == 6 + 6
+    assert grid.get_cell((0, 8)) == list(range(2, 10))
+    assert grid.get_cell((3, 1)) == [1] + list(range(3, 10))
+    assert grid.get_cell((4, 1)) == list(range(1, 10))
+    assert sudoku.locked_candidates(grid, queue) == 0
+    assert len(queue) == 0
+
+    # the 1 of the first block has to be in the first row
+    grid.set_cell((0, 5), [1])
+    with pytest.raises(Contradiction):
+        sudoku.locked_candidates(grid)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_naked_subsets(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # a naked triple in the first column, none of the cells has all three digits
+    grid.set_cell((0, 0), [1, 2])
+    grid.set_cell((4, 0), [2, 3])
+    grid.set_cell((8, 0), [1, 3])
+    queue = deque()
+    assert sudoku.naked_subsets(grid, 2, queue) == 0
+    assert sudoku.naked_subsets(grid, 3, queue, [0]) == 6 * 3
+    assert grid.get_cell((1, 0)) == [4, 5, 6, 7, 8, 9]
+    assert grid.get_cell((0, 1)) == list(range(1, 10))
+    assert len(queue) == 0
+
+    grid.set_cell((2, 0), [1, 2])
+    with pytest.raises(Contradiction):
+        sudoku.naked_subsets(grid, 2)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_hidden_subsets(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # 1 and 2 are left in two cells of the first row only
+    for col in range(2, 9):
+        grid.set_cell((0, col), list(range(3, 10)))
+    queue = deque()
+    assert sudoku.hidden_subsets(grid, 2, queue, [9]) == 2 * 7
+    assert grid.get_cell((0, 0)) == [1, 2]
+    assert grid.get_cell((0, 1)) == [1, 2]
+    assert len(queue) == 0
+
+    # 1, 2 and 3 are left in two cells of the second row
+    for col in range(2, 9):
+        grid.set_cell((1, col), list(range(4, 10)))
+    with pytest.raises(Contradiction):
+        sudoku.hidden_subsets(grid, 3, houses=[10])
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_hidden_subsets_ignore_placed_digits(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # the first cell got decided by an earlier house and isn't propagated yet,
+    # 1 and 2 look like a hidden pair of the next two cells of the first row
+    grid.set_cell((0, 0), [1])
+    for col in range(3, 9):
+        grid.set_cell((0, col), list(range(3, 10)))
+    assert sudoku.hidden_subsets(grid, 2, houses=[9]) == 0
+    assert grid.get_cell((0, 1)) == list(range(1, 10))
+    assert grid.get_cell((0, 2)) == list(range(1, 10))
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+@pytest.mark.parametrize("search_mode", [SearchMode.COPY, SearchMode.TRAIL])
+def test_subsets_solve_with_fewer_nodes(grid_class, search_mode):
+    nodes = []
+    for subsets in (False, True):
+        sudoku = SudokuCSP(
+            grid_class(GOLDEN_NUGGET),
+            Heuristics.LEAST_VALUES,
+            search_mode,
+            subsets=subsets,
+        )
+        sudoku.fill_in_candidates()
+        sudoku.logical_deduction(sudoku.grid)
+        assert sudoku.valid_solution(sudoku.solve())
+        nodes.append(sudoku.nodes)
+    assert nodes[1] < nodes[0]
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_subsets_count_solutions(grid_class):
+    sudoku = SudokuCSP(grid_class(TWO_SOLUTIONS), Heuristics.LEAST_VALUES, subsets=True)
+    assert sudoku.count_solutions() == 2
+
+
+def remove_digit(grid, row: int, columns, digit: int) -> None:
+    for col in columns:
+        grid.set_cell((row, col), [d for d in grid.get_cell((row, col)) if d != digit])
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_x_wing(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    # the 1 of the first and the fifth row is in the first or the fifth column
+    for row in (0, 4):
+        remove_digit(grid, row, [1, 2, 3, 5, 6, 7, 8], 1)
+    queue = deque()
+    assert sudoku.fish_patterns(grid, 2, queue) == 7 * 2
+    assert grid.get_cell((2, 4)) == list(range(2, 10))
+    assert grid.get_cell((2, 3)) == list(range(1, 10))
+    assert sudoku.fish_removed == 14
+    assert sudoku.fish_patterns(grid, 2, queue) == 0
+    assert len(queue) == 0
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_swordfish(grid_class):
+    grid = grid_class()
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    remove_digit(grid, 0, [1, 2, 3, 5, 6, 7, 8], 1)
+    remove_digit(grid, 4, [0, 1, 2, 3, 5, 6, 7], 1)
+    remove_digit(grid, 8, [1, 2, 3, 4, 5, 6, 7], 1)
+    assert sudoku.fish_patterns(grid, 2) == 0
+    assert sudoku.fish_patterns(grid, 3) == 6 * 3
+    assert grid.get_cell((1, 8)) == list(range(2, 10))
+
+    # three rows with the 1 in the same two columns
+    remove_digit(grid, 4, [8], 1)
+    remove_digit(grid, 8, [8], 1)
+    grid.set_cell((4, 0), list(range(1, 10)))
+    grid.set_cell((8, 4), list(range(1, 10)))
+    with pytest.raises(Contradiction):
+        sudoku.fish_patterns(grid, 3)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_fish_count_solutions(grid_class):
+    sudoku = SudokuCSP(
+        grid_class(TWO_SOLUTIONS), Heuristics.LEAST_VALUES, subsets=True, fish=True
+    )
+    assert sudoku.count_solutions() == 2
+    sudoku = SudokuCSP(grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES, fish=True)
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    assert sudoku.valid_solution(sudoku.solve())
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_count_solutions_stops_at_limit(grid_class):
+    sudoku = SudokuCSP(grid_class(WEIRD_SUDOKU), Heuristics.LEAST_VALUES)
+    assert sudoku.count_solutions() == 2
+    assert sudoku.count_solutions(limit=5) == 5
+    assert sudoku.count_solutions(limit=0) == 0
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_count_solutions_no_solution(grid_class):
+    assert SudokuCSP(grid_class("11" + "0" * 79)).count_solutions() == 0
+    # the last cell of the first row has to be a 9, which its column already has
+    assert SudokuCSP(grid_class("12345678" + "0" * 72 + "9")).count_solutions() == 0
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_count_solutions_restores_grid(grid_class):
+    grid = grid_class(TWO_SOLUTIONS)
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    before = str(grid)
+
+    assert sudoku.count_solutions(grid=grid) == 2
+    assert str(grid) == before
+    assert grid.get_trail() is None
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_iter_solutions(grid_class):
+    solutions = list(SudokuCSP(grid_class(TWO_SOLUTIONS)).iter_solutions())
+    assert len(solutions) == 2
+    assert str(solutions[0]) != str(solutions[1])
+    for solution in solutions:
+        assert SudokuCSP(solution).valid_solution(solution)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_iter_solutions_is_lazy(grid_class):
+    grid = grid_class(WEIRD_SUDOKU)
+    before = str(grid)
+    solutions = SudokuCSP(grid, Heuristics.LEAST_VALUES).iter_solutions()
+
+    first, second = next(solutions), next(solutions)
+    assert str(first) != str(second)
+    # the yielded solutions are copies the search doesn't change
+    assert SudokuCSP(first).valid_solution(first)
+    assert grid.get_trail() is not None
+
+    solutions.close()
+    assert str(grid) == before
+    assert grid.get_trail() is None
+
+
+def test_iter_solutions_no_solution():
+    assert list(SudokuCSP(SudokuGrid("11" + "0" * 79)).iter_solutions()) == []
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_branch(grid_class):
+    grid = grid_class(TWO_SOLUTIONS)
+    sudoku = SudokuCSP(grid)
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(grid)
+    before = str(grid)
+
+    children = sudoku.branch(grid)
+    assert len(children) == 2
+    for child in children:
+        assert sudoku.valid_solution(child)
+    assert str(grid) == before
+    assert sudoku.nodes == 2
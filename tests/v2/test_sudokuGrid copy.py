@@ -425,42 +425,6 @@ def test_simple_elemination_two_iterations_second_removes_values():
     ), "cant remove further, no additional call has only one candidate."
 
 
-def test_remove_element_remove_element():
-    solver = SudokuCSP(SudokuGrid())
-    new_array, removed = solver._SudokuCSP__remove_element([0, 1, 2], 2)
-
-    assert np.array_equal(new_array, [0, 1])
-    assert removed == 1
-
-
-def test_remove_element_not_in_list():
-    solver = SudokuCSP(SudokuGrid())
-    new_array, removed = solver._SudokuCSP__remove_element([0, 1, 2], 3)
-
-    assert np.array_equal(new_array, [0, 1, 2])
-    assert removed == 0
-
-
-def test_remove_element_one_element_left():
-    solver = SudokuCSP(SudokuGrid())
-    new_array, removed = solver._SudokuCSP__remove_element([0, 1], 1)
-
-    assert np.array_equal(new_array, [0])
-    assert removed == 1
-
-
-def test_remove_element_array_empty_after_remove():
-    solver = SudokuCSP(SudokuGrid())
-    new_array, removed = solver._SudokuCSP__remove_element([1], 1)
-
-
-def test_remove_element_one_element_array_remove_other_candidate():
-    solver = SudokuCSP(SudokuGrid())
-    new_array, removed = solver._SudokuCSP__remove_element([1], 2)
-    assert new_array == [1]
-    assert removed == 0
-
-
 def test_remove_candidates_from_house():
     # solver = SudokuCSP(SudokuGrid()
     # solver._SudokuCSP_SudokuGrid(_remove_candidate_from_house())
@@ -0,0 +1,198 @@
+import pytest
+from solver_v2.sudokuGrid import SudokuGrid
+from solver_v2.bitmaskGrid import BitmaskGrid
+from solver_v2.sudokuCSP import SudokuCSP, Heuristics
+from solver_v2.techniques import (
+    Fish,
+    HiddenSingle,
+    HiddenSubsets,
+    HouseArcConsistency,
+    LockedCandidates,
+    NakedSubsets,
+    MAX_BACKOFF,
+    PipelinePolicy,
+    Schedule,
+    Technique,
+    default_techniques,
+)
+
+"""
+Testing the deduction techniques and the pipeline of logical_deduction
+"""
+
+GOLDEN_NUGGET = (
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000"
+)
+
+
+class Counting(Technique):
+    # records the houses it was given, deduces nothing
+    by_house = True
+
+    def __init__(self, root_only: bool = False) -> None:
+        super().__init__("counting", root_only)
+        self.houses = []
+
+    def apply(self, sudoku, grid, queue, houses=None) -> int:
+        self.houses.append(set(houses))
+        return 0
+
+
+def solve(sudoku: SudokuCSP) -> str:
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(sudoku.grid)
+    solution = sudoku.solve()
+    assert sudoku.valid_solution(solution)
+    return "".join(str(cell[0]) for cell in solution)
+
+
+def test_technique_is_abstract():
+    class Unfinished(Technique):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished("unfinished")
+
+
+def test_default_techniques():
+    names = [technique.name for technique in default_techniques()]
+    assert names == ["hidden_single", "locked_candidates"]
+
+    techniques = default_techniques(subsets=True, arc_consistency=True, fish=True)
+    assert [type(technique) for technique in techniques] == [
+        HiddenSingle,
+        LockedCandidates,
+        NakedSubsets,
+        HiddenSubsets,
+        NakedSubsets,
+        HiddenSubsets,
+        NakedSubsets,
+        HiddenSubsets,
+        HouseArcConsistency,
+        Fish,
+        Fish,
+        Fish,
+    ]
+    assert techniques[7].name == "hidden_subsets_4"
+    assert len({technique.name for technique in techniques}) == len(techniques)
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_stats(grid_class):
+    sudoku = SudokuCSP(grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES, subsets=True)
+    solve(sudoku)
+    stats = sudoku.technique_stats()
+    assert list(stats)[:3] == ["propagate", "hidden_single", "locked_candidates"]
+    assert len(stats) == 1 + len(sudoku.techniques)
+    for name in ("propagate", "hidden_single", "locked_candidates"):
+        assert stats[name].calls > 0
+        assert stats[name].removed > 0
+        assert stats[name].seconds > 0
+    # the later techniques only run when the earlier ones stall
+    assert stats["hidden_single"].calls >= stats["locked_candidates"].calls
+    assert stats["locked_candidates"].calls >= stats["naked_subsets_2"].calls
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+@pytest.mark.parametrize("policy", [PipelinePolicy.RESTART, PipelinePolicy.SWEEP])
+def test_custom_pipeline(grid_class, policy):
+    expected = solve(SudokuCSP(grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES))
+    # propagation alone is enough for the search
+    sudoku = SudokuCSP(
+        grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES, techniques=[], policy=policy
+    )
+    assert solve(sudoku) == expected
+    assert list(sudoku.technique_stats()) == ["propagate"]
+
+    techniques = [HiddenSingle(), NakedSubsets(2), HouseArcConsistency(), Fish(2)]
+    sudoku = SudokuCSP(
+        grid_class(GOLDEN_NUGGET),
+        Heuristics.LEAST_VALUES,
+        techniques=techniques,
+        policy=policy,
+    )
+    assert solve(sudoku) == expected
+    assert sudoku.arc_consistency_removed == techniques[2].stats.removed
+
+
+def test_root_only():
+    root = HiddenSingle(root_only=True)
+    sudoku = SudokuCSP(
+        BitmaskGrid(GOLDEN_NUGGET), Heuristics.LEAST_VALUES, techniques=[root]
+    )
+    sudoku.fill_in_candidates()
+    sudoku.logical_deduction(sudoku.grid)
+    calls = root.stats.calls
+    assert calls > 0
+    sudoku.solve()
+    assert root.stats.calls == calls
+    assert sudoku.propagation_stats.calls > calls
+
+
+def test_dirty_houses():
+    counting = Counting()
+    sudoku = SudokuCSP(BitmaskGrid(), techniques=[counting])
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(sudoku.grid)
+    assert counting.houses == [set(range(27))]
+
+    # nothing changed since the last call
+    assert sudoku.logical_deduction(sudoku.grid, [])
+    assert len(counting.houses) == 1
+
+    sudoku.grid.set_cell((0, 0), [5])
+    assert sudoku.logical_deduction(sudoku.grid, [(0, 0)])
+    # the first column, row and block and the houses of the changed peers
+    assert counting.houses[1] == set(range(27)) - {22, 23, 25, 26}
+
+
+def test_schedule():
+    schedule = Schedule()
+    assert schedule.due()
+    schedule.record(1e-6, 10)
+    assert schedule.rate == 10
+    # nothing to compare with yet
+    schedule.update(None)
+    assert schedule.due()
+
+    schedule.update(10)
+    assert schedule.backoff == 0 and schedule.due()
+
+    # pays off much worse than propagation, skipped for 1, 2, 4, ... calls
+    for backoff in (1, 2, 4, 8):
+        schedule.record(1e-3, 0)
+        schedule.update(1000)
+        assert schedule.backoff == backoff
+        assert [schedule.due() for _ in range(backoff + 1)] == [False] * backoff + [
+            True
+        ]
+    for _ in range(20):
+        schedule.update(1000)
+    assert schedule.backoff == MAX_BACKOFF
+
+    # back to normal as soon as it pays off again
+    schedule.record(1e-6, 10000)
+    schedule.update(1000)
+    assert schedule.backoff == 0 and schedule.due()
+
+
+@pytest.mark.parametrize("grid_class", [SudokuGrid, BitmaskGrid])
+def test_adaptive(grid_class):
+    expected = solve(SudokuCSP(grid_class(GOLDEN_NUGGET), Heuristics.LEAST_VALUES))
+    techniques = default_techniques(subsets=True, arc_consistency=True, fish=True)
+    sudoku = SudokuCSP(
+        grid_class(GOLDEN_NUGGET),
+        Heuristics.LEAST_VALUES,
+        techniques=techniques,
+        policy=PipelinePolicy.ADAPTIVE,
+    )
+    sudoku.fill_in_candidates()
+    assert sudoku.logical_deduction(sudoku.grid)
+    # the root isn't adapted to, so every technique had its turn
+    assert all(technique.stats.calls > 0 for technique in techniques)
+    assert all(technique.schedule.rate is None for technique in techniques)
+
+    solution = sudoku.solve()
+    assert "".join(str(cell[0]) for cell in solution) == expected
+    assert sudoku.propagation_schedule.rate > 0
+    assert techniques[0].schedule.rate is not None